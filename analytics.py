@@ -0,0 +1,348 @@
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Float, cast, column, func, inspect, select, table
+from sqlalchemy import types as sqltypes
+
+from config import ANALYTICS_CHUNK_SIZE, QUANTILE_SAMPLE_SIZE
+from read_plan import ReadPlan
+
+logger = logging.getLogger(__name__)
+
+
+class RunningStats:
+    """Estadísticas incrementales y combinables de una columna numérica.
+
+    count/mean/std usan la fórmula de Chan (Welford por bloques) y los
+    cuantiles salen de una muestra bottom-k: cada valor recibe una clave
+    aleatoria y se conservan los k de menor clave, por lo que dos
+    muestras se combinan sin perder uniformidad.
+    """
+
+    def __init__(self, sample_size: int = QUANTILE_SAMPLE_SIZE, seed: Optional[int] = None):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(seed)
+        self._sample = np.empty(0)
+        self._keys = np.empty(0)
+
+    def update(self, values) -> "RunningStats":
+        """Agregar un bloque de valores (los nulos se ignoran)"""
+        values = pd.to_numeric(pd.Series(values), errors="coerce").dropna().to_numpy(dtype=float)
+        if values.size == 0:
+            return self
+        other = RunningStats(self.sample_size)
+        other.count = values.size
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        other._sample = values
+        other._keys = self._rng.random(values.size)
+        return self.merge(other)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Combinar con otras estadísticas parciales"""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        sample = np.concatenate([self._sample, other._sample])
+        keys = np.concatenate([self._keys, other._keys])
+        if keys.size > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            sample, keys = sample[keep], keys[keep]
+        self._sample, self._keys = sample, keys
+        return self
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+
+    def quantile(self, q: float) -> float:
+        return float(np.quantile(self._sample, q)) if self._sample.size else np.nan
+
+    def describe(self) -> Dict[str, float]:
+        if self.count == 0:
+            return {"count": 0, "mean": np.nan, "std": np.nan, "min": np.nan,
+                    "25%": np.nan, "50%": np.nan, "75%": np.nan, "max": np.nan}
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "25%": self.quantile(0.25),
+            "50%": self.quantile(0.50),
+            "75%": self.quantile(0.75),
+            "max": self.max,
+        }
+
+
+class TableStats:
+    """Resumen incremental de una tabla: filas, tipos y estadísticas numéricas"""
+
+    def __init__(self):
+        self.rows = 0
+        self.dtypes: Dict[str, str] = {}
+        self.numeric: Dict[str, RunningStats] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.dtypes)
+
+    def update(self, chunk: pd.DataFrame) -> "TableStats":
+        self.rows += len(chunk)
+        for col in chunk.columns:
+            name = str(col)
+            dtype = chunk[col].dtype
+            previous = self.dtypes.get(name)
+            if previous is None:
+                self.dtypes[name] = str(dtype)
+            elif previous != str(dtype):
+                try:
+                    self.dtypes[name] = str(np.promote_types(np.dtype(previous), dtype))
+                except TypeError:
+                    self.dtypes[name] = "object"
+
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                self.numeric.setdefault(name, RunningStats()).update(chunk[col])
+        return self
+
+    def describe(self) -> pd.DataFrame:
+        """Equivalente aproximado a DataFrame.describe() para las columnas numéricas"""
+        numeric = {name: stats.describe() for name, stats in self.numeric.items()
+                   if self.dtypes.get(name) != "object"}
+        return pd.DataFrame(numeric)
+
+
+def iter_sql_chunks(
+    engine,
+    table_name: str,
+    chunksize: int = ANALYTICS_CHUNK_SIZE,
+    plan: Optional[ReadPlan] = None
+) -> Iterator[pd.DataFrame]:
+    """Leer una tabla SQL por bloques usando un cursor del lado del servidor.
+
+    Con un `plan` solo se piden las columnas y filas necesarias (SELECT ... WHERE).
+    """
+    with engine.connect().execution_options(stream_results=True) as connection:
+        if plan is None or plan.is_empty:
+            yield from pd.read_sql_table(table_name, connection, chunksize=chunksize)
+            return
+        columns = [col["name"] for col in inspect(engine).get_columns(table_name)]
+        source = table(table_name, *[column(name) for name in columns])
+        yield from pd.read_sql(plan.sql_query(source), connection, chunksize=chunksize)
+
+
+def iter_mongo_chunks(
+    collection,
+    chunksize: int = ANALYTICS_CHUNK_SIZE,
+    plan: Optional[ReadPlan] = None
+) -> Iterator[pd.DataFrame]:
+    """Leer una colección de MongoDB por bloques con un cursor por lotes.
+
+    Con un `plan` el filtro y la proyección se envían en el propio find().
+    """
+    query, projection = ({}, None) if plan is None else (plan.mongo_filter(), plan.mongo_projection())
+    batch = []
+    for document in collection.find(query, projection, batch_size=chunksize):
+        batch.append(document)
+        if len(batch) >= chunksize:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch)
+
+
+def analyze_chunks(
+    chunks: Iterable[pd.DataFrame],
+    on_progress: Optional[Callable[[TableStats], None]] = None
+) -> TableStats:
+    """Calcular estadísticas recorriendo los bloques una sola vez.
+
+    `on_progress` se invoca tras cada bloque con los resultados parciales.
+    """
+    stats = TableStats()
+    for chunk in chunks:
+        stats.update(chunk)
+        if on_progress is not None:
+            on_progress(stats)
+    logger.info(f"Análisis completado: {stats.rows} filas, {len(stats.dtypes)} columnas")
+    return stats
+
+
+STAT_ROWS = ["count", "distinct", "mean", "std", "min", "25%", "50%", "75%", "max"]
+QUANTILES = {"25%": 0.25, "50%": 0.50, "75%": 0.75}
+
+
+class TableSummary:
+    """Resumen calculado dentro de la base de datos (misma interfaz que TableStats)"""
+
+    def __init__(self, rows: int, dtypes: Dict[str, str], numeric: Dict[str, Dict[str, Any]]):
+        self.rows = rows
+        self.dtypes = dtypes
+        self.numeric = numeric
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.dtypes)
+
+    def describe(self) -> pd.DataFrame:
+        frame = pd.DataFrame(self.numeric)
+        return frame.reindex([row for row in STAT_ROWS if row in frame.index])
+
+
+def _is_numeric_type(sql_type) -> bool:
+    return (isinstance(sql_type, (sqltypes.Integer, sqltypes.Numeric))
+            and not isinstance(sql_type, sqltypes.Boolean))
+
+
+def _is_comparable_type(sql_type, dialect_name: str) -> bool:
+    """Tipos no numéricos que admiten COUNT DISTINCT, MIN y MAX"""
+    if isinstance(sql_type, sqltypes.Text) and dialect_name == "mssql":
+        # TEXT/NTEXT de SQL Server no se pueden comparar ni agrupar
+        return False
+    return isinstance(sql_type, (sqltypes.String, sqltypes.Date, sqltypes.DateTime, sqltypes.Time))
+
+
+def summarize_sql_table(engine, table_name: str, plan: Optional[ReadPlan] = None) -> TableSummary:
+    """Calcular COUNT, COUNT DISTINCT, MIN, MAX, AVG, STDDEV y percentiles en el servidor.
+
+    Las columnas no numéricas reciben COUNT y, si su tipo es comparable
+    (texto, fechas), COUNT DISTINCT, MIN y MAX. Los tipos de columna salen
+    del inspector de SQLAlchemy; solo viaja el resumen. Un `plan` limita
+    las columnas resumidas y las filas (WHERE).
+
+    En SQL Server PERCENTILE_CONT solo existe como función de ventana:
+    se lanza una consulta SELECT DISTINCT TOP 1 por columna numérica y
+    cada una ordena la tabla completa, así que los percentiles cuestan
+    un recorrido con ordenación por columna.
+    """
+    columns = inspect(engine).get_columns(table_name)
+    source = table(table_name, *[column(col["name"]) for col in columns])
+    if plan is not None and not plan.is_empty:
+        wanted = set(plan.output_columns([col["name"] for col in columns]))
+        columns = [col for col in columns if col["name"] in wanted]
+        source = plan.sql_query(source).subquery(table_name)
+    dtypes = {col["name"]: str(col["type"]) for col in columns}
+    numeric = [col["name"] for col in columns if _is_numeric_type(col["type"])]
+    other = [col for col in columns if col["name"] not in numeric]
+    is_mssql = engine.dialect.name == "mssql"
+    stddev = func.stdev if is_mssql else func.stddev_samp
+
+    aggregates = [func.count().label("row_count")]
+    for i, name in enumerate(numeric):
+        col = source.c[name]
+        aggregates += [
+            func.count(col).label(f"c{i}_count"),
+            func.count(col.distinct()).label(f"c{i}_distinct"),
+            func.avg(cast(col, Float)).label(f"c{i}_mean"),
+            stddev(cast(col, Float)).label(f"c{i}_std"),
+            func.min(col).label(f"c{i}_min"),
+            func.max(col).label(f"c{i}_max"),
+        ]
+        if not is_mssql:
+            aggregates += [
+                func.percentile_cont(q).within_group(col).label(f"c{i}_{key}")
+                for key, q in QUANTILES.items()
+            ]
+    for i, col_info in enumerate(other):
+        col = source.c[col_info["name"]]
+        aggregates.append(func.count(col).label(f"o{i}_count"))
+        if _is_comparable_type(col_info["type"], engine.dialect.name):
+            aggregates += [
+                func.count(col.distinct()).label(f"o{i}_distinct"),
+                func.min(col).label(f"o{i}_min"),
+                func.max(col).label(f"o{i}_max"),
+            ]
+
+    with engine.connect() as connection:
+        result = dict(connection.execute(select(*aggregates).select_from(source)).mappings().one())
+        if is_mssql:
+            # Una consulta por columna: la ventana OVER () se evalúa sobre todas las filas,
+            # DISTINCT TOP 1 devuelve una sola fila en lugar de repetir el valor por fila
+            for i, name in enumerate(numeric):
+                percentiles = [
+                    func.percentile_cont(q).within_group(source.c[name]).over().label(f"c{i}_{key}")
+                    for key, q in QUANTILES.items()
+                ]
+                query = select(*percentiles).select_from(source).distinct().limit(1)
+                row = connection.execute(query).mappings().first()
+                result.update(dict(row or {}))
+
+    summary = {
+        name: {stat: result.get(f"c{i}_{stat}") for stat in STAT_ROWS}
+        for i, name in enumerate(numeric)
+    }
+    for i, col_info in enumerate(other):
+        summary[col_info["name"]] = {stat: result.get(f"o{i}_{stat}")
+                                     for stat in ("count", "distinct", "min", "max")}
+    return TableSummary(int(result["row_count"]), dtypes, summary)
+
+
+def summarize_mongo_collection(
+    collection,
+    sample_size: int = 1000,
+    plan: Optional[ReadPlan] = None
+) -> TableSummary:
+    """Resumen de una colección con un único pipeline $facet/$group en el servidor.
+
+    Los campos y sus tipos se descubren con $sample; los percentiles usan
+    $percentile cuando el servidor es MongoDB 7.0 o superior. El filtro y
+    la proyección de un `plan` se aplican al inicio del pipeline.
+    """
+    prefix: List[Dict[str, Any]] = []
+    if plan is not None and not plan.is_empty:
+        if plan.filters:
+            prefix.append({"$match": plan.mongo_filter()})
+        if plan.mongo_projection():
+            prefix.append({"$project": plan.mongo_projection()})
+
+    dtypes: Dict[str, str] = {}
+    for document in collection.aggregate(prefix + [{"$sample": {"size": sample_size}}]):
+        for key, value in document.items():
+            if value is not None and dtypes.get(key) in (None, "NoneType"):
+                dtypes[key] = type(value).__name__
+            dtypes.setdefault(key, "NoneType")
+    numeric = [key for key, kind in dtypes.items() if kind in ("int", "float", "Int64", "Decimal128")]
+
+    version = collection.database.client.server_info().get("versionArray", [0])
+    has_percentile = version[0] >= 7
+
+    facets: Dict[str, Any] = {"rows": [{"$count": "n"}]}
+    for i, name in enumerate(numeric):
+        field = f"${name}"
+        group = {
+            "_id": None,
+            "count": {"$sum": 1},
+            "mean": {"$avg": field},
+            "std": {"$stdDevSamp": field},
+            "min": {"$min": field},
+            "max": {"$max": field},
+        }
+        if has_percentile:
+            group["quantiles"] = {"$percentile": {"input": field, "p": list(QUANTILES.values()),
+                                                  "method": "approximate"}}
+        facets[f"c{i}"] = [{"$match": {name: {"$type": "number"}}}, {"$group": group}]
+
+    result = next(collection.aggregate(prefix + [{"$facet": facets}]), {})
+    rows = result.get("rows", [{}])
+    summary = {}
+    for i, name in enumerate(numeric):
+        values = (result.get(f"c{i}") or [{}])[0]
+        quantiles = values.get("quantiles") or [None] * len(QUANTILES)
+        summary[name] = {stat: values.get(stat) for stat in STAT_ROWS if stat in values}
+        summary[name].update(dict(zip(QUANTILES, quantiles)))
+    return TableSummary(rows[0].get("n", 0) if rows else 0, dtypes, summary)
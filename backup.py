@@ -0,0 +1,248 @@
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config import (BACKUP_COMPRESSION, BACKUP_DIR, BACKUP_JOBS, BACKUP_PROGRESS_INTERVAL, PG_DUMP_BINARY,
+                    PG_RESTORE_BINARY, STATE_DB_PATH, DatabaseConfig)
+
+logger = logging.getLogger(__name__)
+
+# Recibe los segundos transcurridos y los bytes escritos (None si no se miden);
+# puede lanzar una excepción (p. ej. JobCancelled) para detener la herramienta
+ProgressCallback = Callable[[float, Optional[int]], None]
+
+
+@dataclass
+class BackupResult:
+    """Resultado de una copia o restauración para los logs y el historial"""
+    operation: str
+    database: str
+    path: str
+    bytes: int = 0
+    seconds: float = 0.0
+    jobs: int = 1
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    @property
+    def rate(self) -> float:
+        """Bytes por segundo"""
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        if not self.success:
+            return f"{self.operation} de {self.database}: error tras {self.seconds:.2f}s: {self.error}"
+        return (f"{self.operation} de {self.database}: {_megabytes(self.bytes):.1f} MB en {self.seconds:.2f}s "
+                f"({_megabytes(self.rate):.1f} MB/s, {self.jobs} jobs) -> {self.path}")
+
+
+def _megabytes(value: float) -> float:
+    return value / (1024 * 1024)
+
+
+def _jobs(jobs: Optional[int]) -> int:
+    return jobs or os.cpu_count() or 1
+
+
+class BackupHistory:
+    """Duración y tamaño de cada copia en la misma base SQLite local que los watermarks"""
+
+    def __init__(self, path: str = STATE_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS backups ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " operation TEXT NOT NULL,"
+                " database TEXT NOT NULL,"
+                " path TEXT NOT NULL,"
+                " bytes INTEGER NOT NULL,"
+                " seconds REAL NOT NULL,"
+                " jobs INTEGER NOT NULL,"
+                " error TEXT,"
+                " finished_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def record(self, result: BackupResult):
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT INTO backups (operation, database, path, bytes, seconds, jobs, error, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (result.operation, result.database, result.path, result.bytes, result.seconds, result.jobs,
+                 result.error, time.time())
+            )
+
+    def recent(self, database: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Últimas ejecuciones, de la más reciente a la más antigua"""
+        query = "SELECT operation, database, path, bytes, seconds, jobs, error, finished_at FROM backups"
+        params: tuple = ()
+        if database is not None:
+            query += " WHERE database = ?"
+            params = (database,)
+        with self._lock, self._connect() as connection:
+            rows = connection.execute(query + " ORDER BY id DESC LIMIT ?", params + (limit,)).fetchall()
+        columns = ("operation", "database", "path", "bytes", "seconds", "jobs", "error", "finished_at")
+        return [dict(zip(columns, row)) for row in rows]
+
+
+def directory_size(path: str) -> int:
+    """Bytes de los archivos de un volcado en formato directorio (no tiene subdirectorios)"""
+    try:
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+    except FileNotFoundError:
+        return 0
+
+
+def _connection_args(config: DatabaseConfig) -> List[str]:
+    # La contraseña va en PGPASSWORD, nunca en la línea de órdenes
+    return ["-h", config.host, "-p", str(config.port), "-U", config.username, "-d", config.database]
+
+
+def pg_dump_command(config: DatabaseConfig, output_dir: str, jobs: int,
+                    compression: str = BACKUP_COMPRESSION) -> List[str]:
+    return [PG_DUMP_BINARY, *_connection_args(config), "--format=directory", f"--jobs={jobs}",
+            f"--compress={compression}", f"--file={output_dir}", "--verbose"]
+
+
+def pg_restore_command(config: DatabaseConfig, backup_dir: str, jobs: int) -> List[str]:
+    return [PG_RESTORE_BINARY, *_connection_args(config), "--format=directory", f"--jobs={jobs}",
+            "--clean", "--if-exists", "--no-owner", "--verbose", backup_dir]
+
+
+def _run_tool(
+    command: List[str],
+    password: str,
+    measure: Optional[Callable[[], int]] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    interval: float = BACKUP_PROGRESS_INTERVAL
+):
+    """Ejecutar pg_dump/pg_restore sin acumular su salida y medir el avance cada `interval` segundos.
+
+    Los datos van directamente a disco; de stderr solo se guardan las
+    últimas líneas para el mensaje de error. Si `on_progress` lanza una
+    excepción, el proceso se termina y la excepción se propaga.
+    """
+    env = {**os.environ, "PGPASSWORD": password}
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                   env=env, text=True, errors="replace")
+    except FileNotFoundError:
+        raise RuntimeError(f"No se encontró {command[0]}; instala el cliente de PostgreSQL "
+                           f"(de la versión del servidor o posterior)")
+
+    tail: deque = deque(maxlen=20)
+
+    def read_stderr():
+        for line in process.stderr:
+            line = line.rstrip()
+            tail.append(line)
+            logger.debug(line)
+
+    reader = threading.Thread(target=read_stderr, name=f"{os.path.basename(command[0])}-stderr", daemon=True)
+    reader.start()
+    start = time.perf_counter()
+    try:
+        while True:
+            try:
+                process.wait(timeout=interval)
+                break
+            except subprocess.TimeoutExpired:
+                if on_progress is not None:
+                    on_progress(time.perf_counter() - start, measure() if measure else None)
+    except BaseException:
+        process.terminate()
+        process.wait()
+        raise
+    finally:
+        reader.join()
+
+    if process.returncode != 0:
+        errors = [line for line in tail if "error" in line.lower()] or list(tail)
+        raise RuntimeError("\n".join(errors[-5:]) or f"{command[0]} terminó con código {process.returncode}")
+
+
+def backup_postgres(
+    config: DatabaseConfig,
+    backup_dir: str = BACKUP_DIR,
+    jobs: Optional[int] = BACKUP_JOBS,
+    compression: str = BACKUP_COMPRESSION,
+    on_progress: Optional[ProgressCallback] = None,
+    history: Optional[BackupHistory] = None
+) -> BackupResult:
+    """Copia de PostgreSQL con pg_dump en formato directorio, comprimida y en paralelo.
+
+    Con `--jobs` pg_dump vuelca varias tablas a la vez, cada una en su
+    propio archivo comprimido, así que la duración baja casi en proporción
+    a los núcleos mientras haya tablas grandes que repartir. Si pg_dump
+    falla, el resultado lleva el error y el directorio incompleto se borra;
+    una cancelación desde `on_progress` se propaga. Cada ejecución queda
+    en el historial.
+    """
+    jobs = _jobs(jobs)
+    os.makedirs(backup_dir, exist_ok=True)
+    output_dir = os.path.join(backup_dir, f"backup_postgres_{config.database}_{datetime.now():%Y%m%d_%H%M%S}")
+    result = BackupResult("Backup", config.database, output_dir, jobs=jobs)
+    logger.info(f"Backup de {config.database} en {output_dir} con {jobs} jobs (compresión {compression})")
+
+    start = time.perf_counter()
+    try:
+        _run_tool(pg_dump_command(config, output_dir, jobs, compression), config.password,
+                  lambda: directory_size(output_dir), on_progress)
+    except RuntimeError as e:
+        result.error = str(e)
+    except BaseException:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        raise
+    finally:
+        result.seconds = time.perf_counter() - start
+
+    if result.success:
+        result.bytes = directory_size(output_dir)
+        logger.info(result.summary())
+    else:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        logger.error(result.summary())
+    (history or BackupHistory()).record(result)
+    return result
+
+
+def restore_postgres(
+    config: DatabaseConfig,
+    backup_dir: str,
+    jobs: Optional[int] = BACKUP_JOBS,
+    on_progress: Optional[ProgressCallback] = None,
+    history: Optional[BackupHistory] = None
+) -> BackupResult:
+    """Restaurar una copia en formato directorio con pg_restore en paralelo (reemplaza los objetos existentes)"""
+    if not os.path.isfile(os.path.join(backup_dir, "toc.dat")):
+        raise ValueError(f"{backup_dir} no es una copia de pg_dump en formato directorio")
+    jobs = _jobs(jobs)
+    result = BackupResult("Restauración", config.database, backup_dir, bytes=directory_size(backup_dir), jobs=jobs)
+
+    start = time.perf_counter()
+    try:
+        _run_tool(pg_restore_command(config, backup_dir, jobs), config.password, on_progress=on_progress)
+    except RuntimeError as e:
+        result.error = str(e)
+    finally:
+        result.seconds = time.perf_counter() - start
+
+    (logger.info if result.success else logger.error)(result.summary())
+    (history or BackupHistory()).record(result)
+    return result
@@ -24,10 +24,17 @@ SQLSERVER_CONTAINER="sqlserver"
 MONGODB_CONTAINER="mongodb"
 POSTGRES_USER="my_user"
 POSTGRES_DB="my_database"
+POSTGRES_PASSWORD="Batmanlol1"
+POSTGRES_PORT="5433"
 SQLSERVER_DB="TestDB"
 SQLSERVER_PASSWORD="Batmanlol1"
+SQLSERVER_PORT="1433"
 MONGODB_PASSWORD="Batmanlol1"
 MONGODB_USER="root"
+MONGODB_PORT="27017"
+POSTGRES_BACKUP_COMPRESSION="6"  # nivel gzip de pg_dump -Z (0-9)
+POSTGRES_BACKUP_JOBS=""  # procesos de pg_dump/pg_restore -j (vacío = núcleos del contenedor)
+BACKUP_TIMINGS_FILE="$LOG_DIR/backup_timings.csv"  # fecha,motor,backup,bytes,segundos pg_dump,segundos total,jobs
 
 # Crear directorios si no existen
 mkdir -p "$BACKUP_DIR" "$EXPORT_DIR" "$LOG_DIR"
@@ -130,13 +137,36 @@ function check_containers() {
 }
 
 function backup_postgres() {
-    local backup_file="$BACKUP_DIR/backup_postgres_$(date +%Y%m%d).sql"
-    echo -e "${green}Realizando backup de PostgreSQL...${reset}"
-    if docker exec "$POSTGRES_CONTAINER" pg_dump -U "$POSTGRES_USER" -d "$POSTGRES_DB" > "$backup_file"; then
-        log_operation "Backup de PostgreSQL completado: $backup_file"
-    else
+    local name="backup_postgres_${POSTGRES_DB}_$(date +%Y%m%d_%H%M%S)"
+    local container_dir="/tmp/$name"
+    local jobs="${POSTGRES_BACKUP_JOBS:-$(docker exec "$POSTGRES_CONTAINER" nproc)}"
+    echo -e "${green}Realizando backup de PostgreSQL ($jobs jobs, compresión $POSTGRES_BACKUP_COMPRESSION)...${reset}"
+
+    # Formato directorio: cada tabla se vuelca comprimida en su propio archivo
+    # y -j reparte las tablas entre varios procesos
+    local start=$(date +%s.%N)
+    if ! docker exec "$POSTGRES_CONTAINER" pg_dump -U "$POSTGRES_USER" -d "$POSTGRES_DB" \
+        --format=directory --jobs="$jobs" --compress="$POSTGRES_BACKUP_COMPRESSION" --file="$container_dir"; then
+        docker exec "$POSTGRES_CONTAINER" rm -rf "$container_dir"
         error_log "Error al realizar backup de PostgreSQL"
+        return 1
     fi
+    local dump_end=$(date +%s.%N)
+    docker cp "$POSTGRES_CONTAINER:$container_dir" "$BACKUP_DIR/$name" > /dev/null
+    local copied=$?
+    docker exec "$POSTGRES_CONTAINER" rm -rf "$container_dir"
+    if [ $copied -ne 0 ]; then
+        error_log "Error al copiar el backup de PostgreSQL al host"
+        return 1
+    fi
+    local end=$(date +%s.%N)
+
+    local bytes=$(du -sb "$BACKUP_DIR/$name" | cut -f1)
+    local dump_seconds=$(awk "BEGIN {printf \"%.2f\", $dump_end - $start}")
+    local total_seconds=$(awk "BEGIN {printf \"%.2f\", $end - $start}")
+    local rate=$(awk "BEGIN {printf \"%.1f\", $bytes / 1048576 / ($dump_end - $start)}")
+    echo "$(date '+%Y-%m-%d %H:%M:%S'),postgres,$name,$bytes,$dump_seconds,$total_seconds,$jobs" >> "$BACKUP_TIMINGS_FILE"
+    log_operation "Backup de PostgreSQL completado: $BACKUP_DIR/$name ($((bytes / 1048576)) MB, pg_dump ${dump_seconds}s a $rate MB/s, total ${total_seconds}s)"
 }
 
 function backup_sqlserver() {
@@ -213,9 +243,26 @@ function backup_mongodb() {
 }
 
 function restore_postgres() {
-    local backup_file="$BACKUP_DIR/$(ls -t "$BACKUP_DIR" | grep -E '\.sql$' | head -n 1)"
-
-    if [ -f "$backup_file" ]; then
+    local latest="$(ls -t "$BACKUP_DIR" | grep -E '^backup_postgres_|\.sql$' | head -n 1)"
+    local backup_file="${1:-$BACKUP_DIR/$latest}"
+
+    if [ -z "$1" ] && [ -z "$latest" ]; then
+        error_log "No se encontró ningún backup de PostgreSQL en $BACKUP_DIR"
+    elif [ -d "$backup_file" ]; then
+        # Copia en formato directorio: pg_restore en paralelo
+        local container_dir="/tmp/$(basename "$backup_file")"
+        local jobs="${POSTGRES_BACKUP_JOBS:-$(docker exec "$POSTGRES_CONTAINER" nproc)}"
+        echo -e "${green}Restaurando PostgreSQL desde $backup_file ($jobs jobs)...${reset}"
+        docker cp "$backup_file" "$POSTGRES_CONTAINER:$container_dir" > /dev/null
+        local start=$(date +%s)
+        if docker exec "$POSTGRES_CONTAINER" pg_restore -U "$POSTGRES_USER" -d "$POSTGRES_DB" \
+            --format=directory --jobs="$jobs" --clean --if-exists --no-owner "$container_dir"; then
+            log_operation "Restauración de PostgreSQL completada desde $backup_file en $(( $(date +%s) - start ))s"
+        else
+            error_log "Error al restaurar PostgreSQL"
+        fi
+        docker exec "$POSTGRES_CONTAINER" rm -rf "$container_dir"
+    elif [ -f "$backup_file" ]; then
         echo -e "${green}Restaurando PostgreSQL desde $backup_file...${reset}"
         if docker exec -i "$POSTGRES_CONTAINER" psql -U "$POSTGRES_USER" -d "$POSTGRES_DB" < "$backup_file"; then
             log_operation "Restauración de PostgreSQL completada desde $backup_file"
@@ -223,7 +270,7 @@ function restore_postgres() {
             error_log "Error al restaurar PostgreSQL"
         fi
     else
-        error_log "No se encontró ningún archivo de backup (.sql) en $BACKUP_DIR"
+        error_log "No se encontró ningún backup de PostgreSQL en $BACKUP_DIR"
     fi
 }
 
@@ -305,15 +352,19 @@ function import_csv_postgres() {
     if [[ "$table_exists" == *"f"* ]]; then
         echo -e "${green}La tabla no existe. Creando tabla en PostgreSQL...${reset}"
 
-        # Generar la consulta CREATE TABLE
-        create_table_sql="CREATE TABLE $table ("
-        for column in "${columns[@]}"; do
-            # Limpiar el nombre de la columna (eliminar comillas y espacios)
-            column=$(echo "$column" | tr -d '"' | tr -d '\r' | xargs)
-            # Asignar un tipo de dato predeterminado (por ejemplo, VARCHAR)
-            create_table_sql+="$column VARCHAR, "
-        done
-        create_table_sql="${create_table_sql%, });"
+        # Generar la consulta CREATE TABLE con tipos inferidos de una muestra del CSV
+        schema_script="$(dirname "${BASH_SOURCE[0]}")/../schema_inference.py"
+        if ! create_table_sql=$(python3 "$schema_script" "$file" --table "${table,,}" 2>/dev/null); then
+            warning_log "No se pudieron inferir los tipos; se usará VARCHAR para todas las columnas."
+            create_table_sql="CREATE TABLE $table ("
+            for column in "${columns[@]}"; do
+                # Limpiar el nombre de la columna (eliminar comillas y espacios)
+                column=$(echo "$column" | tr -d '"' | tr -d '\r' | xargs)
+                # Asignar un tipo de dato predeterminado (por ejemplo, VARCHAR)
+                create_table_sql+="$column VARCHAR, "
+            done
+            create_table_sql="${create_table_sql%, });"
+        fi
 
         # Crear la tabla en PostgreSQL
         if ! docker exec -i "$POSTGRES_CONTAINER" psql -U "$POSTGRES_USER" -d "$POSTGRES_DB" \
@@ -513,37 +564,35 @@ function migrate_postgres_to_sqlserver() {
 function migrate_sqlserver_to_postgres() {
     echo -n "Ingresa el nombre de la tabla en SQL Server a migrar: "
     read table
-    local temp_csv="$EXPORT_DIR/migration_sqlserver_to_postgres.csv"
-
-    # Exportar datos desde SQL Server
-    echo -e "${green}Exportando datos desde SQL Server...${reset}"
-    if ! docker exec "$SQLSERVER_CONTAINER" /opt/mssql-tools/bin/bcp "SELECT * FROM $SQLSERVER_DB.dbo.$table" \
-        queryout "/var/opt/mssql/backup/migration.csv" -c -t',' -S localhost -U SA -P "$SQLSERVER_PASSWORD" -C; then
-        error_log "Error al exportar datos desde SQL Server"
-        return 1
-    fi
-    docker cp "$SQLSERVER_CONTAINER:/var/opt/mssql/backup/migration.csv" "$temp_csv"
-
-    # Verificar que la tabla existe en PostgreSQL y crear si no existe
-    echo -e "${green}Verificando tabla en PostgreSQL...${reset}"
-    if ! docker exec -i "$POSTGRES_CONTAINER" psql -U "$POSTGRES_USER" -d "$POSTGRES_DB" \
-        -c "SELECT 1 FROM information_schema.tables WHERE table_name = '$table'" | grep -q 1; then
-        if ! docker exec -i "$POSTGRES_CONTAINER" psql -U "$POSTGRES_USER" -d "$POSTGRES_DB" \
-            -c "CREATE TABLE $table (id SERIAL PRIMARY KEY);"; then
-            error_log "Error al crear la tabla en PostgreSQL"
-            return 1
-        fi
-    fi
+    local job_file="$EXPORT_DIR/migration_sqlserver_to_postgres.json"
+    local summary_file="$EXPORT_DIR/migration_sqlserver_to_postgres_summary.json"
+    local etl_cli="$(dirname "${BASH_SOURCE[0]}")/../etl_cli.py"
+
+    # Leer SQL Server por lotes y cargar PostgreSQL con COPY en el mismo proceso:
+    # la tabla se crea con tipos equivalentes y no hay CSV intermedios ni docker cp.
+    # Cada lote deja un checkpoint: si falla, repetir la opción continúa desde él
+    cat > "$job_file" <<EOF
+{
+    "name": "sqlserver_to_postgres_$table",
+    "type": "migration",
+    "direction": "sqlserver_to_postgres",
+    "tables": ["$table"],
+    "resumable": true,
+    "source": {"connection": {"host": "localhost", "port": "$SQLSERVER_PORT", "database": "$SQLSERVER_DB",
+                              "username": "SA", "password": "\${SQLSERVER_PASSWORD}"}},
+    "target": {"connection": {"host": "localhost", "port": "$POSTGRES_PORT", "database": "$POSTGRES_DB",
+                              "username": "$POSTGRES_USER", "password": "\${POSTGRES_PASSWORD}"}}
+}
+EOF
 
-    # Importar datos a PostgreSQL
-    echo -e "${green}Importando datos a PostgreSQL...${reset}"
-    docker cp "$temp_csv" "$POSTGRES_CONTAINER:/tmp/"
-    if docker exec -i "$POSTGRES_CONTAINER" psql -U "$POSTGRES_USER" -d "$POSTGRES_DB" \
-        -c "\\COPY $table FROM '/tmp/migration.csv' WITH CSV HEADER;"; then
+    echo -e "${green}Migrando $table de SQL Server a PostgreSQL...${reset}"
+    if SQLSERVER_PASSWORD="$SQLSERVER_PASSWORD" POSTGRES_PASSWORD="$POSTGRES_PASSWORD" \
+        python3 "$etl_cli" "$job_file" --summary "$summary_file"; then
         log_operation "Migración de SQL Server a PostgreSQL completada para la tabla $table."
     else
-        error_log "Error al importar datos a PostgreSQL"
+        error_log "Error al migrar la tabla $table. Revisa $summary_file"
     fi
+    rm -f "$job_file"
 }
 
 function migrate_postgres_to_mongo() {
@@ -551,101 +600,44 @@ function migrate_postgres_to_mongo() {
     read table
     echo -n "Ingresa el nombre de la colección en MongoDB: "
     read collection
-    local temp_csv="$EXPORT_DIR/migration_postgres_to_mongo.csv"
-
-    # Verificar conexión a PostgreSQL
-    echo -e "${green}Verificando conexión a PostgreSQL...${reset}"
-    if ! docker exec -i "$POSTGRES_CONTAINER" psql -U "$POSTGRES_USER" -d "$POSTGRES_DB" -c "\q"; then
-        error_log "No se puede conectar a PostgreSQL"
-        return 1
-    fi
-
-    # Verificar conexión a MongoDB con credenciales
-    echo -e "${green}Verificando conexión a MongoDB...${reset}"
-    if ! docker exec -i "$MONGODB_CONTAINER" mongosh --quiet \
-        --username "$MONGODB_USER" \
-        --password "$MONGODB_PASSWORD" \
-        --authenticationDatabase "admin" \
-        --eval "db.adminCommand('ping')"; then
-        error_log "No se puede conectar a MongoDB"
-        return 1
-    fi
-
-    # Verificar que la tabla existe en PostgreSQL
-    echo -e "${green}Verificando si la tabla existe en PostgreSQL...${reset}"
-    if ! docker exec -i "$POSTGRES_CONTAINER" psql -U "$POSTGRES_USER" -d "$POSTGRES_DB" \
-        -t -c "SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = '$table');" | grep -q t; then
-        error_log "La tabla $table no existe en PostgreSQL"
-        return 1
-    fi
-
-    # Exportar datos desde PostgreSQL
-    echo -e "${green}Exportando datos desde PostgreSQL...${reset}"
-    if ! docker exec -i "$POSTGRES_CONTAINER" psql -U "$POSTGRES_USER" -d "$POSTGRES_DB" \
-        -c "\\COPY $table TO '/tmp/migration.csv' WITH CSV HEADER;"; then
-        error_log "Error al exportar datos desde PostgreSQL"
-        return 1
-    fi
-
-    # Copiar el archivo CSV al host
-    if ! docker cp "$POSTGRES_CONTAINER:/tmp/migration.csv" "$temp_csv"; then
-        error_log "Error al copiar el archivo CSV desde PostgreSQL"
-        return 1
-    fi
-
-    # Verificar que el archivo CSV se generó correctamente
-    if [ ! -f "$temp_csv" ]; then
-        error_log "No se generó el archivo CSV correctamente"
-        return 1
-    fi
-
-    # Copiar el archivo CSV al contenedor de MongoDB
-    echo -e "${green}Copiando archivo CSV a MongoDB...${reset}"
-    if ! docker cp "$temp_csv" "$MONGODB_CONTAINER:/tmp/migration.csv"; then
-        error_log "Error al copiar el archivo CSV a MongoDB"
-        return 1
-    fi
-
-    # Importar datos a MongoDB con autenticación
-    echo -e "${green}Importando datos a MongoDB...${reset}"
-    if docker exec "$MONGODB_CONTAINER" mongoimport \
-        --username "$MONGODB_USER" \
-        --password "$MONGODB_PASSWORD" \
-        --authenticationDatabase "admin" \
-        --db "$MONGODB_DB" \
-        --collection "$collection" \
-        --type csv \
-        --file "/tmp/migration.csv" \
-        --headerline; then
+    local job_file="$EXPORT_DIR/migration_postgres_to_mongo.json"
+    local summary_file="$EXPORT_DIR/migration_postgres_to_mongo_summary.json"
+    local etl_cli="$(dirname "${BASH_SOURCE[0]}")/../etl_cli.py"
+
+    # Leer PostgreSQL con un cursor de servidor e insertar documentos con sus tipos
+    # (números, booleanos, fechas, NULL) en lugar de pasar por CSV y mongoimport
+    cat > "$job_file" <<EOF
+{
+    "name": "postgres_to_mongo_$table",
+    "type": "migration",
+    "direction": "postgres_to_mongodb",
+    "tables": ["$table"],
+    "collections": {"$table": "$collection"},
+    "source": {"connection": {"host": "localhost", "port": "$POSTGRES_PORT", "database": "$POSTGRES_DB",
+                              "username": "$POSTGRES_USER", "password": "\${POSTGRES_PASSWORD}"}},
+    "target": {"connection": {"host": "localhost", "port": "$MONGODB_PORT", "database": "${MONGODB_DB:-test}",
+                              "username": "$MONGODB_USER", "password": "\${MONGODB_PASSWORD}"}}
+}
+EOF
 
+    echo -e "${green}Migrando $table de PostgreSQL a la colección $collection de MongoDB...${reset}"
+    if POSTGRES_PASSWORD="$POSTGRES_PASSWORD" MONGODB_PASSWORD="$MONGODB_PASSWORD" \
+        python3 "$etl_cli" "$job_file" --summary "$summary_file"; then
         log_operation "Migración de PostgreSQL a MongoDB completada: tabla '$table' a colección '$collection'"
-
-        # Mostrar conteo de documentos importados
-        echo -e "${green}Verificando cantidad de documentos importados...${reset}"
-        docker exec "$MONGODB_CONTAINER" mongosh --quiet \
-            --username "$MONGODB_USER" \
-            --password "$MONGODB_PASSWORD" \
-            --authenticationDatabase "admin" \
-            --eval "db.${collection}.count()" "$MONGODB_DB"
     else
-        error_log "Error al importar datos a MongoDB"
-        return 1
+        error_log "Error al migrar la tabla $table a MongoDB. Revisa $summary_file"
     fi
-
-    # Limpiar archivos temporales
-    echo -e "${green}Limpiando archivos temporales...${reset}"
-    rm -f "$temp_csv"
-    docker exec "$MONGODB_CONTAINER" rm -f "/tmp/migration.csv"
-    docker exec "$POSTGRES_CONTAINER" rm -f "/tmp/migration.csv"
+    rm -f "$job_file"
 }
 
 function upload_postgres_backup_to_gcloud() {
-    local backup_file="$BACKUP_DIR/$(ls -t "$BACKUP_DIR" | grep -E 'backup_postgres_.*\.sql$' | head -n 1)"
+    local latest="$(ls -t "$BACKUP_DIR" | grep -E '^backup_postgres_' | head -n 1)"
+    local backup_file="$BACKUP_DIR/$latest"
     local bucket_name="backups-postgres_ubuntu"  # Nombre del bucket para PostgreSQL
 
-    if [ -f "$backup_file" ]; then
+    if [ -n "$latest" ]; then
         echo -e "${green}Subiendo $backup_file a Google Cloud Storage...${reset}"
-        if gsutil cp "$backup_file" "gs://$bucket_name/$(basename "$backup_file")"; then
+        if gsutil -m cp -r "$backup_file" "gs://$bucket_name/$(basename "$backup_file")"; then
             log_operation "Backup de PostgreSQL subido exitosamente a Google Cloud Storage: $backup_file"
         else
             error_log "Error al subir $backup_file a Google Cloud Storage"
@@ -662,7 +654,7 @@ function restore_postgres_from_gcloud() {
     local backup_file="$BACKUP_DIR/$file_name"
 
     echo -e "${green}Descargando $file_name desde Google Cloud Storage...${reset}"
-    if gsutil cp "gs://$bucket_name/$file_name" "$backup_file"; then
+    if gsutil -m cp -r "gs://$bucket_name/$file_name" "$backup_file"; then
         log_operation "Archivo $file_name descargado exitosamente desde Google Cloud Storage."
         restore_postgres "$backup_file"
     else
@@ -0,0 +1,81 @@
+"""Benchmark: consultas de estado de Docker agrupadas y cacheadas.
+
+Uso:
+    python benchmarks/bench_docker_status.py --concurrency 10 --ttl 0.5
+
+Usa benchmarks/fake_docker.py como ejecutable de docker y cuenta sus
+llamadas: `--concurrency` snapshots simultáneos deben resolverse con un
+único `docker ps`, uno posterior dentro del TTL no debe llamar a docker
+y otro pasado el TTL debe volver a consultarlo. Termina con código 1 si
+alguna de las comprobaciones falla.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DockerConfig  # noqa: E402
+from docker_manager import DockerManager, DockerStatusMonitor  # noqa: E402
+
+FAKE_DOCKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_docker.py")
+
+CONFIGS = {
+    "postgres": DockerConfig("postgres/docker-compose.yml", container_name="postgres_container"),
+    "sqlserver": DockerConfig("sqlServer/docker-compose.yml", container_name="sqlserver_container"),
+    "mongoDB": DockerConfig("mongoDB/docker-compose.yml", container_name="mongoDB_container"),
+}
+
+
+def calls(log_path: str) -> int:
+    with open(log_path, encoding="utf-8") as log:
+        return sum(1 for _ in log)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=10, help="snapshots lanzados a la vez")
+    parser.add_argument("--ttl", type=float, default=0.5, help="segundos de validez de la caché")
+    parser.add_argument("--delay", type=float, default=0.2, help="segundos que tarda cada llamada a docker")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "calls.log")
+        open(log_path, "w").close()
+        os.environ["FAKE_DOCKER_LOG"] = log_path
+        os.environ["FAKE_DOCKER_DELAY"] = str(args.delay)
+
+        manager = DockerManager(verify=False, docker_binary=FAKE_DOCKER)
+        monitor = DockerStatusMonitor(manager, CONFIGS, ttl=args.ttl)
+        failures = []
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            snapshots = list(executor.map(lambda _: monitor.snapshot(), range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+        print(f"{args.concurrency} snapshots simultáneos: {calls(log_path)} llamadas a docker en {elapsed:.2f}s")
+        if calls(log_path) != 1:
+            failures.append("los snapshots simultáneos no se agruparon en una sola consulta")
+        for name, status in snapshots[0].items():
+            print(f"  {name}: {status.state}")
+
+        monitor.snapshot()
+        if calls(log_path) != 1:
+            failures.append("un snapshot dentro del TTL volvió a llamar a docker")
+
+        time.sleep(args.ttl)
+        monitor.snapshot()
+        print(f"Tras el TTL: {calls(log_path)} llamadas a docker")
+        if calls(log_path) != 2:
+            failures.append("un snapshot pasado el TTL no volvió a consultar docker")
+
+    for failure in failures:
+        print(f"Fallo: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
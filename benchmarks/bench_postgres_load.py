@@ -0,0 +1,57 @@
+"""Benchmark: to_sql por defecto vs COPY FROM STDIN en PostgreSQL.
+
+Uso:
+    python benchmarks/bench_postgres_load.py --repeat 125   # ~1M filas
+
+Requiere el contenedor de PostgreSQL de bash/postgres en ejecución.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_loader import copy_to_postgres  # noqa: E402
+from config import DatabaseConfig  # noqa: E402
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "bash", "data", "Car_details.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", default="5433")
+    parser.add_argument("--database", default="my_database")
+    parser.add_argument("--username", default="my_user")
+    parser.add_argument("--password", default="Batmanlol1")
+    parser.add_argument("--repeat", type=int, default=1, help="veces que se replica el CSV base")
+    parser.add_argument("--skip-to-sql", action="store_true", help="omitir la medición con to_sql")
+    args = parser.parse_args()
+
+    config = DatabaseConfig(args.host, args.port, args.database, args.username, args.password, "bench_cars")
+    engine = create_engine(config.get_postgres_url())
+
+    df = pd.read_csv(CSV_PATH)
+    if args.repeat > 1:
+        df = pd.concat([df] * args.repeat, ignore_index=True)
+    print(f"Filas: {len(df)}")
+
+    if not args.skip_to_sql:
+        start = time.perf_counter()
+        df.to_sql("bench_cars_to_sql", engine, if_exists="replace", index=False)
+        elapsed = time.perf_counter() - start
+        print(f"to_sql: {elapsed:.2f}s ({len(df) / elapsed:,.0f} filas/s)")
+
+    rows, elapsed = copy_to_postgres(df, engine, "bench_cars_copy")
+    print(f"COPY:   {elapsed:.2f}s ({rows / elapsed:,.0f} filas/s)")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
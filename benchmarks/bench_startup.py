@@ -0,0 +1,95 @@
+"""Benchmark: tiempo de arranque de la interfaz (importaciones y primera pintura).
+
+Uso:
+    python benchmarks/bench_startup.py --repeat 5 --target 1.0
+
+Mide con `python -X importtime` lo que cuesta `import gui`, comprueba que
+las librerías pesadas no se cargan al arrancar y, si hay pantalla, el
+tiempo hasta que la ventana se pinta por primera vez. Termina con código
+1 si la mediana supera `--target` segundos.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que no deben importarse antes de la primera pintura
+HEAVY_MODULES = ["pandas", "numpy", "sqlalchemy", "pymongo", "pyarrow", "pyodbc", "pymssql", "psycopg2"]
+
+FIRST_PAINT = """
+import time
+start = time.perf_counter()
+import gui
+app = gui.EnhancedETLApp(run=False)
+app.app.update()
+print(time.perf_counter() - start)
+app.on_close()
+"""
+
+
+def import_times(module: str):
+    """Ejecutar `python -X importtime -c "import module"` y retornar (total, [(cumulativo, nombre)])"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative) / 1e6, name.rstrip()))
+    # Las importaciones de primer nivel no llevan sangría; su suma es el total
+    total = sum(seconds for seconds, name in entries if not name.startswith("  "))
+    return total, entries
+
+
+def first_paint(repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", FIRST_PAINT], cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        # Incluye el arranque del intérprete, que es lo que percibe el usuario
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="gui", help="módulo cuyo import se mide")
+    parser.add_argument("--repeat", type=int, default=5, help="arranques medidos")
+    parser.add_argument("--target", type=float, default=1.0, help="segundos máximos hasta la primera pintura")
+    parser.add_argument("--top", type=int, default=15, help="importaciones más costosas a mostrar")
+    args = parser.parse_args()
+
+    total, entries = import_times(args.module)
+    print(f"import {args.module}: {total:.3f}s")
+    for seconds, name in sorted(entries, reverse=True)[:args.top]:
+        print(f"  {seconds:8.3f}s  {name.strip()}")
+
+    loaded = {name.strip() for _, name in entries}
+    eager = [name for name in HEAVY_MODULES if name in loaded]
+    if eager:
+        print(f"Importados al arrancar (deberían ser perezosos): {', '.join(eager)}")
+
+    try:
+        times = first_paint(args.repeat)
+    except RuntimeError as e:
+        print(f"Primera pintura no medida: {e}")
+        return 1 if eager or total > args.target else 0
+
+    median = statistics.median(times)
+    print(f"Primera pintura: mediana {median:.3f}s, mín {min(times):.3f}s, máx {max(times):.3f}s "
+          f"({args.repeat} arranques, objetivo {args.target:.1f}s)")
+    return 1 if eager or median > args.target else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
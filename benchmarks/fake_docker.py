@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Sustituto de `docker` para medir DockerStatusMonitor sin un daemon.
+
+Uso:
+    ETL_DOCKER_BINARY=benchmarks/fake_docker.py python gui.py
+    python benchmarks/bench_docker_status.py
+
+Responde a `docker compose version`, `docker ps --format {{json .}}` y
+`docker compose ps` con contenedores ficticios: postgres_container en
+ejecución, sqlserver_container detenido y ninguno de MongoDB. Cada
+llamada se añade como una línea a FAKE_DOCKER_LOG (si está definida) y
+tarda FAKE_DOCKER_DELAY segundos, para que las consultas simultáneas se
+solapen como con el daemon real.
+"""
+import json
+import os
+import sys
+import time
+
+CONTAINERS = [
+    {"Names": "postgres_container", "State": "running", "Status": "Up 5 minutes",
+     "Labels": "com.docker.compose.project=postgres"},
+    {"Names": "sqlserver_container", "State": "exited", "Status": "Exited (0) 2 minutes ago",
+     "Labels": "com.docker.compose.project=sqlserver"},
+]
+
+
+def main(args):
+    log_path = os.environ.get("FAKE_DOCKER_LOG")
+    if log_path:
+        with open(log_path, "a", encoding="utf-8") as log:
+            log.write(" ".join(args) + "\n")
+    time.sleep(float(os.environ.get("FAKE_DOCKER_DELAY", "0.2")))
+
+    if args[:2] == ["compose", "version"]:
+        print("Docker Compose version v2.99.0-fake")
+    elif args[:1] == ["ps"]:
+        for container in CONTAINERS:
+            print(json.dumps(container))
+    elif args[:1] == ["compose"] and "ps" in args:
+        print("NAME                 STATUS")
+        print("postgres_container   Up 5 minutes")
+    elif args[:1] == ["compose"] and ("up" in args or "down" in args):
+        pass
+    else:
+        print(f"fake_docker: orden no soportada: {' '.join(args)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,465 @@
+import io
+import itertools
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+from pymongo import ASCENDING, UpdateOne
+from sqlalchemy import inspect, text
+
+from config import BULK_BATCH_SIZE, MONGO_BATCH_SIZE, MONGO_WRITE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+DataSource = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+# Se llama entre lotes y lanza una excepción (p. ej. JobCancelled) para detener la carga
+CancelCheck = Optional[Callable[[], None]]
+
+COPY_NULL = r"\N"  # marcador de NULL en los CSV enviados con COPY
+
+
+def quote_ident(name: str) -> str:
+    """Escapar un identificador SQL con comillas dobles"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def iter_batches(
+    data: DataSource,
+    batch_size: int = BULK_BATCH_SIZE,
+    check_cancelled: CancelCheck = None
+) -> Iterator[pd.DataFrame]:
+    """Dividir un DataFrame (o una secuencia de bloques) en lotes de tamaño acotado"""
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    for frame in frames:
+        for start in range(0, len(frame), batch_size):
+            if check_cancelled is not None:
+                check_cancelled()
+            yield frame.iloc[start:start + batch_size]
+
+
+def checked(items: Iterable[Any], check_cancelled: CancelCheck = None) -> Iterator[Any]:
+    """Recorrer `items` llamando a `check_cancelled` antes de cada elemento"""
+    for item in items:
+        if check_cancelled is not None:
+            check_cancelled()
+        yield item
+
+
+def with_template(data: DataSource) -> Tuple[Optional[pd.DataFrame], Iterable[pd.DataFrame]]:
+    """Columnas y tipos del primer bloque (sin filas) y los bloques completos.
+
+    Permite crear o reemplazar la tabla destino antes de cargar, también
+    cuando no llega ninguna fila. El primer elemento es None si no hay
+    ningún bloque.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data.head(0), [data]
+    frames = iter(data)
+    first = next(frames, None)
+    if first is None:
+        return None, []
+    return first.head(0), itertools.chain([first], frames)
+
+
+def _create_target(template: Optional[pd.DataFrame], engine, table_name: str, if_exists: str,
+                   column_types: Optional[Dict[str, Any]]):
+    """Crear (o reemplazar) la tabla antes del primer lote"""
+    if template is None:
+        if if_exists != "append":
+            raise ValueError(f"No hay datos de los que tomar las columnas de {table_name}")
+        return
+    template.to_sql(table_name, engine, if_exists=if_exists, index=False, dtype=column_types)
+
+
+def _supports_copy(engine) -> bool:
+    return engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+
+def _copy_batch(cursor, batch: pd.DataFrame, table_name: str):
+    """Enviar un lote a PostgreSQL mediante COPY FROM STDIN usando un buffer en memoria.
+
+    Los nulos se escriben como \\N: en CSV un campo vacío sería NULL y las
+    cadenas vacías se perderían.
+    """
+    buffer = io.StringIO()
+    batch.to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+    buffer.seek(0)
+    columns = ", ".join(quote_ident(col) for col in batch.columns)
+    cursor.copy_expert(
+        f"COPY {quote_ident(table_name)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        buffer
+    )
+
+
+def copy_to_postgres(
+    data: DataSource,
+    engine,
+    table_name: str,
+    if_exists: str = 'replace',
+    batch_size: int = BULK_BATCH_SIZE,
+    column_types: Optional[Dict[str, Any]] = None,
+    check_cancelled: CancelCheck = None
+) -> Tuple[int, float]:
+    """Carga masiva en PostgreSQL con COPY; usa to_sql si COPY no está disponible.
+
+    `column_types` (tipos SQLAlchemy por columna) define el DDL de la tabla
+    creada y `check_cancelled` se llama antes de cada lote. Retorna el
+    número de filas cargadas y los segundos transcurridos.
+    """
+    start = time.perf_counter()
+    rows = 0
+    # Crear (o reemplazar) la tabla a partir del esquema del primer bloque, aunque no traiga filas
+    template, data = with_template(data)
+    _create_target(template, engine, table_name, if_exists, column_types)
+
+    if not _supports_copy(engine):
+        logger.warning(f"COPY no disponible para el driver {engine.dialect.driver}; usando to_sql")
+        for batch in iter_batches(data, batch_size, check_cancelled):
+            batch.to_sql(table_name, engine, index=False, method='multi', chunksize=1000,
+                         if_exists='append', dtype=column_types)
+            rows += len(batch)
+        return rows, time.perf_counter() - start
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for batch in iter_batches(data, batch_size, check_cancelled):
+            _copy_batch(cursor, batch, table_name)
+            rows += len(batch)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"COPY a {table_name}: {rows} filas en {elapsed:.2f}s")
+    return rows, elapsed
+
+
+def merge_to_database(
+    data: DataSource,
+    engine,
+    table_name: str,
+    key_columns: Sequence[str],
+    batch_size: int = BULK_BATCH_SIZE
+) -> Tuple[int, float]:
+    """Upsert en PostgreSQL o SQL Server según el dialecto del engine"""
+    if not key_columns:
+        raise ValueError("El modo merge requiere al menos una columna clave")
+    if engine.dialect.name == "postgresql":
+        return merge_into_postgres(data, engine, table_name, key_columns, batch_size)
+    if engine.dialect.name == "mssql":
+        return merge_into_sqlserver(data, engine, table_name, key_columns, batch_size)
+    raise ValueError(f"Modo merge no soportado para {engine.dialect.name}")
+
+
+def _to_python_rows(batch: pd.DataFrame):
+    """Convertir un lote en tuplas con None en lugar de NaN/NaT"""
+    return batch.astype(object).where(batch.notna(), None).itertuples(index=False, name=None)
+
+
+def _column_ids(target_columns: Sequence[str], table_name: str, columns: Sequence[Any]) -> List[int]:
+    """Posición (desde 1) en la tabla destino de cada columna del lote, emparejadas por nombre.
+
+    bulk_copy asigna los valores por posición, así que una tabla existente
+    con otro orden de columnas recibiría cada valor en la columna equivocada.
+    """
+    exact = {name: i for i, name in enumerate(target_columns, start=1)}
+    # Con la intercalación por defecto SQL Server no distingue mayúsculas en los nombres
+    folded = {name.lower(): i for name, i in reversed(list(exact.items()))}
+    missing = [str(col) for col in columns if str(col) not in exact and str(col).lower() not in folded]
+    if missing:
+        raise ValueError(f"Columnas que no existen en la tabla {table_name}: {missing}")
+    return [exact.get(str(col), folded.get(str(col).lower())) for col in columns]
+
+
+def write_to_sqlserver(
+    data: DataSource,
+    engine,
+    table_name: str,
+    if_exists: str = 'replace',
+    batch_size: int = BULK_BATCH_SIZE,
+    column_types: Optional[Dict[str, Any]] = None,
+    check_cancelled: CancelCheck = None
+) -> Tuple[int, float]:
+    """Carga masiva en SQL Server.
+
+    Con el driver pymssql se usa bulk_copy (protocolo BCP); con pyodbc se
+    usa executemany por lotes, que es rápido cuando el engine se creó con
+    fast_executemany=True. Con BCP las columnas se emparejan por nombre
+    con las de la tabla y un lote con columnas que la tabla no tiene se
+    rechaza. `check_cancelled` se llama antes de cada lote. Retorna el
+    número de filas y los segundos.
+    """
+    start = time.perf_counter()
+    rows = 0
+    # Crear (o reemplazar) la tabla a partir del esquema del primer bloque, aunque no traiga filas
+    template, data = with_template(data)
+    _create_target(template, engine, table_name, if_exists, column_types)
+    use_bcp = engine.dialect.driver == "pymssql"
+
+    if use_bcp:
+        connection = engine.raw_connection()
+        dbapi_connection = getattr(connection, "dbapi_connection", connection)
+        use_bcp = hasattr(dbapi_connection, "bulk_copy")
+        if not use_bcp:
+            connection.close()
+
+    if not use_bcp:
+        if engine.dialect.driver == "pyodbc" and not getattr(engine.dialect, "fast_executemany", False):
+            logger.warning("Engine pyodbc sin fast_executemany; la carga será fila a fila")
+        for batch in iter_batches(data, batch_size, check_cancelled):
+            batch.to_sql(table_name, engine, index=False, chunksize=batch_size,
+                         if_exists='append', dtype=column_types)
+            rows += len(batch)
+    else:
+        try:
+            target_columns = [col["name"] for col in inspect(engine).get_columns(table_name)]
+            for batch in iter_batches(data, batch_size, check_cancelled):
+                dbapi_connection.bulk_copy(
+                    table_name,
+                    _to_python_rows(batch),
+                    column_ids=_column_ids(target_columns, table_name, batch.columns),
+                    batch_size=batch_size,
+                    tablock=True
+                )
+                rows += len(batch)
+            dbapi_connection.commit()
+        finally:
+            connection.close()
+
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed > 0 else 0
+    logger.info(f"Carga a SQL Server {table_name}: {rows} filas en {elapsed:.2f}s ({rate:,.0f} filas/s)")
+    return rows, elapsed
+
+
+def _merge_batches(data: DataSource, key_columns: Sequence[str], batch_size: int) -> Iterator[pd.DataFrame]:
+    """Lotes sin claves repetidas (un MERGE/ON CONFLICT no puede tocar una fila dos veces)"""
+    for batch in iter_batches(data, batch_size):
+        missing = [key for key in key_columns if key not in batch.columns]
+        if missing:
+            raise ValueError(f"Columnas clave ausentes en los datos: {missing}")
+        yield batch.drop_duplicates(subset=list(key_columns), keep="last")
+
+
+def _has_unique_key(connection, table_name: str, key_columns: Sequence[str]) -> bool:
+    """Comprobar si la clave primaria o algún índice/restricción única coincide con las claves"""
+    inspector = inspect(connection)
+    wanted = set(key_columns)
+    candidates = [inspector.get_pk_constraint(table_name).get("constrained_columns") or []]
+    candidates += [c["column_names"] for c in inspector.get_unique_constraints(table_name)]
+    candidates += [i["column_names"] for i in inspector.get_indexes(table_name) if i.get("unique")]
+    return any(set(columns) == wanted for columns in candidates)
+
+
+def merge_into_postgres(
+    data: DataSource,
+    engine,
+    table_name: str,
+    key_columns: Sequence[str],
+    batch_size: int = BULK_BATCH_SIZE
+) -> Tuple[int, float]:
+    """Upsert en PostgreSQL: COPY a una tabla temporal e INSERT ... ON CONFLICT DO UPDATE.
+
+    Si la tabla no existe se crea con un índice único sobre `key_columns`,
+    que ON CONFLICT necesita. Retorna las filas procesadas y los segundos.
+    """
+    start = time.perf_counter()
+    rows = 0
+    staging = f"_stg_{table_name}"[:63]
+    merge = None
+    keys = ", ".join(quote_ident(key) for key in key_columns)
+
+    with engine.begin() as connection:
+        for batch in _merge_batches(data, key_columns, batch_size):
+            if merge is None:
+                if not inspect(connection).has_table(table_name):
+                    batch.head(0).to_sql(table_name, connection, index=False)
+                if not _has_unique_key(connection, table_name, key_columns):
+                    connection.execute(text(
+                        f"CREATE UNIQUE INDEX IF NOT EXISTS {quote_ident(f'{table_name}_merge_key'[:63])} "
+                        f"ON {quote_ident(table_name)} ({keys})"
+                    ))
+                columns = ", ".join(quote_ident(col) for col in batch.columns)
+                connection.execute(text(
+                    f"CREATE TEMP TABLE {quote_ident(staging)} ON COMMIT DROP AS "
+                    f"SELECT {columns} FROM {quote_ident(table_name)} WITH NO DATA"
+                ))
+                updates = [col for col in batch.columns if col not in key_columns]
+                action = ("DO UPDATE SET " + ", ".join(
+                    f"{quote_ident(col)} = EXCLUDED.{quote_ident(col)}" for col in updates
+                )) if updates else "DO NOTHING"
+                merge = text(
+                    f"INSERT INTO {quote_ident(table_name)} ({columns}) "
+                    f"SELECT {columns} FROM {quote_ident(staging)} ON CONFLICT ({keys}) {action}"
+                )
+
+            if _supports_copy(engine):
+                _copy_batch(connection.connection.cursor(), batch, staging)
+            else:
+                batch.to_sql(staging, connection, index=False, if_exists="append", method="multi", chunksize=1000)
+            connection.execute(merge)
+            connection.execute(text(f"TRUNCATE {quote_ident(staging)}"))
+            rows += len(batch)
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Upsert en {table_name}: {rows} filas en {elapsed:.2f}s")
+    return rows, elapsed
+
+
+def merge_into_sqlserver(
+    data: DataSource,
+    engine,
+    table_name: str,
+    key_columns: Sequence[str],
+    batch_size: int = BULK_BATCH_SIZE
+) -> Tuple[int, float]:
+    """Upsert en SQL Server: carga por lotes a una tabla #temporal y un único MERGE por lote"""
+    start = time.perf_counter()
+    rows = 0
+    quote = engine.dialect.identifier_preparer.quote
+    staging = quote(f"#stg_{table_name}")
+    merge = None
+
+    with engine.begin() as connection:
+        for batch in _merge_batches(data, key_columns, batch_size):
+            if merge is None:
+                if not inspect(connection).has_table(table_name):
+                    batch.head(0).to_sql(table_name, connection, index=False)
+                if not _has_unique_key(connection, table_name, key_columns):
+                    # Sin índice sobre la clave cada MERGE recorrería la tabla completa
+                    connection.execute(text(
+                        f"CREATE UNIQUE INDEX {quote(f'{table_name}_merge_key')} ON {quote(table_name)} "
+                        f"({', '.join(quote(key) for key in key_columns)})"
+                    ))
+                columns = [quote(col) for col in batch.columns]
+                column_list = ", ".join(columns)
+                connection.execute(text(
+                    f"SELECT TOP 0 {column_list} INTO {staging} FROM {quote(table_name)}"
+                ))
+                insert = text(
+                    f"INSERT INTO {staging} ({column_list}) VALUES "
+                    f"({', '.join(f':p{i}' for i in range(len(columns)))})"
+                )
+                on = " AND ".join(f"t.{quote(key)} = s.{quote(key)}" for key in key_columns)
+                updates = [quote(col) for col in batch.columns if col not in key_columns]
+                matched = ("WHEN MATCHED THEN UPDATE SET "
+                           + ", ".join(f"t.{col} = s.{col}" for col in updates) + " ") if updates else ""
+                merge = text(
+                    f"MERGE {quote(table_name)} WITH (HOLDLOCK) AS t USING {staging} AS s ON {on} "
+                    f"{matched}WHEN NOT MATCHED THEN INSERT ({column_list}) "
+                    f"VALUES ({', '.join(f's.{col}' for col in columns)});"
+                )
+
+            params = [{f"p{i}": value for i, value in enumerate(row)} for row in _to_python_rows(batch)]
+            connection.execute(insert, params)
+            connection.execute(merge)
+            connection.execute(text(f"TRUNCATE TABLE {staging}"))
+            rows += len(batch)
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"MERGE en SQL Server {table_name}: {rows} filas en {elapsed:.2f}s")
+    return rows, elapsed
+
+
+def frame_to_documents(batch: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convertir un lote en documentos BSON columna a columna (sin iterar filas en pandas)"""
+    columns = [str(col) for col in batch.columns]
+    values = [
+        batch[col].astype(object).where(batch[col].notna(), None).tolist()
+        for col in batch.columns
+    ]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def write_to_mongo(
+    data: DataSource,
+    collection,
+    batch_size: int = MONGO_BATCH_SIZE,
+    workers: int = MONGO_WRITE_WORKERS
+) -> Tuple[int, float]:
+    """Insertar en MongoDB por lotes con insert_many(ordered=False).
+
+    Con workers > 1 se envían varios lotes en paralelo; como máximo hay
+    `workers` lotes convertidos en memoria a la vez.
+    """
+    start = time.perf_counter()
+
+    def insert(batch: pd.DataFrame) -> int:
+        documents = frame_to_documents(batch)
+        if not documents:
+            return 0
+        return len(collection.insert_many(documents, ordered=False).inserted_ids)
+
+    rows = run_batches(iter_batches(data, batch_size), insert, workers)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Carga a MongoDB {collection.name}: {rows} documentos en {elapsed:.2f}s")
+    return rows, elapsed
+
+
+def upsert_to_mongo(
+    data: DataSource,
+    collection,
+    key_columns: Sequence[str],
+    batch_size: int = MONGO_BATCH_SIZE,
+    workers: int = MONGO_WRITE_WORKERS
+) -> Tuple[int, float]:
+    """Upsert en MongoDB con bulk_write de UpdateOne(upsert=True) por lotes (ordered=False).
+
+    Se asegura un índice sobre las claves para que cada filtro no recorra la colección.
+    """
+    start = time.perf_counter()
+    if list(key_columns) != ["_id"]:
+        collection.create_index([(key, ASCENDING) for key in key_columns])
+
+    def upsert(batch: pd.DataFrame) -> int:
+        operations = []
+        for document in frame_to_documents(batch):
+            key = {name: document.pop(name) for name in key_columns}
+            # Los campos clave se copian solos al insertar; _id no puede ir en $set
+            update = {"$set": document} if document else {"$setOnInsert": key}
+            operations.append(UpdateOne(key, update, upsert=True))
+        if not operations:
+            return 0
+        result = collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.matched_count
+
+    rows = run_batches(_merge_batches(data, key_columns, batch_size), upsert, workers)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Upsert en MongoDB {collection.name}: {rows} documentos en {elapsed:.2f}s")
+    return rows, elapsed
+
+
+def run_batches(
+    batches: Iterable[Any],
+    write: Callable[[Any], int],
+    workers: int,
+    check_cancelled: CancelCheck = None
+) -> int:
+    """Escribir lotes con hasta `workers` en vuelo; como máximo hay `workers` lotes en memoria"""
+    rows = 0
+    if workers <= 1:
+        for batch in checked(batches, check_cancelled):
+            rows += write(batch)
+        return rows
+
+    finished = object()
+    batches = checked(batches, check_cancelled)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        while True:
+            # Esperar un hueco antes de materializar el siguiente lote
+            if len(pending) >= workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                rows += sum(future.result() for future in done)
+            batch = next(batches, finished)
+            if batch is finished:
+                break
+            pending.add(executor.submit(write, batch))
+        rows += sum(future.result() for future in pending)
+    return rows
@@ -0,0 +1,260 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import column, func, inspect, select, table
+
+from bulk_loader import CancelCheck, copy_to_postgres, iter_batches, write_to_mongo, write_to_sqlserver
+from config import BULK_BATCH_SIZE, STATE_DB_PATH, DatabaseConfig
+from incremental import decode_value, encode_value
+
+logger = logging.getLogger(__name__)
+
+# Escribe un lote y confirma su transacción; recibe el lote y "replace"/"append"
+BatchWriter = Callable[[pd.DataFrame, str], int]
+
+
+@dataclass
+class Checkpoint:
+    """Progreso confirmado de una carga.
+
+    En modo por clave `position` es la última clave confirmada; en modo por
+    desplazamiento (archivos) solo cuenta `rows`.
+    """
+    rows: int = 0
+    position: Any = None
+    key_column: Optional[str] = None
+    finished: bool = False
+
+
+def checkpoint_key(source: str, target: DatabaseConfig, table_name: str, fingerprint: str = "") -> str:
+    """Identificador de una carga: origen, destino y tabla (sin credenciales)"""
+    key = f"{source} -> {target.host}:{target.port}/{target.database}:{table_name}"
+    return f"{key} [{fingerprint}]" if fingerprint else key
+
+
+def file_fingerprint(file_path: str) -> str:
+    """Tamaño y fecha de modificación: si el archivo cambia, el checkpoint deja de valer"""
+    stat = os.stat(file_path)
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+
+class CheckpointStore:
+    """Checkpoints por tabla en la misma base SQLite local que los watermarks"""
+
+    def __init__(self, path: str = STATE_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                " checkpoint_key TEXT PRIMARY KEY,"
+                " key_column TEXT,"
+                " position TEXT,"
+                " rows INTEGER NOT NULL,"
+                " finished INTEGER NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[Checkpoint]:
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT key_column, position, rows, finished FROM checkpoints WHERE checkpoint_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        position = decode_value(row[1]) if row[1] is not None else None
+        return Checkpoint(rows=row[2], position=position, key_column=row[0], finished=bool(row[3]))
+
+    def save(self, key: str, checkpoint: Checkpoint):
+        position = encode_value(checkpoint.position) if checkpoint.position is not None else None
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO checkpoints "
+                "(checkpoint_key, key_column, position, rows, finished, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, checkpoint.key_column, position, checkpoint.rows, int(checkpoint.finished), time.time())
+            )
+
+    def reset(self, key: str):
+        """Olvidar el progreso para que la próxima ejecución empiece de cero"""
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM checkpoints WHERE checkpoint_key = ?", (key,))
+
+
+# Destinos
+
+def batch_writer(target, table_name: str, column_types: Optional[Dict[str, Any]] = None) -> BatchWriter:
+    """Escritor lote a lote para un engine SQLAlchemy o una base de MongoDB.
+
+    Cada llamada confirma su propio lote, que es lo que permite guardar el
+    checkpoint justo después.
+    """
+    if not hasattr(target, "dialect"):
+        collection = target[table_name]
+
+        def write_mongo(batch: pd.DataFrame, if_exists: str) -> int:
+            if if_exists == "replace":
+                collection.drop()
+            return write_to_mongo(batch, collection, workers=1)[0]
+        return write_mongo
+
+    if target.dialect.name == "postgresql":
+        return lambda batch, if_exists: copy_to_postgres(
+            batch, target, table_name, if_exists=if_exists, column_types=column_types)[0]
+    return lambda batch, if_exists: write_to_sqlserver(
+        batch, target, table_name, if_exists=if_exists, column_types=column_types)[0]
+
+
+def count_rows(target, table_name: str) -> Optional[int]:
+    """Filas que tiene el destino (None si la tabla o colección no existe)"""
+    if not hasattr(target, "dialect"):
+        if table_name not in target.list_collection_names():
+            return None
+        return target[table_name].count_documents({})
+    if not inspect(target).has_table(table_name):
+        return None
+    with target.connect() as connection:
+        return connection.execute(select(func.count()).select_from(table(table_name))).scalar()
+
+
+def _discard_after(engine, table_name: str, key_column: str, position: Any):
+    """Borrar las filas confirmadas después del último checkpoint guardado"""
+    target = table(table_name, column(key_column))
+    query = target.delete()
+    if position is not None:
+        query = query.where(target.c[key_column] > position)
+    with engine.begin() as connection:
+        deleted = connection.execute(query).rowcount
+    if deleted:
+        logger.info(f"{table_name}: {deleted} filas posteriores al checkpoint eliminadas antes de reanudar")
+
+
+# Modo por clave (tablas)
+
+def primary_key_column(engine, table_name: str) -> str:
+    columns = inspect(engine).get_pk_constraint(table_name).get("constrained_columns") or []
+    if len(columns) != 1:
+        raise ValueError(f"La tabla {table_name} no tiene una clave primaria de una sola columna; "
+                         f"indica la columna clave para reanudar")
+    return columns[0]
+
+
+def iter_key_batches(
+    engine,
+    table_name: str,
+    key_column: str,
+    since: Any = None,
+    batch_size: int = BULK_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Leer las filas con clave > `since` ordenadas por la clave, con un cursor de servidor"""
+    columns = inspect(engine).get_columns(table_name)
+    source = table(table_name, *[column(col["name"]) for col in columns])
+    query = select(source).order_by(source.c[key_column])
+    if since is not None:
+        query = query.where(source.c[key_column] > since)
+    with engine.connect().execution_options(stream_results=True) as connection:
+        yield from pd.read_sql(query, connection, chunksize=batch_size)
+
+
+def copy_table_resumable(
+    source_engine,
+    target_engine,
+    table_name: str,
+    write: BatchWriter,
+    create_target: Callable[[], None],
+    store: CheckpointStore,
+    key: str,
+    key_column: Optional[str] = None,
+    batch_size: int = BULK_BATCH_SIZE,
+    restart: bool = False,
+    check_cancelled: CancelCheck = None
+) -> Tuple[int, bool]:
+    """Copiar una tabla lote a lote guardando la última clave confirmada.
+
+    Si hay un checkpoint sin terminar, el destino no se recrea: se borran
+    las filas con clave posterior al checkpoint (un lote confirmado cuyo
+    checkpoint no llegó a guardarse) y la lectura sigue desde esa clave, así
+    que ninguna fila se duplica. `check_cancelled` se llama antes de cada
+    lote; una cancelación deja el checkpoint listo para reanudar. Retorna
+    las filas copiadas en total y si la copia se reanudó.
+    """
+    key_column = key_column or primary_key_column(source_engine, table_name)
+    checkpoint = None if restart else store.get(key)
+    resumed = (checkpoint is not None and not checkpoint.finished and checkpoint.key_column == key_column
+               and inspect(target_engine).has_table(table_name))
+    if resumed:
+        logger.info(f"Reanudando {table_name} tras {checkpoint.rows} filas ({key_column} > {checkpoint.position!r})")
+        _discard_after(target_engine, table_name, key_column, checkpoint.position)
+    else:
+        create_target()
+        checkpoint = Checkpoint(key_column=key_column)
+        store.save(key, checkpoint)
+
+    for batch in iter_key_batches(source_engine, table_name, key_column, checkpoint.position, batch_size):
+        if check_cancelled is not None:
+            check_cancelled()
+        write(batch, "append")
+        checkpoint.rows += len(batch)
+        checkpoint.position = batch[key_column].iloc[-1]
+        store.save(key, checkpoint)
+
+    checkpoint.finished = True
+    store.save(key, checkpoint)
+    return checkpoint.rows, resumed
+
+
+# Modo por desplazamiento (archivos)
+
+def load_resumable(
+    chunks: Iterable[pd.DataFrame],
+    write: BatchWriter,
+    target,
+    table_name: str,
+    store: CheckpointStore,
+    key: str,
+    batch_size: int = BULK_BATCH_SIZE,
+    restart: bool = False
+) -> Tuple[int, int]:
+    """Reemplazar una tabla con bloques de una fuente de orden estable, confirmando lote a lote.
+
+    Al reanudar se saltan tantas filas como tiene ya el destino (no las del
+    checkpoint), de modo que también cuenta un lote confirmado justo antes
+    del fallo. Retorna las filas del destino al terminar y las saltadas.
+    """
+    checkpoint = None if restart else store.get(key)
+    skip = 0
+    if checkpoint is not None and not checkpoint.finished:
+        skip = count_rows(target, table_name) or 0
+        if skip != checkpoint.rows:
+            logger.warning(f"{table_name}: el checkpoint indica {checkpoint.rows} filas y el destino tiene {skip}; "
+                           f"se usa el destino")
+        if skip:
+            logger.info(f"Reanudando {table_name}: se saltan {skip} filas ya cargadas")
+
+    checkpoint = Checkpoint(rows=skip)
+    store.save(key, checkpoint)
+    if_exists = "append" if skip else "replace"
+    remaining = skip
+    for batch in iter_batches(chunks, batch_size):
+        if remaining:
+            if len(batch) <= remaining:
+                remaining -= len(batch)
+                continue
+            batch, remaining = batch.iloc[remaining:], 0
+        write(batch, if_exists)
+        if_exists = "append"
+        checkpoint.rows += len(batch)
+        store.save(key, checkpoint)
+
+    checkpoint.finished = True
+    store.save(key, checkpoint)
+    return checkpoint.rows, skip
@@ -0,0 +1,232 @@
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from config import CSV_CHUNK_SIZE, PARQUET_COMPRESSION
+from data_loader import ChunkedSource
+from read_plan import ReadPlan
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+
+# Filtros en forma normal disyuntiva, como en pyarrow.parquet:
+# [("year", ">=", 2015), ("fuel", "in", ["Diesel", "Petrol"])]
+Filters = Optional[Sequence[Any]]
+
+
+def file_format(file_path: str) -> str:
+    """Formato del archivo según su extensión ("csv", "parquet" o "feather")"""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Formato de archivo no soportado: {extension}")
+    return FORMATS[extension]
+
+
+def is_columnar(file_path: str) -> bool:
+    return FORMATS.get(os.path.splitext(file_path)[1].lower()) in ("parquet", "feather")
+
+
+def _filter_expression(filters: Filters) -> Optional[ds.Expression]:
+    return pq.filters_to_expression(filters) if filters else None
+
+
+def _open_dataset(file_path: str) -> ds.Dataset:
+    return ds.dataset(file_path, format="parquet" if file_format(file_path) == "parquet" else "ipc")
+
+
+def _open_feather(file_path: str) -> pa.Table:
+    """Abrir un archivo Arrow IPC/Feather mapeado en memoria (sin copiar los buffers)"""
+    return pa.ipc.open_file(pa.memory_map(file_path, "r")).read_all()
+
+
+def read_arrow_table(file_path: str, columns: Optional[List[str]] = None, filters: Filters = None) -> pa.Table:
+    """Leer solo las columnas y filas pedidas.
+
+    En Parquet la proyección evita leer las demás columnas del disco y el
+    filtro descarta grupos de filas usando sus estadísticas min/max.
+    """
+    expression = _filter_expression(filters)
+    if file_format(file_path) == "feather":
+        table = _open_feather(file_path)
+        if expression is not None:
+            table = table.filter(expression)
+        return table.select(columns) if columns else table
+    return _open_dataset(file_path).to_table(columns=columns, filter=expression)
+
+
+def read_columnar(file_path: str, columns: Optional[List[str]] = None, filters: Filters = None) -> pd.DataFrame:
+    return read_arrow_table(file_path, columns, filters).to_pandas()
+
+
+class ColumnarSource(ChunkedSource):
+    """Fuente Parquet o Arrow IPC/Feather leída por lotes de registros.
+
+    La proyección y los filtros del plan se pasan a pyarrow, así que solo
+    se leen las columnas y grupos de filas necesarios.
+    """
+
+    def __init__(self, file_path: str, chunksize: int = CSV_CHUNK_SIZE, plan: Optional[ReadPlan] = None):
+        super().__init__(file_path, chunksize, plan)
+
+    def source_columns(self) -> List[str]:
+        if file_format(self.file_path) == "feather":
+            return _open_feather(self.file_path).schema.names
+        return _open_dataset(self.file_path).schema.names
+
+    def _iter_batches(self) -> Iterator[pa.RecordBatch]:
+        columns = self.plan.read_columns(self.source_columns())
+        filters = self.plan.arrow_filters()
+        if file_format(self.file_path) == "feather":
+            yield from read_arrow_table(self.file_path, columns, filters).to_batches(self.chunksize)
+            return
+        yield from _open_dataset(self.file_path).to_batches(
+            columns=columns, filter=_filter_expression(filters), batch_size=self.chunksize
+        )
+
+    def first_chunk(self) -> pd.DataFrame:
+        for batch in self._iter_batches():
+            return self._apply_plan(batch.to_pandas())
+        columns = self.plan.read_columns(self.source_columns())
+        return self._apply_plan(read_arrow_table(self.file_path, columns).slice(0, 0).to_pandas())
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        for batch in self._iter_batches():
+            yield self._apply_plan(batch.to_pandas())
+
+
+def _file_schema(schema: pa.Schema, kind: str) -> pa.Schema:
+    schema = schema.remove_metadata()
+    if kind == "feather":
+        # Un archivo IPC admite un único diccionario por campo: las categorías se guardan decodificadas
+        schema = pa.schema([field.with_type(field.type.value_type)
+                            if pa.types.is_dictionary(field.type) else field for field in schema])
+    return schema
+
+
+def _open_writer(file_path: str, kind: str, schema: pa.Schema, compression: str):
+    # Feather sin comprimir: así se puede volver a leer mapeado en memoria sin copias
+    if kind == "parquet":
+        return pq.ParquetWriter(file_path, schema, compression=compression)
+    return pa.ipc.new_file(file_path, schema)
+
+
+def _read_batches(file_path: str, kind: str) -> Iterator[pa.RecordBatch]:
+    if kind == "parquet":
+        yield from pq.ParquetFile(file_path).iter_batches()
+        return
+    reader = pa.ipc.open_file(pa.memory_map(file_path, "r"))
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i)
+
+
+class _SchemaSpool:
+    """Bloques guardados en disco hasta conocer el esquema que los admite a todos.
+
+    Se usa cuando un bloque no cabe en el esquema del primero (una columna
+    vacía que luego trae textos, enteros que pasan a reales...): lo ya
+    escrito y los bloques restantes se reescriben con el esquema unificado.
+    """
+
+    def __init__(self, file_path: str, kind: str, written_schema: pa.Schema):
+        self.file_path = file_path
+        self.kind = kind
+        self.directory = tempfile.mkdtemp(prefix=".spool_", dir=os.path.dirname(os.path.abspath(file_path)))
+        # Lo ya escrito con el esquema del primer bloque es la primera parte
+        first = os.path.join(self.directory, "part0")
+        os.replace(file_path, first)
+        self.parts = [(first, kind)]
+        self.schemas = [written_schema]
+
+    def add(self, table: pa.Table):
+        path = os.path.join(self.directory, f"part{len(self.parts)}")
+        with pa.ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table)
+        self.parts.append((path, "feather"))
+        self.schemas.append(_file_schema(table.schema, self.kind))
+
+    def finish(self, compression: str) -> pa.Schema:
+        try:
+            schema = _file_schema(pa.unify_schemas(self.schemas, promote_options="permissive"), self.kind)
+            with _open_writer(self.file_path, self.kind, schema, compression) as writer:
+                for path, kind in self.parts:
+                    for batch in _read_batches(path, kind):
+                        writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+        finally:
+            self.discard()
+        return schema
+
+    def discard(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def write_chunks(chunks: Iterable[pd.DataFrame], file_path: str,
+                 compression: str = PARQUET_COMPRESSION) -> Tuple[int, float]:
+    """Escribir bloques en CSV, Parquet o Feather sin reunirlos en memoria.
+
+    Los bloques se escriben con el esquema del primero mientras quepan en
+    él; si uno no cabe, el archivo se reescribe con el esquema unificado
+    (ver `_SchemaSpool`). Sin bloques se escribe un archivo vacío.
+    Retorna las filas escritas y el tamaño del archivo en MB.
+    """
+    kind = file_format(file_path)
+    rows = 0
+    writer, schema, spool = None, None, None
+    try:
+        for i, chunk in enumerate(chunks):
+            rows += len(chunk)
+            if kind == "csv":
+                chunk.to_csv(file_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+                continue
+            table = pa.Table.from_pandas(chunk, preserve_index=False).replace_schema_metadata(None)
+            if spool is not None:
+                spool.add(table)
+                continue
+            if writer is None:
+                schema = _file_schema(table.schema, kind)
+                writer = _open_writer(file_path, kind, schema, compression)
+            try:
+                table = table.cast(schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                writer.close()
+                writer = None
+                logger.info(f"El bloque {i} no cabe en el esquema del primero; {file_path} se reescribirá")
+                spool = _SchemaSpool(file_path, kind, schema)
+                spool.add(table)
+                continue
+            writer.write_table(table)
+
+        if rows == 0 and writer is None and spool is None:
+            if kind == "csv":
+                open(file_path, "w").close()
+            else:
+                writer = _open_writer(file_path, kind, pa.schema([]), compression)
+    except BaseException:
+        if spool is not None:
+            spool.discard()
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if spool is not None:
+        schema = spool.finish(compression)
+        logger.info(f"{file_path} reescrito con el esquema unificado: {schema}")
+
+    size_mb = os.path.getsize(file_path) / (1024 * 1024) if os.path.exists(file_path) else 0.0
+    logger.info(f"Exportadas {rows} filas a {file_path} ({size_mb:.1f} MB)")
+    return rows, size_mb
@@ -35,8 +35,13 @@ class DockerConfig:
     service_name: Optional[str] = None
 
 class AppConfig:
-    """Configuración principal de la aplicación"""
-    def __init__(self):
+    """Configuración principal de la aplicación.
+
+    Con `verify=False` no se comprueban las rutas de Docker al crearla; la
+    interfaz llama a `verify_docker_paths` en segundo plano para no
+    retrasar la ventana.
+    """
+    def __init__(self, verify: bool = True):
         # Configuración de rutas base
         self.BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
         self.LOGS_DIR = self.BASE_DIR / "logs"
@@ -50,8 +55,10 @@ class AppConfig:
         # Configurar logging
         self._setup_logging()
 
-        # Verificar y configurar rutas de Docker
+        # Configurar (y verificar) rutas de Docker
         self._setup_docker_paths()
+        if verify:
+            self.verify_docker_paths()
 
         # Configurar bases de datos por defecto
         self._setup_database_configs()
@@ -72,13 +79,7 @@ class AppConfig:
         self.logger.info("Logging configurado exitosamente")
 
     def _setup_docker_paths(self):
-        """Configurar y verificar rutas de Docker Compose"""
-        # Verificar existencia de directorios
-        for dir_path in [self.POSTGRES_DOCKER_DIR, self.SQLSERVER_DOCKER_DIR]:
-            if not dir_path.exists():
-                self.logger.error(f"No se encontró el directorio: {dir_path}")
-                raise FileNotFoundError(f"Directorio no encontrado: {dir_path}")
-
+        """Configurar rutas de Docker Compose"""
         # Definir configuraciones de Docker
         self.DOCKER_CONFIGS = {
             "postgres": DockerConfig(
@@ -98,6 +99,14 @@ class AppConfig:
             )
         }
 
+    def verify_docker_paths(self):
+        """Verificar que existen los directorios y archivos docker-compose"""
+        # Verificar existencia de directorios
+        for dir_path in [self.POSTGRES_DOCKER_DIR, self.SQLSERVER_DOCKER_DIR]:
+            if not dir_path.exists():
+                self.logger.error(f"No se encontró el directorio: {dir_path}")
+                raise FileNotFoundError(f"Directorio no encontrado: {dir_path}")
+
         # Verificar existencia de archivos docker-compose
         for service, config in self.DOCKER_CONFIGS.items():
             compose_path = Path(config.compose_file)
@@ -178,7 +187,78 @@ APP_NAME = "ETL Tool"
 APP_VERSION = "1.0.0"
 DEFAULT_ENCODING = "utf-8"
 MAX_PREVIEW_ROWS = 100
-SUPPORTED_FILE_TYPES = [("CSV files", "*.csv")]
+PREVIEW_PAGE_SIZE = 200  # filas formateadas por página en la vista previa virtual
+PREVIEW_CACHE_PAGES = 50  # páginas formateadas que se conservan (LRU)
+SUPPORTED_FILE_TYPES = [
+    ("CSV files", "*.csv"),
+    ("Parquet files", "*.parquet *.pq"),
+    ("Arrow IPC / Feather files", "*.feather *.arrow *.ipc"),
+]
+PARQUET_COMPRESSION = "zstd"  # códec de los archivos Parquet exportados
+
+# Carga de archivos por bloques
+CSV_CHUNK_SIZE = 50_000  # filas por bloque
+STREAMING_LOAD_THRESHOLD = 100 * 1024 * 1024  # bytes; archivos mayores se leen por bloques
+
+# Inferencia de tipos al cargar CSV
+SCHEMA_SAMPLE_ROWS = 100_000  # filas leídas para elegir los tipos
+CATEGORY_MAX_RATIO = 0.1  # valores distintos / filas por debajo del cual un texto pasa a category
+
+# Pipeline de transformaciones
+PIPELINE_PREVIEW_ROWS = 10_000  # filas de muestra sobre las que se previsualizan los pasos
+
+# Cargas masivas a bases de datos
+BULK_BATCH_SIZE = 100_000  # filas por lote enviado al destino
+MONGO_BATCH_SIZE = 10_000  # documentos por insert_many
+MONGO_WRITE_WORKERS = 4  # lotes enviados en paralelo a MongoDB
+
+# Análisis de tablas
+ANALYTICS_CHUNK_SIZE = 50_000  # filas leídas por bloque del cursor
+QUANTILE_SAMPLE_SIZE = 10_000  # tamaño de la muestra para cuantiles aproximados
+ANALYTICS_PROGRESS_INTERVAL = 1.0  # segundos mínimos entre resultados parciales enviados a la UI
+
+# Pools de conexión compartidos
+DB_POOL_SIZE = 5  # conexiones persistentes por servidor
+DB_MAX_OVERFLOW = 10  # conexiones extra permitidas en picos
+DB_POOL_RECYCLE = 1800  # segundos antes de reciclar una conexión
+DB_POOL_IDLE_TIMEOUT = 600  # segundos sin uso antes de liberar un pool
+# Driver de SQL Server: "pyodbc" (lotes con fast_executemany) o "pymssql" (carga masiva BCP con bulk_copy)
+SQLSERVER_DRIVER = os.environ.get("ETL_SQLSERVER_DRIVER", "pyodbc")
+
+# Tareas en segundo plano
+JOB_IO_WORKERS = 4  # hilos para cargas, exportaciones y comandos docker
+JOB_CPU_WORKERS = None  # procesos para transformaciones pesadas (None = núcleos disponibles)
+JOB_POLL_INTERVAL_MS = 100  # frecuencia con la que la UI recoge resultados
+
+# Migraciones entre bases de datos
+MIGRATION_WORKERS = 4  # tablas migradas en paralelo
+MIGRATION_FETCH_SIZE = 50_000  # filas por fetchmany al leer SQL Server
+MIGRATION_QUEUE_SIZE = 4  # lotes en vuelo entre la lectura y el COPY
+
+# Aplanado de colecciones de MongoDB a tablas
+MONGO_SCHEMA_SAMPLE = 1_000  # documentos muestreados con $sample para descubrir el esquema
+MONGO_FLATTEN_SEPARATOR = "_"  # separador de las rutas anidadas en los nombres de columna
+
+# Lectura particionada por rangos de clave
+PARTITION_COUNT = 8  # rangos en que se divide una tabla grande
+PARTITION_WORKERS = 4  # conexiones que leen rangos en paralelo
+PARTITION_SAMPLE_PERCENT = 1.0  # porcentaje TABLESAMPLE para calcular cuantiles
+
+# Estado local de sincronizaciones (watermarks)
+STATE_DB_PATH = str(Path(os.path.dirname(os.path.abspath(__file__))) / "logs" / "etl_state.db")
+
+# Copias de seguridad (pg_dump en formato directorio)
+BACKUP_DIR = str(Path(os.path.dirname(os.path.abspath(__file__))) / "backups")
+PG_DUMP_BINARY = os.environ.get("ETL_PG_DUMP", "pg_dump")  # debe ser de la versión del servidor o posterior
+PG_RESTORE_BINARY = os.environ.get("ETL_PG_RESTORE", "pg_restore")
+BACKUP_JOBS = None  # tablas volcadas en paralelo (None = núcleos disponibles)
+BACKUP_COMPRESSION = "6"  # valor de -Z: nivel gzip 0-9 o, con pg_dump 16+, p. ej. "zstd:3"
+BACKUP_PROGRESS_INTERVAL = 1.0  # segundos entre mediciones del tamaño volcado
+
+# Estado de los servicios Docker
+DOCKER_BINARY = os.environ.get("ETL_DOCKER_BINARY", "docker")  # ejecutable (sustituible en pruebas)
+DOCKER_STATUS_TTL = 2.0  # segundos que se reutiliza el resultado de docker ps
+DOCKER_POLL_INTERVAL = 5.0  # segundos entre consultas automáticas
 
 # Configuración de la interfaz gráfica
 GUI_CONFIG = {
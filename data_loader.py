@@ -0,0 +1,93 @@
+import os
+import logging
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from config import CSV_CHUNK_SIZE, STREAMING_LOAD_THRESHOLD
+from read_plan import ReadPlan
+
+if TYPE_CHECKING:
+    from schema_inference import InferredSchema
+
+
+class ChunkedSource(ABC):
+    """Fuente de datos que se lee por bloques (chunks) de forma perezosa.
+
+    Solo el primer bloque se mantiene en memoria para la vista previa; el
+    resto del archivo se vuelve a recorrer bloque a bloque cada vez que
+    una exportación o transformación lo necesita.
+    """
+
+    def __init__(self, file_path: str, chunksize: int = CSV_CHUNK_SIZE, plan: Optional[ReadPlan] = None):
+        self.file_path = file_path
+        self.chunksize = chunksize
+        self.plan = plan or ReadPlan()
+        self.logger = logging.getLogger(__name__)
+
+    @abstractmethod
+    def source_columns(self) -> List[str]:
+        """Columnas tal como están en el archivo"""
+
+    def _apply_plan(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Aplicar a un bloque la parte del plan que la lectura no resolvió"""
+        return chunk if self.plan.is_empty else self.plan.apply(chunk)
+
+    @abstractmethod
+    def first_chunk(self) -> pd.DataFrame:
+        """Primer bloque, para la vista previa"""
+
+    @abstractmethod
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """Todos los bloques del archivo, de uno en uno"""
+
+
+class ChunkedCSVSource(ChunkedSource):
+    """Fuente CSV leída por bloques con pd.read_csv.
+
+    Con `schema` los tipos inferidos se aplican al leer y cada bloque se
+    estrecha a los tipos de la muestra cuando sus valores caben.
+    """
+
+    def __init__(self, file_path: str, chunksize: int = CSV_CHUNK_SIZE, plan: Optional[ReadPlan] = None,
+                 schema: Optional["InferredSchema"] = None, **read_kwargs):
+        super().__init__(file_path, chunksize, plan)
+        self.schema = schema
+        self.read_kwargs = {**(schema.read_kwargs() if schema is not None else {}), **read_kwargs}
+        self._header: Optional[List[str]] = None
+
+    def source_columns(self) -> List[str]:
+        if self._header is None:
+            self._header = list(pd.read_csv(self.file_path, nrows=0).columns)
+        return self._header
+
+    def _csv_kwargs(self) -> Dict[str, Any]:
+        """read_csv con usecols, para no parsear las columnas que el plan descarta"""
+        kwargs = dict(self.read_kwargs)
+        if self.plan.columns is not None or self.plan.excluded:
+            wanted = set(self.plan.read_columns(self.source_columns()))
+            kwargs["usecols"] = lambda col: col in wanted
+            if "parse_dates" in kwargs:
+                kwargs["parse_dates"] = [col for col in kwargs["parse_dates"] if col in wanted]
+        return kwargs
+
+    def first_chunk(self) -> pd.DataFrame:
+        """Leer únicamente el primer bloque del archivo"""
+        chunk = pd.read_csv(self.file_path, nrows=self.chunksize, **self._csv_kwargs())
+        return self._downcast(self._apply_plan(chunk))
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """Recorrer el archivo completo bloque a bloque"""
+        with pd.read_csv(self.file_path, chunksize=self.chunksize, **self._csv_kwargs()) as reader:
+            for chunk in reader:
+                yield self._downcast(self._apply_plan(chunk))
+
+    def _downcast(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        return self.schema.downcast(chunk) if self.schema is not None else chunk
+
+
+def should_stream(file_path: str, threshold: Optional[int] = None) -> bool:
+    """Indica si el archivo es lo bastante grande para cargarse en modo streaming"""
+    threshold = STREAMING_LOAD_THRESHOLD if threshold is None else threshold
+    return os.path.getsize(file_path) > threshold
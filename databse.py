@@ -1,23 +1,161 @@
 from sqlalchemy import create_engine
-from config import DatabaseConfig
+from config import (DatabaseConfig, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE,
+                    DB_POOL_IDLE_TIMEOUT, SQLSERVER_DRIVER)
+import logging
+import threading
+import time
 import pandas as pd
-from typing import Tuple
+import pymongo
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+from bulk_loader import copy_to_postgres, merge_to_database, write_to_sqlserver
+
+class EngineRegistry:
+  """Registro compartido de engines/clientes con pool, uno por configuración distinta"""
+
+  def __init__(
+    self,
+    pool_size: int = DB_POOL_SIZE,
+    max_overflow: int = DB_MAX_OVERFLOW,
+    pool_recycle: int = DB_POOL_RECYCLE,
+    idle_timeout: int = DB_POOL_IDLE_TIMEOUT,
+    sqlserver_driver: str = SQLSERVER_DRIVER
+  ):
+    if sqlserver_driver not in ("pyodbc", "pymssql"):
+      raise ValueError(f"Driver de SQL Server no soportado: {sqlserver_driver}")
+    self.pool_size = pool_size
+    self.max_overflow = max_overflow
+    self.pool_recycle = pool_recycle
+    self.idle_timeout = idle_timeout
+    self.sqlserver_driver = sqlserver_driver
+    self.logger = logging.getLogger(__name__)
+    self._entries: Dict[Tuple, Any] = {}
+    self._last_used: Dict[Tuple, float] = {}
+    self._lock = threading.Lock()
+
+  @staticmethod
+  def _key(kind: str, config: DatabaseConfig) -> Tuple:
+    # table_name no forma parte de la conexión
+    return (kind, config.host, str(config.port), config.database, config.username, config.password)
+
+  def _get(self, kind: str, config: DatabaseConfig, factory: Callable[[], Any]):
+    self.evict_idle()
+    key = self._key(kind, config)
+    with self._lock:
+      if key not in self._entries:
+        self.logger.info(f"Creando pool {kind} para {config.host}:{config.port}/{config.database}")
+        self._entries[key] = factory()
+      self._last_used[key] = time.monotonic()
+      return self._entries[key]
+
+  @property
+  def capacity(self) -> int:
+    """Conexiones simultáneas que admite cada pool (persistentes más las de pico)"""
+    return self.pool_size + self.max_overflow
+
+  def _pool_options(self) -> Dict[str, Any]:
+    return {
+      "pool_size": self.pool_size,
+      "max_overflow": self.max_overflow,
+      "pool_recycle": self.pool_recycle,
+      "pool_pre_ping": True,
+    }
+
+  def get_postgres_engine(self, config: DatabaseConfig):
+    return self._get("postgres", config, lambda: create_engine(
+      f'postgresql://{config.username}:{config.password}'
+      f'@{config.host}:{config.port}/{config.database}',
+      **self._pool_options()
+    ))
+
+  def get_sqlserver_engine(self, config: DatabaseConfig):
+    """Engine pyodbc con fast_executemany o, con el driver pymssql, engine cuyas cargas usan BCP"""
+    if self.sqlserver_driver == "pymssql":
+      return self._get("sqlserver", config, lambda: create_engine(
+        config.get_sqlserver_url(),
+        **self._pool_options()
+      ))
+    return self._get("sqlserver", config, lambda: create_engine(
+      f"mssql+pyodbc://{config.username}:{config.password}"
+      f"@{config.host}:{config.port}/{config.database}"
+      f"?driver=ODBC+Driver+17+for+SQL+Server",
+      fast_executemany=True,
+      **self._pool_options()
+    ))
+
+  def get_mongo_client(self, config: DatabaseConfig) -> pymongo.MongoClient:
+    return self._get("mongodb", config, lambda: pymongo.MongoClient(
+      host=config.host,
+      port=int(config.port),
+      username=config.username,
+      password=config.password,
+      maxPoolSize=self.pool_size + self.max_overflow,
+      maxIdleTimeMS=self.idle_timeout * 1000
+    ))
+
+  @staticmethod
+  def _dispose(entry):
+    if isinstance(entry, pymongo.MongoClient):
+      entry.close()
+    else:
+      entry.dispose()
+
+  @staticmethod
+  def _in_use(entry) -> bool:
+    """Si liberar el pool podría cortar un trabajo en curso"""
+    if isinstance(entry, pymongo.MongoClient):
+      return True
+    return entry.pool.checkedout() > 0
+
+  def evict_idle(self):
+    """Liberar los pools que no se han usado en idle_timeout segundos.
+
+    `_last_used` solo cambia al pedir el engine, así que una exportación
+    larga parece inactiva: los pools con conexiones prestadas se conservan
+    y su marca se renueva. Un engine liberado sigue siendo válido
+    (SQLAlchemy crea otro pool al volver a usarlo). Los clientes de MongoDB
+    nunca se cierran aquí, porque cerrarlos invalida el cliente que tenga
+    un trabajo en curso; sus conexiones ociosas ya se cierran solas con
+    maxIdleTimeMS.
+    """
+    now = time.monotonic()
+    with self._lock:
+      idle = [key for key, used in self._last_used.items() if now - used > self.idle_timeout]
+      for key in idle:
+        entry = self._entries[key]
+        if self._in_use(entry):
+          self._last_used[key] = now
+          continue
+        self.logger.info(f"Liberando pool inactivo {key[0]} para {key[1]}:{key[2]}/{key[3]}")
+        self._dispose(self._entries.pop(key))
+        del self._last_used[key]
+
+  def dispose_all(self):
+    """Cerrar todos los pools (al salir de la aplicación)"""
+    with self._lock:
+      for entry in self._entries.values():
+        self._dispose(entry)
+      self._entries.clear()
+      self._last_used.clear()
+
+engine_registry = EngineRegistry()
 
 class DatabaseManager:
   @staticmethod
   def create_postgres_engine(config: DatabaseConfig):
-    return create_engine(
-      f'postgresql://{config.username}:{config.password}'
-      f'@{config.host}:{config.port}/{config.database}'
-    )
+    return engine_registry.get_postgres_engine(config)
 
   @staticmethod
   def create_sqlserver_engine(config: DatabaseConfig):
-    return create_engine(
-      f"mssql+pyodbc://{config.username}:{config.password}"
-      f"@{config.host}:{config.port}/{config.database}"
-      f"?driver=ODBC+Driver+17+for+SQL+Server"
-    )
+    return engine_registry.get_sqlserver_engine(config)
+
+  @staticmethod
+  def create_mongo_client(config: DatabaseConfig) -> pymongo.MongoClient:
+    return engine_registry.get_mongo_client(config)
+
+  @staticmethod
+  def pool_capacity() -> int:
+    """Conexiones que un trabajo puede pedir a la vez a un mismo servidor sin esperar al pool"""
+    return engine_registry.capacity
 
     @staticmethod
     def create_mongo_engine(config: DatabaseConfig):
@@ -29,8 +167,8 @@ class DatabaseManager:
   @staticmethod
   def test_connection(engine) -> Tuple[bool, str]:
     try:
-      engine.connect()
-      return True, "Connection successful"
+      with engine.connect():
+        return True, "Connection successful"
     except Exception as e:
       return False, str(e)
 
@@ -39,9 +177,20 @@ class DatabaseManager:
     df: pd.DataFrame,
     engine,
     table_name: str,
-    if_exists: str = 'replace'
+    if_exists: str = 'replace',
+    key_columns: Optional[Sequence[str]] = None
   ) -> Tuple[bool, str]:
+    """Subir un DataFrame; con if_exists='merge' se hace upsert sobre key_columns"""
     try:
+      if if_exists == 'merge':
+        rows, elapsed = merge_to_database(df, engine, table_name, key_columns or [])
+        return True, f"{rows} rows merged into {table_name} in {elapsed:.2f}s"
+      if engine.dialect.name == "postgresql":
+        rows, elapsed = copy_to_postgres(df, engine, table_name, if_exists=if_exists)
+        return True, f"{rows} rows uploaded to {table_name} in {elapsed:.2f}s"
+      if engine.dialect.name == "mssql":
+        rows, elapsed = write_to_sqlserver(df, engine, table_name, if_exists=if_exists)
+        return True, f"{rows} rows uploaded to {table_name} in {elapsed:.2f}s"
       df.to_sql(table_name, engine, if_exists=if_exists, index=False)
       return True, f"Data successfully uploaded to {table_name}"
     except Exception as e:
@@ -1,26 +1,50 @@
+import json
 import subprocess
-from typing import Optional, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import os
 import logging
 from pathlib import Path
 
+from config import DOCKER_BINARY, DOCKER_POLL_INTERVAL, DOCKER_STATUS_TTL, DockerConfig
+
+COMPOSE_WORKING_DIR_LABEL = "com.docker.compose.project.working_dir"
+
 class DockerManager:
-    def __init__(self):
+    # Versión detectada de docker compose, compartida por todas las instancias
+    _compose_version: Optional[str] = None
+    _verify_lock = threading.Lock()
+
+    def __init__(self, verify: bool = True, docker_binary: Optional[str] = None):
         self.logger = logging.getLogger(__name__)
-        # Verificar que docker compose está instalado
-        self._verify_docker_compose()
+        # Ejecutable de docker; en pruebas puede apuntar a un sustituto
+        self.docker_binary = docker_binary or DOCKER_BINARY
+        # Verificar que docker compose está instalado (la interfaz lo hace en segundo plano)
+        if verify:
+            self.verify_docker_compose()
 
-    def _verify_docker_compose(self):
+    def verify_docker_compose(self) -> str:
+        """Verificar docker compose una sola vez por proceso y retornar su versión"""
+        with DockerManager._verify_lock:
+            if DockerManager._compose_version is None:
+                DockerManager._compose_version = self._verify_docker_compose()
+        return DockerManager._compose_version
+
+    def _verify_docker_compose(self) -> str:
         """Verificar que docker compose está instalado y disponible"""
         try:
             result = subprocess.run(
-                ["docker", "compose", "version"],
+                [self.docker_binary, "compose", "version"],
                 capture_output=True,
                 text=True
             )
             if result.returncode != 0:
                 raise Exception("Docker Compose no está instalado o no es accesible")
             self.logger.info(f"Docker Compose versión detectada: {result.stdout.strip()}")
+            return result.stdout.strip()
         except Exception as e:
             self.logger.error(f"Error verificando Docker Compose: {e}")
             raise
@@ -64,7 +88,7 @@ class DockerManager:
         self.logger.info(f"Iniciando contenedores en: {cwd}")
         
         code, out, err = self.run_docker_command(
-            ["docker", "compose", "-f", compose_file, "up", "-d"],
+            [self.docker_binary, "compose", "-f", compose_file, "up", "-d"],
             cwd=cwd
         )
         if code == 0:
@@ -82,7 +106,7 @@ class DockerManager:
         self.logger.info(f"Deteniendo contenedores en: {cwd}")
         
         code, out, err = self.run_docker_command(
-            ["docker", "compose", "-f", compose_file, "down"],
+            [self.docker_binary, "compose", "-f", compose_file, "down"],
             cwd=cwd
         )
         if code == 0:
@@ -98,7 +122,163 @@ class DockerManager:
 
         cwd = os.path.dirname(compose_file)
         code, out, err = self.run_docker_command(
-            ["docker", "compose", "-f", compose_file, "ps"],
+            [self.docker_binary, "compose", "-f", compose_file, "ps"],
             cwd=cwd
         )
-        return code == 0, out if code == 0 else err
\ No newline at end of file
+        return code == 0, out if code == 0 else err
+
+    def list_containers(self) -> List[Dict[str, Any]]:
+        """Todos los contenedores (también detenidos) con una sola llamada a `docker ps`"""
+        code, out, err = self.run_docker_command(
+            [self.docker_binary, "ps", "--all", "--no-trunc", "--format", "{{json .}}"]
+        )
+        if code != 0:
+            raise RuntimeError(f"docker ps falló: {err.strip()}")
+        try:
+            return [json.loads(line) for line in out.splitlines() if line.strip()]
+        except ValueError as e:
+            raise RuntimeError(f"Salida de docker ps no válida: {e}")
+
+
+@dataclass
+class ServiceStatus:
+    """Estado de un servicio de docker compose"""
+    service: str
+    running: bool
+    state: str
+    detail: str = ""
+    checked_at: float = field(default_factory=time.time)
+
+
+def _labels(container: Dict[str, Any]) -> Dict[str, str]:
+    labels = container.get("Labels") or ""
+    if isinstance(labels, dict):
+        return labels
+    return dict(item.split("=", 1) for item in labels.split(",") if "=" in item)
+
+
+class DockerStatusMonitor:
+    """Estado de todos los servicios a partir de una única consulta `docker ps`.
+
+    El resultado se reutiliza durante `ttl` segundos y las consultas
+    simultáneas se agrupan en una sola. Cada estado nuevo se envía a los
+    suscriptores (desde el hilo que consultó); `start()` lanza un hilo que
+    consulta cada `interval` segundos. Si `docker ps` no está disponible
+    se consulta cada proyecto con `docker compose ps` en paralelo.
+    """
+
+    def __init__(
+        self,
+        manager: DockerManager,
+        configs: Dict[str, DockerConfig],
+        ttl: float = DOCKER_STATUS_TTL,
+        interval: float = DOCKER_POLL_INTERVAL
+    ):
+        self.manager = manager
+        self.configs = dict(configs)
+        self.ttl = ttl
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._cache: Optional[Dict[str, ServiceStatus]] = None
+        self._cached_at = 0.0
+        self._subscribers: List[Callable[[Dict[str, ServiceStatus]], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[Dict[str, ServiceStatus]], None]):
+        self._subscribers.append(callback)
+
+    def invalidate(self):
+        """Descartar la caché (p. ej. tras iniciar o detener un servicio)"""
+        self._cached_at = 0.0
+
+    def snapshot(self, force: bool = False) -> Dict[str, ServiceStatus]:
+        """Estado de todos los servicios, de la caché si sigue vigente.
+
+        Con `force` se consulta de nuevo, salvo que otra consulta haya
+        empezado después de la petición mientras se esperaba el bloqueo.
+        """
+        requested = time.monotonic()
+        with self._lock:
+            if self._cache is not None:
+                age = time.monotonic() - self._cached_at
+                if (self._cached_at >= requested) if force else age < self.ttl:
+                    return dict(self._cache)
+            started = time.monotonic()
+            statuses = self._query()
+            self._cache, self._cached_at = statuses, started
+        self._publish(statuses)
+        return dict(statuses)
+
+    def status(self, service: str, force: bool = False) -> ServiceStatus:
+        return self.snapshot(force)[service]
+
+    def _publish(self, statuses: Dict[str, ServiceStatus]):
+        for callback in self._subscribers:
+            try:
+                callback(dict(statuses))
+            except Exception as e:
+                self.logger.error(f"Error notificando el estado de Docker: {e}")
+
+    def _query(self) -> Dict[str, ServiceStatus]:
+        try:
+            containers = self.manager.list_containers()
+        except Exception as e:
+            self.logger.warning(f"{e}; consultando cada proyecto con docker compose ps")
+            return self._query_projects()
+        return {name: self._match(name, config, containers) for name, config in self.configs.items()}
+
+    @staticmethod
+    def _match(name: str, config: DockerConfig, containers: List[Dict[str, Any]]) -> ServiceStatus:
+        """Contenedores del proyecto: por directorio de compose o por nombre de contenedor"""
+        project_dir = os.path.realpath(os.path.dirname(config.compose_file))
+
+        def belongs(container: Dict[str, Any]) -> bool:
+            if container.get("Names") == config.container_name:
+                return True
+            working_dir = _labels(container).get(COMPOSE_WORKING_DIR_LABEL)
+            return bool(working_dir) and os.path.realpath(working_dir) == project_dir
+
+        matched = [container for container in containers if belongs(container)]
+        if not matched:
+            return ServiceStatus(name, False, "not created", "No hay contenedores para este servicio")
+
+        states = [container.get("State") or ("running" if str(container.get("Status", "")).startswith("Up")
+                                             else "exited")
+                  for container in matched]
+        running = "running" in states
+        detail = "; ".join(f"{container.get('Names')}: {container.get('Status')}" for container in matched)
+        return ServiceStatus(name, running, "running" if running else states[0], detail)
+
+    def _query_projects(self) -> Dict[str, ServiceStatus]:
+        """Alternativa: `docker compose ps` de todos los proyectos a la vez"""
+        def query(item: Tuple[str, DockerConfig]) -> ServiceStatus:
+            name, config = item
+            success, output = self.manager.check_docker_status(config.compose_file)
+            if not success:
+                return ServiceStatus(name, False, "error", output.strip())
+            running = "Up" in output
+            return ServiceStatus(name, running, "running" if running else "stopped", output.strip())
+
+        with ThreadPoolExecutor(max_workers=max(1, len(self.configs)), thread_name_prefix="docker-ps") as executor:
+            return dict(zip(self.configs, executor.map(query, self.configs.items())))
+
+    def start(self):
+        """Consultar periódicamente en un hilo de fondo"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="docker-status", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.snapshot()
+            except Exception as e:
+                self.logger.error(f"Error consultando el estado de Docker: {e}")
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
\ No newline at end of file
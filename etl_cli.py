@@ -0,0 +1,538 @@
+"""Ejecución de trabajos ETL sin interfaz gráfica (cron, CI).
+
+Uso:
+    python etl_cli.py trabajos.json [--summary resumen.json] [--continue-on-error]
+    python etl_cli.py trabajos.json --check   # solo validar las definiciones
+
+Un archivo contiene un trabajo o {"jobs": [...]} que se ejecutan en orden.
+Trabajo de carga:
+
+    {
+        "name": "cars_to_postgres",
+        "source": {"type": "file", "path": "bash/data/Car_details.csv"},
+        "pipeline": "pipelines/cars.json",
+        "target": {"type": "postgres", "connection": {...}, "table": "cars"},
+        "mode": "merge", "key_columns": ["name", "year"],
+        "batch_size": 100000, "workers": 4
+    }
+
+Los tipos de origen y destino son "file", "postgres", "sqlserver" y
+"mongodb"; `connection` lleva host, port, database, username y password
+(admite ${VARIABLES} de entorno). Con "type": "migration" el trabajo migra
+tablas de PostgreSQL a SQL Server (tables, workers, partitions,
+watermark_column, key_columns) o, con "direction": "sqlserver_to_postgres",
+de SQL Server a PostgreSQL (tables, workers, batch_size). Con
+"direction": "postgres_to_mongodb" cada tabla pasa a una colección
+(tables, workers, batch_size y, por tabla, collections, id_columns y
+embed: [{"field", "table", "local_column", "remote_column", "many"}]).
+"mongodb_to_postgres" y "mongodb_to_sqlserver" aplanan colecciones en
+tablas (tables = colecciones, workers, batch_size, sample_size).
+
+Con "resumable": true las migraciones entre PostgreSQL y SQL Server y
+las cargas en modo replace desde un archivo confirman cada lote y
+guardan un checkpoint en logs/etl_state.db: si el trabajo falla, la
+siguiente ejecución continúa desde el último lote confirmado (las
+migraciones ordenan por la clave primaria o por la única columna de
+key_columns). Las rutas relativas se resuelven desde el directorio del
+archivo de trabajos.
+
+El resumen de la ejecución se escribe en JSON (stdout por defecto) y el
+código de salida es 0 si todo terminó bien, 1 si falló algún trabajo, 2
+si las definiciones no son válidas y 130 si se interrumpió.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import APP_NAME, APP_VERSION, CSV_CHUNK_SIZE, MIGRATION_WORKERS, MONGO_WRITE_WORKERS, DatabaseConfig
+
+logger = logging.getLogger("etl_cli")
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_INVALID = 2
+EXIT_INTERRUPTED = 130
+
+DATABASE_TYPES = ("postgres", "sqlserver", "mongodb")
+ENDPOINT_TYPES = ("file",) + DATABASE_TYPES
+WRITE_MODES = ("replace", "append", "merge")
+MIGRATION_DIRECTIONS = ("postgres_to_sqlserver", "sqlserver_to_postgres", "postgres_to_mongodb",
+                        "mongodb_to_postgres", "mongodb_to_sqlserver")
+RESUMABLE_DIRECTIONS = ("postgres_to_sqlserver", "sqlserver_to_postgres")
+
+
+class JobDefinitionError(ValueError):
+    """La definición de un trabajo no es válida"""
+
+
+@dataclass
+class JobResult:
+    """Resultado de un trabajo para el resumen de la ejecución"""
+    name: str
+    status: str = "success"
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    tables: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return self.status == "success"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["seconds"] = round(self.seconds, 3)
+        data["rows_per_second"] = round(self.rows / self.seconds, 1) if self.seconds > 0 else 0.0
+        if not self.tables:
+            del data["tables"]
+        return data
+
+
+# Definiciones
+
+def _expand(value: Any) -> Any:
+    """Sustituir ${VARIABLES} de entorno en todos los textos de la definición"""
+    if isinstance(value, str):
+        return os.path.expandvars(value)
+    if isinstance(value, list):
+        return [_expand(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _expand(item) for key, item in value.items()}
+    return value
+
+
+def _resolve(path: str, base_dir: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+
+def database_config(spec: Dict[str, Any]) -> DatabaseConfig:
+    connection = spec.get("connection")
+    if not isinstance(connection, dict):
+        raise JobDefinitionError(f"Falta 'connection' para el tipo {spec.get('type')}")
+    missing = [name for name in ("host", "port", "database", "username") if not connection.get(name)]
+    if missing:
+        raise JobDefinitionError(f"Faltan campos de conexión: {', '.join(missing)}")
+    return DatabaseConfig(
+        host=str(connection["host"]),
+        port=str(connection["port"]),
+        database=str(connection["database"]),
+        username=str(connection["username"]),
+        password=str(connection.get("password", "")),
+        table_name=str(spec.get("table", ""))
+    )
+
+
+def _validate_endpoint(spec: Any, role: str, base_dir: str) -> Dict[str, Any]:
+    if not isinstance(spec, dict) or spec.get("type") not in ENDPOINT_TYPES:
+        raise JobDefinitionError(f"'{role}.type' debe ser uno de: {', '.join(ENDPOINT_TYPES)}")
+    spec = dict(spec)
+    if spec["type"] == "file":
+        if not spec.get("path"):
+            raise JobDefinitionError(f"Falta '{role}.path'")
+        # La existencia del origen se comprueba al ejecutar: puede crearlo un trabajo anterior
+        spec["path"] = _resolve(spec["path"], base_dir)
+    else:
+        database_config(spec)
+        if not spec.get("table"):
+            raise JobDefinitionError(f"Falta '{role}.table'")
+    return spec
+
+
+def validate_job(job: Any, index: int, base_dir: str) -> Dict[str, Any]:
+    """Comprobar un trabajo y normalizarlo (rutas absolutas, valores por defecto)"""
+    if not isinstance(job, dict):
+        raise JobDefinitionError(f"El trabajo {index} no es un objeto")
+    job = dict(job)
+    job.setdefault("name", f"job{index}")
+    job.setdefault("type", "load")
+    key_columns = job.get("key_columns") or []
+    if not isinstance(key_columns, list):
+        raise JobDefinitionError(f"{job['name']}: 'key_columns' debe ser una lista")
+
+    if job["type"] == "migration":
+        for role in ("source", "target"):
+            if not isinstance(job.get(role), dict):
+                raise JobDefinitionError(f"{job['name']}: falta '{role}'")
+            database_config(job[role])
+        job.setdefault("direction", "postgres_to_sqlserver")
+        if job["direction"] not in MIGRATION_DIRECTIONS:
+            raise JobDefinitionError(
+                f"{job['name']}: 'direction' debe ser uno de: {', '.join(MIGRATION_DIRECTIONS)}")
+        if job["direction"] != "postgres_to_sqlserver" and (job.get("watermark_column") or job.get("partitions")):
+            raise JobDefinitionError(
+                f"{job['name']}: las migraciones incrementales o particionadas solo van de PostgreSQL a SQL Server")
+        if job.get("watermark_column") and not key_columns:
+            raise JobDefinitionError(f"{job['name']}: la migración incremental requiere 'key_columns'")
+        # Un valor mayor que el pool de conexiones se limita al migrar
+        if "workers" in job and (not isinstance(job["workers"], int) or job["workers"] < 1):
+            raise JobDefinitionError(f"{job['name']}: 'workers' debe ser un entero positivo")
+        if job.get("resumable"):
+            if job["direction"] not in RESUMABLE_DIRECTIONS or job.get("watermark_column"):
+                raise JobDefinitionError(
+                    f"{job['name']}: solo las migraciones completas entre PostgreSQL y SQL Server son reanudables")
+            if len(key_columns) > 1:
+                raise JobDefinitionError(f"{job['name']}: la migración reanudable admite una sola columna clave")
+        for table, specs in (job.get("embed") or {}).items():
+            if not isinstance(specs, list) or not all(
+                    isinstance(spec, dict) and {"field", "table", "local_column", "remote_column"} <= spec.keys()
+                    for spec in specs):
+                raise JobDefinitionError(
+                    f"{job['name']}: 'embed.{table}' debe ser una lista de "
+                    f"{{field, table, local_column, remote_column}}")
+        return job
+
+    if job["type"] != "load":
+        raise JobDefinitionError(f"{job['name']}: tipo de trabajo desconocido: {job['type']}")
+    job["source"] = _validate_endpoint(job.get("source"), "source", base_dir)
+    job["target"] = _validate_endpoint(job.get("target"), "target", base_dir)
+    job.setdefault("mode", "replace")
+    if job["mode"] not in WRITE_MODES:
+        raise JobDefinitionError(f"{job['name']}: 'mode' debe ser uno de: {', '.join(WRITE_MODES)}")
+    if job["mode"] == "merge" and not key_columns:
+        raise JobDefinitionError(f"{job['name']}: el modo merge requiere 'key_columns'")
+    if job["mode"] != "replace" and job["target"]["type"] == "file":
+        raise JobDefinitionError(f"{job['name']}: un archivo destino solo admite el modo replace")
+    if job.get("resumable") and (job["mode"] != "replace" or job["source"]["type"] != "file"
+                                 or job["target"]["type"] == "file"):
+        raise JobDefinitionError(
+            f"{job['name']}: solo las cargas en modo replace de un archivo a una base de datos son reanudables")
+
+    pipeline = job.get("pipeline")
+    if isinstance(pipeline, str):
+        job["pipeline"] = _resolve(pipeline, base_dir)
+    load_pipeline(job.get("pipeline"))  # validar los pasos antes de ejecutar nada
+    return job
+
+
+def load_jobs(path: str) -> List[Dict[str, Any]]:
+    """Leer y validar un archivo con uno o varios trabajos"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = _expand(json.load(f))
+    except (OSError, ValueError) as e:
+        raise JobDefinitionError(f"No se pudo leer {path}: {e}")
+
+    jobs = data["jobs"] if isinstance(data, dict) and "jobs" in data else [data]
+    base_dir = os.path.dirname(os.path.abspath(path))
+    jobs = [validate_job(job, i, base_dir) for i, job in enumerate(jobs, start=1)]
+    names = [job["name"] for job in jobs]
+    if len(set(names)) != len(names):
+        raise JobDefinitionError("Los nombres de los trabajos deben ser únicos")
+    return jobs
+
+
+def load_pipeline(definition: Any):
+    """Pipeline desde una ruta JSON, un objeto {"steps": [...]} o una lista de pasos"""
+    from pipeline import Pipeline
+
+    try:
+        if definition is None:
+            return Pipeline()
+        if isinstance(definition, str):
+            return Pipeline.load(definition)
+        if isinstance(definition, list):
+            definition = {"steps": definition}
+        return Pipeline.from_dict(definition)
+    except (OSError, ValueError, KeyError, TypeError, SyntaxError) as e:
+        raise JobDefinitionError(f"Pipeline no válido: {e}")
+
+
+# Ejecución
+
+def _engine(spec: Dict[str, Any]):
+    from databse import DatabaseManager
+
+    config = database_config(spec)
+    if spec["type"] == "postgres":
+        return DatabaseManager.create_postgres_engine(config)
+    return DatabaseManager.create_sqlserver_engine(config)
+
+
+def _mongo_database(spec: Dict[str, Any]):
+    from databse import DatabaseManager
+
+    config = database_config(spec)
+    return DatabaseManager.create_mongo_client(config)[config.database]
+
+
+def open_source(spec: Dict[str, Any], pipeline, chunksize: int) -> Tuple[Iterator, Any]:
+    """Bloques del origen y esquema inferido (solo CSV).
+
+    Las columnas que el pipeline no usa y sus filtros iniciales se empujan
+    a la lectura, igual que al exportar desde la interfaz.
+    """
+    if spec["type"] == "file":
+        from columnar import ColumnarSource, is_columnar
+        from data_loader import ChunkedCSVSource
+        from schema_inference import infer_csv_schema
+
+        schema = None
+        if is_columnar(spec["path"]):
+            source = ColumnarSource(spec["path"], chunksize)
+        else:
+            schema = infer_csv_schema(spec["path"])
+            source = ChunkedCSVSource(spec["path"], chunksize, schema=schema)
+        source.plan = pipeline.read_plan(source.source_columns())
+        return source.iter_chunks(), schema
+
+    if spec["type"] == "mongodb":
+        from analytics import iter_mongo_chunks
+
+        # Sin esquema fijo no se conocen las columnas: el pipeline se aplica tras leer
+        return iter_mongo_chunks(_mongo_database(spec)[spec["table"]], chunksize), None
+
+    from sqlalchemy import inspect
+
+    engine = _engine(spec)
+    if int(spec.get("partitions", 1)) > 1:
+        from databse import DatabaseManager
+        from partitioning import PartitionedReader
+
+        # Cada lector mantiene una conexión del pool mientras lee su rango
+        reader = PartitionedReader(engine, spec["table"], spec.get("partition_column"),
+                                   partitions=int(spec["partitions"]),
+                                   workers=min(int(spec.get("workers", spec["partitions"])),
+                                               DatabaseManager.pool_capacity()),
+                                   chunksize=chunksize)
+        return reader.iter_chunks(), None
+
+    from analytics import iter_sql_chunks
+
+    columns = [col["name"] for col in inspect(engine).get_columns(spec["table"])]
+    return iter_sql_chunks(engine, spec["table"], chunksize, pipeline.read_plan(columns)), None
+
+
+def _column_types(schema, pipeline, dialect: str) -> Optional[Dict[str, Any]]:
+    """Tipos del esquema inferido, salvo las columnas que el pipeline convierte"""
+    if schema is None:
+        return None
+    cast = {step.params["column"] for step in pipeline.steps if step.op == "cast"}
+    return {name: sql_type for name, sql_type in schema.sql_types(dialect).items() if name not in cast}
+
+
+def write_target(chunks, job: Dict[str, Any], schema, pipeline) -> int:
+    """Escribir los bloques en el destino con el modo del trabajo; retorna las filas"""
+    spec, mode, keys = job["target"], job["mode"], job.get("key_columns") or []
+    batch = {"batch_size": int(job["batch_size"])} if job.get("batch_size") else {}
+
+    if spec["type"] == "file":
+        from columnar import write_chunks
+
+        rows, size_mb = write_chunks(chunks, spec["path"])
+        logger.info(f"{spec['path']}: {size_mb:.1f} MB")
+        return rows
+
+    if job.get("resumable"):
+        return _write_resumable(chunks, job, schema, pipeline)
+
+    if spec["type"] == "mongodb":
+        from bulk_loader import upsert_to_mongo, write_to_mongo
+
+        collection = _mongo_database(spec)[spec["table"]]
+        workers = int(job.get("workers", MONGO_WRITE_WORKERS))
+        if mode == "merge":
+            return upsert_to_mongo(chunks, collection, keys, workers=workers, **batch)[0]
+        if mode == "replace":
+            collection.drop()
+        return write_to_mongo(chunks, collection, workers=workers, **batch)[0]
+
+    from bulk_loader import copy_to_postgres, merge_to_database, write_to_sqlserver
+
+    engine = _engine(spec)
+    table_name = spec["table"]
+    if mode == "merge":
+        return merge_to_database(chunks, engine, table_name, keys, **batch)[0]
+    if spec["type"] == "postgres":
+        return copy_to_postgres(chunks, engine, table_name, if_exists=mode,
+                                column_types=_column_types(schema, pipeline, "postgresql"), **batch)[0]
+    return write_to_sqlserver(chunks, engine, table_name, if_exists=mode,
+                              column_types=_column_types(schema, pipeline, "mssql"), **batch)[0]
+
+
+def _write_resumable(chunks, job: Dict[str, Any], schema, pipeline) -> int:
+    """Reemplazar el destino lote a lote con checkpoint; al reanudar salta las filas ya cargadas"""
+    from checkpoint import CheckpointStore, batch_writer, checkpoint_key, file_fingerprint, load_resumable
+
+    spec, path = job["target"], job["source"]["path"]
+    if spec["type"] == "mongodb":
+        target, column_types = _mongo_database(spec), None
+    else:
+        target = _engine(spec)
+        column_types = _column_types(schema, pipeline, "postgresql" if spec["type"] == "postgres" else "mssql")
+    # Si cambia el archivo o el pipeline, el checkpoint anterior no vale
+    key = checkpoint_key(path, database_config(spec), spec["table"],
+                         f"{file_fingerprint(path)}:{pipeline.fingerprint()}")
+    batch = {"batch_size": int(job["batch_size"])} if job.get("batch_size") else {}
+    rows, skipped = load_resumable(chunks, batch_writer(target, spec["table"], column_types), target,
+                                   spec["table"], CheckpointStore(), key, **batch)
+    if skipped:
+        logger.info(f"{spec['table']}: reanudado tras {skipped} filas ya cargadas")
+    return rows
+
+
+def run_load(job: Dict[str, Any], result: JobResult):
+    pipeline = load_pipeline(job.get("pipeline"))
+    chunksize = int(job["source"].get("chunksize", CSV_CHUNK_SIZE))
+    chunks, schema = open_source(job["source"], pipeline, chunksize)
+    result.rows = write_target(pipeline.run(chunks), job, schema, pipeline)
+
+
+def run_migration(job: Dict[str, Any], result: JobResult):
+    from migrations import (Embedding, migrate_mongo_to_relational, migrate_postgres_to_mongo,
+                            migrate_postgres_to_sqlserver, migrate_sqlserver_to_postgres)
+
+    source, target = database_config(job["source"]), database_config(job["target"])
+    workers = int(job.get("workers", MIGRATION_WORKERS))
+    if job["direction"] == "sqlserver_to_postgres":
+        kwargs = {"fetch_size": int(job["batch_size"])} if job.get("batch_size") else {}
+        key_columns = job.get("key_columns") or []
+        tables = migrate_sqlserver_to_postgres(source, target, tables=job.get("tables"), workers=workers,
+                                               resumable=bool(job.get("resumable")),
+                                               key_column=key_columns[0] if key_columns else None, **kwargs)
+    elif job["direction"] == "postgres_to_mongodb":
+        kwargs = {"batch_size": int(job["batch_size"])} if job.get("batch_size") else {}
+        embed = {table: [Embedding.from_dict(spec) for spec in specs]
+                 for table, specs in (job.get("embed") or {}).items()}
+        tables = migrate_postgres_to_mongo(source, target, tables=job.get("tables"), workers=workers,
+                                           collections=job.get("collections"), embed=embed,
+                                           id_columns=job.get("id_columns"), **kwargs)
+    elif job["direction"].startswith("mongodb_to_"):
+        kwargs = {"batch_size": int(job["batch_size"])} if job.get("batch_size") else {}
+        if job.get("sample_size"):
+            kwargs["sample_size"] = int(job["sample_size"])
+        tables = migrate_mongo_to_relational(source, target, job["direction"][len("mongodb_to_"):],
+                                             collections=job.get("tables"), workers=workers, **kwargs)
+    else:
+        kwargs = {"batch_size": int(job["batch_size"])} if job.get("batch_size") else {}
+        tables = migrate_postgres_to_sqlserver(
+            source,
+            target,
+            tables=job.get("tables"),
+            workers=workers,
+            partitions=int(job.get("partitions", 1)),
+            watermark_column=job.get("watermark_column"),
+            key_columns=job.get("key_columns"),
+            resumable=bool(job.get("resumable")),
+            **kwargs
+        )
+    result.rows = sum(table.rows for table in tables)
+    result.tables = [
+        {"table": table.table, "rows": table.rows, "seconds": round(table.seconds, 3), "error": table.error}
+        for table in sorted(tables, key=lambda t: t.table)
+    ]
+    failed = [table.table for table in tables if not table.success]
+    if failed:
+        raise RuntimeError(f"Fallaron {len(failed)} tablas: {', '.join(failed)}")
+
+
+def run_job(job: Dict[str, Any]) -> JobResult:
+    """Ejecutar un trabajo; los errores quedan registrados en el resultado"""
+    result = JobResult(job["name"])
+    start = time.perf_counter()
+    logger.info(f"Iniciando el trabajo {job['name']}")
+    try:
+        if job["type"] == "migration":
+            run_migration(job, result)
+        else:
+            run_load(job, result)
+    except Exception as e:
+        logger.exception(f"Error en el trabajo {job['name']}")
+        result.status = "failed"
+        result.error = str(e)
+    result.seconds = time.perf_counter() - start
+    logger.info(f"Trabajo {job['name']}: {result.status}, {result.rows} filas en {result.seconds:.2f}s")
+    return result
+
+
+def run_jobs(jobs: List[Dict[str, Any]], continue_on_error: bool = False) -> List[JobResult]:
+    """Ejecutar los trabajos en orden; sin `continue_on_error` se detiene en el primer fallo"""
+    results = []
+    for job in jobs:
+        result = run_job(job)
+        results.append(result)
+        if not result.success and not continue_on_error:
+            for pending in jobs[len(results):]:
+                results.append(JobResult(pending["name"], status="skipped"))
+            break
+    return results
+
+
+def build_summary(results: List[JobResult], started_at: datetime, seconds: float, status: str) -> Dict[str, Any]:
+    return {
+        "app": APP_NAME,
+        "version": APP_VERSION,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "seconds": round(seconds, 3),
+        "status": status,
+        "rows": sum(result.rows for result in results),
+        "jobs": [result.to_dict() for result in results],
+    }
+
+
+def _write_summary(summary: Dict[str, Any], path: str):
+    text = json.dumps(summary, indent=2, default=str)
+    if path == "-":
+        print(text)
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ejecutar trabajos ETL definidos en JSON sin interfaz gráfica")
+    parser.add_argument("jobs", help="Archivo JSON con un trabajo o {\"jobs\": [...]}")
+    parser.add_argument("--summary", default="-", help="Archivo del resumen JSON (- = stdout)")
+    parser.add_argument("--continue-on-error", action="store_true",
+                        help="Seguir con los siguientes trabajos si uno falla")
+    parser.add_argument("--check", action="store_true", help="Solo validar las definiciones")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    args = parser.parse_args(argv)
+
+    # Los logs van a stderr para que stdout quede libre para el resumen
+    logging.basicConfig(
+        level=args.log_level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+
+    started_at, start = datetime.now(), time.perf_counter()
+    try:
+        jobs = load_jobs(args.jobs)
+    except JobDefinitionError as e:
+        logger.error(str(e))
+        _write_summary({**build_summary([], started_at, 0.0, "invalid"), "error": str(e)}, args.summary)
+        return EXIT_INVALID
+
+    if args.check:
+        logger.info(f"{len(jobs)} trabajos válidos en {args.jobs}")
+        results = [JobResult(job["name"], status="valid") for job in jobs]
+        _write_summary(build_summary(results, started_at, time.perf_counter() - start, "valid"), args.summary)
+        return EXIT_OK
+
+    results: List[JobResult] = []
+    code = EXIT_OK
+    try:
+        results = run_jobs(jobs, args.continue_on_error)
+        if not all(result.success for result in results):
+            code = EXIT_FAILED
+    except KeyboardInterrupt:
+        logger.warning("Ejecución interrumpida")
+        code = EXIT_INTERRUPTED
+    finally:
+        from databse import engine_registry
+        engine_registry.dispose_all()
+
+    status = {EXIT_OK: "success", EXIT_FAILED: "failed", EXIT_INTERRUPTED: "interrupted"}[code]
+    _write_summary(build_summary(results, started_at, time.perf_counter() - start, status), args.summary)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
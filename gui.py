@@ -1,18 +1,38 @@
+from __future__ import annotations
+
 import customtkinter as ctk
 from tkinter import filedialog, messagebox, ttk
-import pandas as pd
-from typing import List, Optional, Tuple, Dict, Any
-from config import AppConfig, DatabaseConfig
-from docker_manager import DockerManager
-#from database import DatabaseManag
+from typing import Callable, List, Optional, Tuple, Dict, Any, Union
+from config import (ANALYTICS_PROGRESS_INTERVAL, AppConfig, DatabaseConfig, MIGRATION_WORKERS, PREVIEW_CACHE_PAGES,
+                    PREVIEW_PAGE_SIZE, SUPPORTED_FILE_TYPES)
+from docker_manager import DockerManager, DockerStatusMonitor, ServiceStatus
+from job_executor import JobCancelled, JobExecutor, current_job
+from lazy_import import lazy_import, preload
+import copy
 import logging
 import os
+from collections import OrderedDict
 from datetime import datetime
-import pymongo
 from logging.handlers import RotatingFileHandler
 import json
-from sqlalchemy import create_engine, inspect
-
+import time
+
+# Heavy dependencies are imported on first use so the window paints first
+pd = lazy_import("pandas")
+sqlalchemy = lazy_import("sqlalchemy")
+data_loader = lazy_import("data_loader")
+columnar = lazy_import("columnar")
+read_plan = lazy_import("read_plan")
+pipeline = lazy_import("pipeline")
+schema_inference = lazy_import("schema_inference")
+bulk_loader = lazy_import("bulk_loader")
+analytics = lazy_import("analytics")
+databse = lazy_import("databse")
+migrations = lazy_import("migrations")
+checkpoint = lazy_import("checkpoint")
+backup = lazy_import("backup")
+HEAVY_MODULES = [pd, sqlalchemy, data_loader, columnar, read_plan, pipeline, schema_inference,
+                 bulk_loader, analytics, databse, migrations, checkpoint, backup]
 
 # Configure logging
 def setup_logging():
@@ -35,25 +55,14 @@ logger = setup_logging()
 
 # Stub implementations to fix undefined errors
 
-class DatabaseManager:
-    @staticmethod
-    def create_postgres_engine(config: DatabaseConfig):
-        # stub implementation, should create and return a database engine
-        return None
-
-    @staticmethod
-    def create_sqlserver_engine(config: DatabaseConfig):
-        # stub implementation, should create and return a database engine
-        return None
-
-    @staticmethod
-    def test_connection(engine):
-        # stub implementation always returns success
-        return True, "Connection successful"
-
 class BackupManager:
     def create_postgres_backup(self, config: DatabaseConfig):
-         return True, "PostgreSQL backup created successfully"
+        """Parallel, compressed pg_dump in directory format (runs on a worker thread)"""
+        result = backup.backup_postgres(config, on_progress=self._progress("Dumping"))
+        if not result.success:
+            return False, f"PostgreSQL backup failed: {result.error}"
+        return True, (f"PostgreSQL backup created in {result.path} ({result.bytes / 1024 ** 2:.1f} MB in "
+                      f"{result.seconds:.1f}s, {result.rate / 1024 ** 2:.1f} MB/s with {result.jobs} jobs)")
 
     def create_sqlserver_backup(self, config: DatabaseConfig):
          return True, "SQL Server backup created successfully"
@@ -62,7 +71,11 @@ class BackupManager:
          return True, "MongoDB backup created successfully"
 
     def restore_postgres_backup(self, config: DatabaseConfig, backup_file: str):
-         return True, "PostgreSQL backup restored successfully"
+        """Parallel pg_restore of a directory-format backup (runs on a worker thread)"""
+        result = backup.restore_postgres(config, backup_file, on_progress=self._progress("Restoring"))
+        if not result.success:
+            return False, f"PostgreSQL restore failed: {result.error}"
+        return True, f"PostgreSQL backup restored from {result.path} in {result.seconds:.1f}s ({result.jobs} jobs)"
 
     def restore_sqlserver_backup(self, config: DatabaseConfig, backup_file: str):
          return True, "SQL Server backup restored successfully"
@@ -70,6 +83,64 @@ class BackupManager:
     def restore_mongodb_backup(self, config: DatabaseConfig, backup_file: str):
          return True, "MongoDB backup restored successfully"
 
+    @staticmethod
+    def _progress(action: str):
+        """Report size and throughput to the running job; raises JobCancelled to stop the tool"""
+        job = current_job()
+
+        def report(seconds: float, written: Optional[int]):
+            if job is None:
+                return
+            job.check_cancelled()
+            if written is None:
+                job.report_progress(None, f"{action}... {seconds:.0f}s")
+            else:
+                rate = written / seconds if seconds > 0 else 0
+                job.report_progress(None, f"{action}... {written / 1024 ** 2:.1f} MB ({rate / 1024 ** 2:.1f} MB/s)")
+        return report
+
+
+class ExportSnapshot:
+    """The data an export job reads, captured on the Tk thread
+
+    Jobs run on worker threads while the user keeps editing the pipeline or loads
+    another file; the job only ever sees this copy.
+    """
+
+    def __init__(self, pipeline_steps: pipeline.Pipeline, raw_df: Optional[pd.DataFrame],
+                 data_source: Optional[data_loader.ChunkedSource],
+                 schema: Optional[schema_inference.InferredSchema], columns: List[str]):
+        self.pipeline = pipeline.Pipeline.from_dict(pipeline_steps.to_dict())
+        self.raw_df = raw_df
+        self.schema = schema
+        self.columns = list(columns)
+        self.data_source = None
+        if data_source is not None:
+            # Columns the pipeline never uses and its leading filters are pushed into the read
+            self.data_source = copy.copy(data_source)
+            self.data_source.plan = self.pipeline.read_plan(data_source.source_columns())
+
+    def column_types(self, dialect: str) -> Optional[Dict[str, Any]]:
+        """Target column types from the inferred schema, for columns still present"""
+        if self.schema is None:
+            return None
+        # Cast columns no longer have the inferred type
+        columns = set(self.columns) - {step.params["column"] for step in self.pipeline.steps if step.op == "cast"}
+        return {name: sql_type for name, sql_type in self.schema.sql_types(dialect).items() if name in columns}
+
+    def iter_chunks(self):
+        """Yield the data chunk by chunk with the pipeline applied in a single pass (worker thread)"""
+        chunks = self.data_source.iter_chunks() if self.data_source is not None else [self.raw_df]
+        job = current_job()
+        rows = 0
+        for chunk in self.pipeline.run(chunks):
+            if job is not None:
+                job.check_cancelled()
+            yield chunk
+            rows += len(chunk)
+            if job is not None:
+                job.report_progress(None, f"{rows} rows processed")
+
 
 class ModernTheme:
     """Modern color scheme and styling constants"""
@@ -122,25 +193,171 @@ class LoadingSpinner(ctk.CTkFrame):
             self.after(100, lambda: self.spinner_label.configure(text="⟲"))
             self.after(200, self._spin)
 
+class VirtualDataPreview(ctk.CTkFrame):
+    """Treeview preview that materializes only the visible window of a DataFrame.
+
+    Rows are formatted to strings column-wise one page at a time and kept in
+    an LRU cache, so scrolling a frame with millions of rows only touches the
+    few pages around the viewport and the number of Treeview items stays fixed.
+    """
+
+    def __init__(self, master, page_size: int = PREVIEW_PAGE_SIZE, cache_pages: int = PREVIEW_CACHE_PAGES):
+        super().__init__(master)
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.df: Optional[pd.DataFrame] = None
+        self.first_row = 0
+        self.visible_rows = 20
+        self._pages: "OrderedDict[int, List[tuple]]" = OrderedDict()
+        self._tree_height = 0
+        self._resize_pending: Optional[str] = None
+
+        # Create scrollbars; the vertical one maps to row offsets, not to Treeview items
+        self.y_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.y_scrollbar.pack(side="right", fill="y")
+
+        self.x_scrollbar = ttk.Scrollbar(self, orient="horizontal")
+        self.x_scrollbar.pack(side="bottom", fill="x")
+
+        self.tree = ttk.Treeview(
+            self,
+            show="headings",
+            xscrollcommand=self.x_scrollbar.set
+        )
+        self.tree.pack(fill="both", expand=True)
+        self.x_scrollbar.config(command=self.tree.xview)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        # X11 delivers wheel notches as button 4 (up) and 5 (down)
+        self.tree.bind("<Button-4>", self._on_wheel_button)
+        self.tree.bind("<Button-5>", self._on_wheel_button)
+
+    @property
+    def total_rows(self) -> int:
+        return 0 if self.df is None else len(self.df)
+
+    def set_data(self, df: Optional[pd.DataFrame]):
+        self.df = df
+        self.first_row = 0
+        self._pages.clear()
+
+        columns = [] if df is None else [str(col) for col in df.columns]
+        self.tree.delete(*self.tree.get_children())
+        self.tree['columns'] = columns
+        for col in columns:
+            self.tree.heading(col, text=col)
+            # Set a reasonable minimum column width
+            self.tree.column(col, minwidth=100, width=100)
+        self._render()
+
+    def _get_page(self, page: int) -> List[tuple]:
+        if page in self._pages:
+            self._pages.move_to_end(page)
+            return self._pages[page]
+
+        start = page * self.page_size
+        chunk = self.df.iloc[start:start + self.page_size]
+        # Format whole columns at once instead of converting cell by cell
+        formatted = [chunk[col].astype(str).tolist() for col in chunk.columns]
+        rows = list(zip(*formatted))
+
+        self._pages[page] = rows
+        if len(self._pages) > self.cache_pages:
+            self._pages.popitem(last=False)
+        return rows
+
+    def _get_rows(self, start: int, stop: int) -> List[tuple]:
+        rows = []
+        for page in range(start // self.page_size, (stop - 1) // self.page_size + 1):
+            page_rows = self._get_page(page)
+            offset = page * self.page_size
+            rows.extend(page_rows[max(start - offset, 0):stop - offset])
+        return rows
+
+    def _render(self):
+        total = self.total_rows
+        stop = min(self.first_row + self.visible_rows, total)
+        rows = self._get_rows(self.first_row, stop) if stop > self.first_row else []
+
+        items = self.tree.get_children()
+        for i, values in enumerate(rows):
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert("", "end", values=values)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+
+        if total:
+            self.y_scrollbar.set(self.first_row / total, stop / total)
+        else:
+            self.y_scrollbar.set(0, 1)
+
+    def scroll_to(self, row: int):
+        max_first = max(self.total_rows - self.visible_rows, 0)
+        row = min(max(int(row), 0), max_first)
+        if row != self.first_row:
+            self.first_row = row
+            self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(value) * self.total_rows)
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_to(self.first_row + int(value) * step)
+
+    def _scroll_lines(self, notches: float):
+        # Three rows per notch; a partial notch (touchpads) still moves one row
+        lines = round(notches * 3) or (1 if notches > 0 else -1 if notches < 0 else 0)
+        self.scroll_to(self.first_row + lines)
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS reports the notch count itself
+        if self.tk.call("tk", "windowingsystem") == "aqua":
+            notches = -event.delta
+        else:
+            notches = -event.delta / 120
+        self._scroll_lines(notches)
+
+    def _on_wheel_button(self, event):
+        self._scroll_lines(-1 if event.num == 4 else 1)
+
+    def _on_resize(self, event):
+        # Configure fires repeatedly while the window is dragged; render once when idle
+        self._tree_height = event.height
+        if self._resize_pending is None:
+            self._resize_pending = self.after_idle(self._apply_resize)
+
+    def _apply_resize(self):
+        self._resize_pending = None
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # Leave room for the heading row
+        visible = max((self._tree_height - row_height) // row_height, 1)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            max_first = max(self.total_rows - self.visible_rows, 0)
+            self.first_row = min(self.first_row, max_first)
+            self._render()
+
 class DockerStatusFrame(ctk.CTkFrame):
-    def __init__(self, master, docker_config, service_name):
+    def __init__(self, master, docker_config, service_name, executor: JobExecutor,
+                 monitor: DockerStatusMonitor, service_key: str):
         super().__init__(master)
         self.configure(fg_color=ModernTheme.CARD_BG)
 
         self.docker_config = docker_config
         self.service_name = service_name
-        self.docker_manager = DockerManager()
+        self.executor = executor
+        # Status comes from the shared monitor (one docker ps for every service)
+        self.monitor = monitor
+        self.service_key = service_key
+        self.docker_manager = monitor.manager
         self.logger = logging.getLogger(__name__)
-
-        if not os.path.exists(docker_config.compose_file):
-            self.logger.error(f"Docker compose file not found for {service_name}")
-            messagebox.showerror(
-                "Error",
-                f"Docker compose file not found for {service_name} at:\n{docker_config.compose_file}"
-            )
+        self._last_state: Optional[str] = None
 
         self._create_widgets()
-        self.update_status()
 
     def _create_widgets(self):
         header_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -203,77 +420,103 @@ class DockerStatusFrame(ctk.CTkFrame):
         self.logs_text.see("end")
 
     def start_service(self):
-        try:
-            self._show_loading("Starting service...")
-            success, message = self.docker_manager.docker_compose_up(self.docker_config.compose_file)
-            self._update_logs(message)
-
-            if success:
-                messagebox.showinfo("Success", message)
-            else:
-                messagebox.showerror("Error", message)
-        except Exception as e:
-            self.logger.error(f"Error starting {self.service_name}: {e}")
-            self._update_logs(f"Error: {str(e)}")
-            messagebox.showerror("Error", f"Error starting {self.service_name}: {str(e)}")
-        finally:
-            self._hide_loading()
-            self.update_status()
+        self._run_service_command("Starting", self.docker_manager.docker_compose_up)
 
     def stop_service(self):
-        try:
-            self._show_loading("Stopping service...")
-            success, message = self.docker_manager.docker_compose_down(self.docker_config.compose_file)
+        self._run_service_command("Stopping", self.docker_manager.docker_compose_down)
+
+    def _run_service_command(self, action: str, command):
+        """Run a docker compose command on the job executor and report back on the UI thread"""
+        spinner = self._show_loading(f"{action} service...")
+
+        def on_success(result):
+            self._hide_loading(spinner)
+            success, message = result
             self._update_logs(message)
 
             if success:
                 messagebox.showinfo("Success", message)
             else:
                 messagebox.showerror("Error", message)
-        except Exception as e:
-            self.logger.error(f"Error stopping {self.service_name}: {e}")
+            self.update_status()
+
+        def on_error(e):
+            self._hide_loading(spinner)
+            if isinstance(e, JobCancelled):
+                self._update_logs(f"{action} {self.service_name} cancelled")
+                return
+            self.logger.error(f"Error {action.lower()} {self.service_name}: {e}")
             self._update_logs(f"Error: {str(e)}")
-            messagebox.showerror("Error", f"Error stopping {self.service_name}: {str(e)}")
-        finally:
-            self._hide_loading()
+            messagebox.showerror("Error", f"Error {action.lower()} {self.service_name}: {str(e)}")
             self.update_status()
 
+        self.executor.submit(
+            f"{action} {self.service_name}",
+            command,
+            self.docker_config.compose_file,
+            on_success=on_success,
+            on_error=on_error
+        )
+
     def _show_loading(self, text=""):
         self.loading_spinner = LoadingSpinner(self, text)
         self.loading_spinner.pack(pady=10)
         self.loading_spinner.start()
+        return self.loading_spinner
 
-    def _hide_loading(self):
-        if hasattr(self, 'loading_spinner'):
-            self.loading_spinner.stop()
-            self.loading_spinner.destroy()
+    def _hide_loading(self, spinner=None):
+        spinner = spinner or getattr(self, 'loading_spinner', None)
+        if spinner is not None:
+            spinner.stop()
+            spinner.destroy()
 
     def update_status(self):
-        try:
-            success, output = self.docker_manager.check_docker_status(self.docker_config.compose_file)
-            is_running = success and "Up" in output
+        """Request a fresh status; the monitor pushes it to every frame"""
+        self.executor.submit(
+            f"Check {self.service_name} status",
+            self.monitor.snapshot,
+            True,
+            on_error=self._apply_status_error
+        )
 
-            status_text = "Running" if is_running else "Stopped"
-            status_color = ModernTheme.SUCCESS if is_running else ModernTheme.ERROR
+    def apply_status(self, status: ServiceStatus):
+        is_running = status.running
 
-            self.status_label.configure(
-                text=f"{self.service_name} Status: {status_text}",
-                text_color=status_color
-            )
+        status_text = "Running" if is_running else "Stopped"
+        status_color = ModernTheme.SUCCESS if is_running else ModernTheme.ERROR
 
-            self.up_button.configure(state="normal" if not is_running else "disabled")
-            self.down_button.configure(state="normal" if is_running else "disabled")
+        self.status_label.configure(
+            text=f"{self.service_name} Status: {status_text}",
+            text_color=status_color
+        )
 
-            self._update_logs(f"Status updated: {status_text}")
-        except Exception as e:
-            self.logger.error(f"Error updating status for {self.service_name}: {e}")
-            self.status_label.configure(
-                text=f"{self.service_name} Status: Error",
-                text_color=ModernTheme.ERROR
-            )
-            self._update_logs(f"Error updating status: {str(e)}")
-            self.up_button.configure(state="normal")
-            self.down_button.configure(state="disabled")
+        self.up_button.configure(state="normal" if not is_running else "disabled")
+        self.down_button.configure(state="normal" if is_running else "disabled")
+
+        # Periodic polls only log changes
+        if status.state != self._last_state:
+            self._last_state = status.state
+            self._update_logs(f"Status updated: {status_text} ({status.detail or status.state})")
+
+    def _apply_status_error(self, e: BaseException):
+        if isinstance(e, JobCancelled):
+            return
+        self._last_state = None
+        self.logger.error(f"Error updating status for {self.service_name}: {e}")
+        self.status_label.configure(
+            text=f"{self.service_name} Status: Error",
+            text_color=ModernTheme.ERROR
+        )
+        self._update_logs(f"Error updating status: {str(e)}")
+        self.up_button.configure(state="normal")
+        self.down_button.configure(state="disabled")
+
+    def show_setup_error(self, message: str):
+        self.status_label.configure(
+            text=f"{self.service_name} Status: Unavailable",
+            text_color=ModernTheme.ERROR
+        )
+        self._update_logs(message)
 
 class DatabaseConnectionFrame(ctk.CTkFrame):
     def __init__(self, master, title: str, config: DatabaseConfig):
@@ -369,10 +612,10 @@ class DatabaseConnectionFrame(ctk.CTkFrame):
             if "mongo" in self.winfo_name().lower():
                 success, message = self.test_mongo_connection(config)
             else:
-                engine = (DatabaseManager.create_postgres_engine(config)
+                engine = (databse.DatabaseManager.create_postgres_engine(config)
                           if "postgres" in self.winfo_name().lower()
-                          else DatabaseManager.create_sqlserver_engine(config))
-                success, message = DatabaseManager.test_connection(engine)
+                          else databse.DatabaseManager.create_sqlserver_engine(config))
+                success, message = databse.DatabaseManager.test_connection(engine)
 
             # Update status
             self.status_label.configure(
@@ -394,16 +637,10 @@ class DatabaseConnectionFrame(ctk.CTkFrame):
 
     def test_mongo_connection(self, config: DatabaseConfig) -> Tuple[bool, str]:
         try:
-            client = pymongo.MongoClient(
-                host=config.host,
-                port=int(config.port),
-                username=config.username,
-                password=config.password
-            )
+            client = databse.DatabaseManager.create_mongo_client(config)
 
             # Test connection
             client.server_info()
-            client.close()
 
             return True, "Successfully connected to MongoDB"
         except Exception as e:
@@ -471,20 +708,13 @@ class DataAnalyticsFrame(ctk.CTkFrame):
 
             if db_type == "postgresql":
                 config = self.main_app.pg_connection.get_config()
-                conn_string = f'postgresql://{config.username}:{config.password}@{config.host}:{config.port}/{config.database}'
-                engine = create_engine(conn_string)
+                engine = databse.DatabaseManager.create_postgres_engine(config)
             elif db_type == "sql server":
                 config = self.main_app.sql_connection.get_config()
-                conn_string = f'mssql+pyodbc://{config.username}:{config.password}@{config.host}:{config.port}/{config.database}?driver=ODBC+Driver+17+for+SQL+Server'
-                engine = create_engine(conn_string)
+                engine = databse.DatabaseManager.create_sqlserver_engine(config)
             else:  # MongoDB
                 config = self.main_app.mongo_connection.get_config()
-                client = pymongo.MongoClient(
-                    host=config.host,
-                    port=int(config.port),
-                    username=config.username,
-                    password=config.password
-                )
+                client = databse.DatabaseManager.create_mongo_client(config)
                 db = client[config.database]
                 tables = db.list_collection_names()
                 self.update_table_list(tables)
@@ -492,7 +722,7 @@ class DataAnalyticsFrame(ctk.CTkFrame):
 
             # Test connection for SQL databases
             with engine.connect() as connection:
-                inspector = inspect(engine)
+                inspector = sqlalchemy.inspect(engine)
                 tables = inspector.get_table_names()
                 self.update_table_list(tables)
                 messagebox.showinfo("Success", "Connected to database successfully")
@@ -539,50 +769,125 @@ class DataAnalyticsFrame(ctk.CTkFrame):
                     messagebox.showwarning("Warning", "Please select a table first!")
                     return
 
-                # Get data from database
+                pushdown = self.analysis_mode.get().startswith("Push-down")
+                plan = self._read_plan()
                 if db_type == "postgresql":
                     config = self.main_app.pg_connection.get_config()
-                    conn_string = f'postgresql://{config.username}:{config.password}@{config.host}:{config.port}/{config.database}'
-                    engine = create_engine(conn_string)
-                    df = pd.read_sql_table(table_name, engine)
-
                 elif db_type == "sql server":
                     config = self.main_app.sql_connection.get_config()
-                    conn_string = f'mssql+pyodbc://{config.username}:{config.password}@{config.host}:{config.port}/{config.database}?driver=ODBC+Driver+17+for+SQL+Server'
-                    engine = create_engine(conn_string)
-                    df = pd.read_sql_table(table_name, engine)
-
                 else:  # MongoDB
                     config = self.main_app.mongo_connection.get_config()
-                    client = pymongo.MongoClient(
-                        host=config.host,
-                        port=int(config.port),
-                        username=config.username,
-                        password=config.password
-                    )
-                    db = client[config.database]
-                    collection = db[table_name]
-                    df = pd.DataFrame(list(collection.find()))
-                    client.close()
-
-                # Perform basic analysis
-                self.show_analysis(df)
+
+                self.migrate_btn.configure(state="disabled")
+                self.main_app.executor.submit(
+                    f"Analyze {table_name}",
+                    self._compute_analysis,
+                    db_type, config, table_name, pushdown, plan,
+                    on_success=self._on_analysis_done,
+                    on_error=self._on_analysis_error,
+                    on_progress=lambda progress, message, stats: self.show_analysis(stats)
+                )
 
             except Exception as e:
-                error_msg = str(e)
-                messagebox.showerror("Error", f"Error analyzing table: {error_msg}")
-                if "NoneType" in error_msg:
-                    messagebox.showinfo("Tip", "Please make sure you are connected to the database first by clicking the 'Connect' button.")
+                self._on_analysis_error(e)
+
+    @staticmethod
+    def _partial_stats_reporter() -> Callable[[analytics.TableStats], None]:
+        # Runs on the worker thread: cancellation is checked after every chunk, but the UI only
+        # gets the describe() frame, at most once per ANALYTICS_PROGRESS_INTERVAL
+        last_report = float("-inf")
+
+        def report(stats: analytics.TableStats):
+            nonlocal last_report
+            job = current_job()
+            if job is None:
+                return
+            job.check_cancelled()
+            now = time.monotonic()
+            if now - last_report < ANALYTICS_PROGRESS_INTERVAL:
+                return
+            last_report = now
+            snapshot = analytics.TableSummary(stats.rows, dict(stats.dtypes), stats.describe().to_dict())
+            job.report_progress(None, f"{stats.rows} rows analyzed", snapshot)
+
+        return report
+
+    def _compute_analysis(self, db_type: str, config: DatabaseConfig, table_name: str, pushdown: bool,
+                          plan: Optional[read_plan.ReadPlan] = None):
+        # Summarize inside the database, or stream the table through a server-side cursor
+        if db_type in ("postgresql", "sql server"):
+            engine = (databse.DatabaseManager.create_postgres_engine(config)
+                      if db_type == "postgresql"
+                      else databse.DatabaseManager.create_sqlserver_engine(config))
+            if pushdown:
+                return analytics.summarize_sql_table(engine, table_name, plan=plan)
+            return analytics.analyze_chunks(analytics.iter_sql_chunks(engine, table_name, plan=plan),
+                                            on_progress=self._partial_stats_reporter())
+
+        client = databse.DatabaseManager.create_mongo_client(config)
+        collection = client[config.database][table_name]
+        if pushdown:
+            return analytics.summarize_mongo_collection(collection, plan=plan)
+        return analytics.analyze_chunks(analytics.iter_mongo_chunks(collection, plan=plan),
+                                        on_progress=self._partial_stats_reporter())
+
+    def _on_analysis_done(self, stats):
+        self.migrate_btn.configure(state="normal")
+        self.show_analysis(stats)
+
+    def _on_analysis_error(self, e: BaseException):
+        self.migrate_btn.configure(state="normal")
+        if isinstance(e, JobCancelled):
+            return
+        error_msg = str(e)
+        messagebox.showerror("Error", f"Error analyzing table: {error_msg}")
+        if "NoneType" in error_msg:
+            messagebox.showinfo("Tip", "Please make sure you are connected to the database first by clicking the 'Connect' button.")
 
     def create_analytics_controls(self):
         controls_frame = ctk.CTkFrame(self, fg_color="transparent")
         controls_frame.pack(fill="x", padx=10, pady=5)
 
+        ctk.CTkLabel(
+            controls_frame,
+            text="Analysis mode",
+            font=ModernTheme.TEXT_FONT
+        ).pack(side="left", padx=5)
+
+        # Push-down computes the summary inside the database; streaming reads every row
+        self.analysis_mode = ctk.CTkComboBox(
+            controls_frame,
+            values=["Push-down (in database)", "Streaming (client side)"]
+        )
+        self.analysis_mode.pack(side="left", padx=5)
+
+        # Projection and row filter are pushed into the query / find()
+        self.analysis_columns = ctk.CTkEntry(
+            controls_frame,
+            placeholder_text="Columns (comma separated, empty = all)",
+            width=240
+        )
+        self.analysis_columns.pack(side="left", padx=5)
+
+        self.analysis_filter = ctk.CTkEntry(
+            controls_frame,
+            placeholder_text="Filter, e.g. year >= 2015 and fuel == 'Diesel'",
+            width=280
+        )
+        self.analysis_filter.pack(side="left", fill="x", expand=True, padx=5)
+
+    def _read_plan(self) -> read_plan.ReadPlan:
+        columns = [name.strip() for name in self.analysis_columns.get().split(",") if name.strip()]
+        plan = read_plan.ReadPlan().select(columns)
+        if self.analysis_filter.get().strip():
+            plan.add_filter(self.analysis_filter.get())
+        return plan
+
     def create_results_area(self):
         self.results_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.results_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
-    def show_analysis(self, df):
+    def show_analysis(self, stats: Union[analytics.TableStats, analytics.TableSummary]):
         # Clear previous results
         for widget in self.results_frame.winfo_children():
             widget.destroy()
@@ -597,23 +902,79 @@ class DataAnalyticsFrame(ctk.CTkFrame):
 
         # Add basic statistics
         stats_text.insert("end", "Basic Statistics:\n\n")
-        stats_text.insert("end", f"Number of rows: {len(df)}\n")
-        stats_text.insert("end", f"Number of columns: {len(df.columns)}\n\n")
+        stats_text.insert("end", f"Number of rows: {stats.rows}\n")
+        stats_text.insert("end", f"Number of columns: {len(stats.columns)}\n\n")
         stats_text.insert("end", "Columns:\n")
-        for col in df.columns:
-            stats_text.insert("end", f"- {col}: {df[col].dtype}\n")
+        for col, dtype in stats.dtypes.items():
+            stats_text.insert("end", f"- {col}: {dtype}\n")
 
-        # Add numerical statistics if available
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-        if len(numeric_cols) > 0:
-            stats_text.insert("end", "\nNumerical Statistics:\n")
-            stats = df[numeric_cols].describe()
-            stats_text.insert("end", str(stats))
+        # Add per-column statistics if available
+        numeric_stats = stats.describe()
+        if len(numeric_stats.columns) > 0:
+            stats_text.insert("end", "\nColumn Statistics:\n")
+            stats_text.insert("end", str(numeric_stats))
 
         stats_text.configure(state="disabled")
+        # Paint partial results while the cursor is still streaming
+        self.update_idletasks()
+
+class JobQueueFrame(ctk.CTkFrame):
+    """Lists background jobs with their status/progress and lets the user cancel them"""
+
+    def __init__(self, master, executor: JobExecutor):
+        super().__init__(master)
+        self.configure(fg_color=ModernTheme.CARD_BG)
+        self.executor = executor
+
+        header = ctk.CTkLabel(
+            self,
+            text="Background Jobs",
+            font=ModernTheme.HEADER_FONT
+        )
+        header.pack(pady=10)
+
+        self.jobs_tree = ttk.Treeview(
+            self,
+            columns=("id", "name", "status", "progress", "message"),
+            show="headings"
+        )
+        for col, width in (("id", 50), ("name", 250), ("status", 100), ("progress", 100), ("message", 350)):
+            self.jobs_tree.heading(col, text=col.title())
+            self.jobs_tree.column(col, width=width, minwidth=50)
+        self.jobs_tree.pack(fill="both", expand=True, padx=10, pady=5)
+
+        ctk.CTkButton(
+            self,
+            text="Cancel Selected Job",
+            command=self.cancel_selected,
+            font=ModernTheme.BUTTON_FONT,
+            fg_color=ModernTheme.ERROR
+        ).pack(pady=5)
+
+        self.executor.add_listener(self.refresh)
+
+    def refresh(self):
+        self.jobs_tree.delete(*self.jobs_tree.get_children())
+        for job in reversed(self.executor.jobs):
+            progress = f"{job.progress:.0%}" if job.progress is not None else ""
+            self.jobs_tree.insert(
+                "", "end", iid=str(job.id),
+                values=(job.id, job.name, job.status, progress, job.message)
+            )
+
+    def cancel_selected(self):
+        selected = {int(iid) for iid in self.jobs_tree.selection()}
+        if not selected:
+            messagebox.showwarning("Warning", "Please select a job to cancel!")
+            return
+        for job in self.executor.jobs:
+            if job.id in selected and job.status in ("pending", "running"):
+                job.cancel()
+        self.refresh()
 
 class EnhancedETLApp:
-    def __init__(self):
+    def __init__(self, run: bool = True):
+        self.started_at = time.perf_counter()
         self.app = ctk.CTk()
         self.app.title("Enhanced ETL Tool with Analytics")
         self.app.geometry("1400x900")
@@ -630,12 +991,66 @@ class EnhancedETLApp:
                 )
         self.logs_text.pack(fill="both", expand=True)
 
-        self.config = AppConfig()
+        # Docker paths and docker compose are verified in the background after the first paint
+        self.config = AppConfig(verify=False)
         self.df: Optional[pd.DataFrame] = None
+        self.raw_df: Optional[pd.DataFrame] = None
+        self._pipeline: Optional[pipeline.Pipeline] = None
+        self.data_source: Optional[data_loader.ChunkedSource] = None
+        self.schema: Optional[schema_inference.InferredSchema] = None
         self.logger = logging.getLogger(__name__)
+        self.executor = JobExecutor(self.app)
 
         self.create_main_layout()
-        self.app.mainloop()
+        self.app.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.app.after_idle(self._on_first_paint)
+        if run:
+            self.app.mainloop()
+
+    @property
+    def pipeline(self) -> pipeline.Pipeline:
+        # Created on first use so that startup does not import pandas
+        if self._pipeline is None:
+            self._pipeline = pipeline.Pipeline()
+        return self._pipeline
+
+    @pipeline.setter
+    def pipeline(self, value: pipeline.Pipeline):
+        self._pipeline = value
+
+    def _on_first_paint(self):
+        self.logger.info(f"Window ready in {time.perf_counter() - self.started_at:.2f}s")
+        self.executor.submit(
+            "Verify Docker setup",
+            self._verify_docker_setup,
+            on_success=lambda version: self.logger.info(f"Docker setup verified: {version}"),
+            on_error=self._on_docker_setup_error
+        )
+        self.docker_monitor.start()
+        # Warm up the heavy libraries so the first load/analysis does not pay for the imports
+        preload(HEAVY_MODULES)
+
+    def _verify_docker_setup(self) -> str:
+        """Check compose files and the docker compose binary (runs on a worker thread)"""
+        self.config.verify_docker_paths()
+        return DockerManager(verify=False).verify_docker_compose()
+
+    def _on_docker_setup_error(self, e: BaseException):
+        if isinstance(e, JobCancelled):
+            return
+        message = f"Docker setup check failed: {str(e)}"
+        self.logger.error(message)
+        for frame in self._docker_frames():
+            frame.show_setup_error(message)
+        messagebox.showerror("Error", message)
+
+    def on_close(self):
+        # Stop background jobs and release every pooled engine/client before exiting
+        self.docker_monitor.stop()
+        self.executor.shutdown()
+        if databse.loaded:
+            databse.engine_registry.dispose_all()
+        self.app.destroy()
 
     def create_main_layout(self):
         # Create notebook for tabs
@@ -648,33 +1063,50 @@ class EnhancedETLApp:
         self.tab_analytics = self.tabview.add("Data Analytics")
         self.tab_connection = self.tabview.add("Database Connections")
         self.tab_migrations = self.tabview.add("Migrations & Backups")
+        self.tab_jobs = self.tabview.add("Background Jobs")
 
         self.create_docker_tab()
         self.create_data_tab()
         self.create_analytics_tab()
         self.create_connection_tab()
         self.create_migrations_tab()
+        self.create_jobs_tab()
 
     def create_docker_tab(self):
+        # A single cached docker ps serves every service; updates are pushed to the frames
+        self.docker_monitor = DockerStatusMonitor(DockerManager(verify=False), self.config.DOCKER_CONFIGS)
+        self.docker_monitor.subscribe(
+            lambda statuses: self.executor.post(self._apply_docker_statuses, statuses)
+        )
+
         # Add services status frames
         self.pg_docker_status = DockerStatusFrame(
             self.tab_docker,
             self.config.DOCKER_CONFIGS["postgres"],
-            "PostgreSQL"
+            "PostgreSQL",
+            self.executor,
+            self.docker_monitor,
+            "postgres"
         )
         self.pg_docker_status.pack(fill="x", padx=10, pady=5)
 
         self.sql_docker_status = DockerStatusFrame(
             self.tab_docker,
             self.config.DOCKER_CONFIGS["sqlserver"],
-            "SQL Server"
+            "SQL Server",
+            self.executor,
+            self.docker_monitor,
+            "sqlserver"
         )
         self.sql_docker_status.pack(fill="x", padx=10, pady=5)
 
         self.mongo_docker_status = DockerStatusFrame(
             self.tab_docker,
             self.config.DOCKER_CONFIGS["mongoDB"],
-            "MongoDB"
+            "MongoDB",
+            self.executor,
+            self.docker_monitor,
+            "mongoDB"
         )
         self.mongo_docker_status.pack(fill="x", padx=10, pady=5)
 
@@ -688,9 +1120,24 @@ class EnhancedETLApp:
         )
         refresh_button.pack(pady=10)
     def refresh_docker_status(self):
-        self.pg_docker_status.update_status()
-        self.sql_docker_status.update_status()
-        self.mongo_docker_status.update_status()
+        self.executor.submit(
+            "Check Docker services",
+            self.docker_monitor.snapshot,
+            True,
+            on_error=self._on_docker_status_error
+        )
+
+    def _on_docker_status_error(self, e: BaseException):
+        for frame in self._docker_frames():
+            frame._apply_status_error(e)
+
+    def _docker_frames(self) -> List[DockerStatusFrame]:
+        return [self.pg_docker_status, self.sql_docker_status, self.mongo_docker_status]
+
+    def _apply_docker_statuses(self, statuses: Dict[str, ServiceStatus]):
+        for frame in self._docker_frames():
+            if frame.service_key in statuses:
+                frame.apply_status(statuses[frame.service_key])
 
     def create_data_tab(self):
         # Split into left and right frames
@@ -702,6 +1149,7 @@ class EnhancedETLApp:
 
         self.create_data_controls(left_frame)
         self.create_column_manager(left_frame)
+        self.create_pipeline_manager(left_frame)
         self.create_data_preview(right_frame)
 
     def create_data_controls(self, parent):
@@ -745,7 +1193,7 @@ class EnhancedETLApp:
 
         ctk.CTkButton(
             transform_frame,
-            text="Transform Data",
+            text="Drop Missing",
             command=self.transform_data,
             font=ModernTheme.BUTTON_FONT,
             fg_color=ModernTheme.SECONDARY
@@ -805,23 +1253,138 @@ class EnhancedETLApp:
             fg_color=ModernTheme.ERROR
         ).pack(side="left", padx=2)
 
+        ctk.CTkButton(
+            button_frame,
+            text="Filter Rows",
+            command=self.filter_rows,
+            font=ModernTheme.BUTTON_FONT,
+            fg_color=ModernTheme.SECONDARY
+        ).pack(side="left", padx=2)
+
+    def create_pipeline_manager(self, parent):
+        # Recorded transformation steps, replayed over the full data on export
+        pipeline_frame = ctk.CTkFrame(parent, fg_color=ModernTheme.CARD_BG)
+        pipeline_frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(
+            pipeline_frame,
+            text="Transformation Pipeline",
+            font=ModernTheme.HEADER_FONT
+        ).pack(pady=5)
+
+        self.steps_textbox = ctk.CTkTextbox(pipeline_frame, height=120, font=ModernTheme.TEXT_FONT)
+        self.steps_textbox.pack(fill="x", padx=5, pady=5)
+        self.steps_textbox.configure(state="disabled")
+
+        step_frame = ctk.CTkFrame(pipeline_frame, fg_color="transparent")
+        step_frame.pack(fill="x", pady=2)
+        for text, command in [
+            ("Fill Missing", self.fill_missing),
+            ("Remove Duplicates", self.remove_duplicates),
+            ("Cast Column", self.cast_column),
+            ("Derived Column", self.derive_column),
+        ]:
+            ctk.CTkButton(
+                step_frame,
+                text=text,
+                command=command,
+                font=ModernTheme.BUTTON_FONT,
+                fg_color=ModernTheme.PRIMARY
+            ).pack(side="left", padx=2)
+
+        file_frame = ctk.CTkFrame(pipeline_frame, fg_color="transparent")
+        file_frame.pack(fill="x", pady=2)
+
+        ctk.CTkButton(
+            file_frame,
+            text="Undo Step",
+            command=self.undo_step,
+            font=ModernTheme.BUTTON_FONT,
+            fg_color=ModernTheme.ERROR
+        ).pack(side="left", padx=2)
+
+        ctk.CTkButton(
+            file_frame,
+            text="Save Pipeline",
+            command=self.save_pipeline,
+            font=ModernTheme.BUTTON_FONT,
+            fg_color=ModernTheme.SECONDARY
+        ).pack(side="left", padx=2)
+
+        ctk.CTkButton(
+            file_frame,
+            text="Load Pipeline",
+            command=self.load_pipeline,
+            font=ModernTheme.BUTTON_FONT,
+            fg_color=ModernTheme.SECONDARY
+        ).pack(side="left", padx=2)
+
     def update_column_list(self):
+        self.column_listbox.delete("1.0", "end")
         if self.df is not None:
-            self.column_listbox.delete("1.0", "end")
             for col in self.df.columns:
                 self.column_listbox.insert("end", f"{col}\n")
 
+    def update_step_list(self):
+        self.steps_textbox.configure(state="normal")
+        self.steps_textbox.delete("1.0", "end")
+        for i, step in enumerate(self.pipeline.steps, start=1):
+            self.steps_textbox.insert("end", f"{i}. {step.describe()}\n")
+        self.steps_textbox.configure(state="disabled")
+
+    def refresh_preview(self):
+        """Re-run the pipeline over a sample of the loaded data (the full data is only touched on export)
+
+        With no steps the whole loaded frame is shown, scrolled virtually.
+        """
+        self.df = self.pipeline.preview(self.raw_df) if self.raw_df is not None else None
+        self.update_column_list()
+        self.update_step_list()
+        self.show_data_preview()
+
+    def _add_step(self, op: str, **params) -> bool:
+        """Record a step and refresh the preview; the step is dropped again if it fails on the sample"""
+        if self.raw_df is None:
+            messagebox.showwarning("Warning", "Please load data first!")
+            return False
+        try:
+            self.pipeline.add(op, **params)
+        except Exception as e:
+            messagebox.showerror("Error", f"Invalid step: {str(e)}")
+            return False
+        try:
+            self.refresh_preview()
+        except Exception as e:
+            step = self.pipeline.undo()
+            self.refresh_preview()
+            messagebox.showerror("Error", f"Error applying {step.describe()}: {str(e)}")
+            return False
+        self._update_logs(f"Step added: {self.pipeline.steps[-1].describe()}")
+        return True
+
+    def _selected_column(self) -> Optional[str]:
+        try:
+            selection = self.column_listbox.get("1.0", "end").splitlines()
+            selected_line = self.column_listbox.index("insert").split('.')[0]
+            return selection[int(selected_line) - 1].strip() or None
+        except (IndexError, ValueError):
+            return None
+
+    @staticmethod
+    def _ask_columns(title: str, text: str) -> Optional[List[str]]:
+        """Comma separated column names; None when cancelled, [] when left empty"""
+        value = ctk.CTkInputDialog(title=title, text=text).get_input()
+        if value is None:
+            return None
+        return [col.strip() for col in value.split(",") if col.strip()]
+
     def rename_column(self):
         if self.df is None:
             messagebox.showwarning("Warning", "Please load data first!")
             return
 
-        # Get selected column
-        try:
-            selection = self.column_listbox.get("1.0", "end").splitlines()
-            selected_line = self.column_listbox.index("insert").split('.')[0]
-            old_name = selection[int(selected_line) - 1].strip()
-        except:
+        old_name = self._selected_column()
+        if not old_name:
             messagebox.showwarning("Warning", "Please select a column to rename!")
             return
 
@@ -832,36 +1395,136 @@ class EnhancedETLApp:
         ).get_input()
 
         if new_name:
-            try:
-                self.df.rename(columns={old_name: new_name}, inplace=True)
-                self.update_column_list()
-                self.show_data_preview()
-                messagebox.showinfo("Success", f"Column renamed from '{old_name}' to '{new_name}'")
-            except Exception as e:
-                messagebox.showerror("Error", f"Error renaming column: {str(e)}")
+            self._add_step("rename", columns={old_name: new_name})
 
     def delete_column(self):
         if self.df is None:
             messagebox.showwarning("Warning", "Please load data first!")
             return
 
-        # Get selected column
-        try:
-            selection = self.column_listbox.get("1.0", "end").splitlines()
-            selected_line = self.column_listbox.index("insert").split('.')[0]
-            column_name = selection[int(selected_line) - 1].strip()
-        except:
+        column_name = self._selected_column()
+        if not column_name:
             messagebox.showwarning("Warning", "Please select a column to delete!")
             return
 
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete column '{column_name}'?"):
-            try:
-                self.df.drop(columns=[column_name], inplace=True)
-                self.update_column_list()
-                self.show_data_preview()
-                messagebox.showinfo("Success", f"Column '{column_name}' deleted")
-            except Exception as e:
-                messagebox.showerror("Error", f"Error deleting column: {str(e)}")
+            # Pushed into the read (usecols / column projection) on export
+            self._add_step("drop", columns=[column_name])
+
+    def filter_rows(self):
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load data first!")
+            return
+
+        expression = ctk.CTkInputDialog(
+            title="Filter Rows",
+            text="Keep rows matching (e.g. year >= 2015 and fuel == 'Diesel'):"
+        ).get_input()
+        if expression:
+            # Leading filters are pushed into the read (row-group pruning for Parquet) on export
+            self._add_step("filter", expression=expression)
+
+    def fill_missing(self):
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load data first!")
+            return
+
+        columns = self._ask_columns("Fill Missing", "Columns to fill (comma separated, empty = all):")
+        if columns is None:
+            return
+        value = ctk.CTkInputDialog(title="Fill Missing", text="Replacement value:").get_input()
+        if value is None:
+            return
+        try:
+            # Numbers, booleans and quoted strings keep their type; anything else is text
+            value = json.loads(value)
+        except ValueError:
+            pass
+        self._add_step("fillna", value=value, columns=columns or None)
+
+    def remove_duplicates(self):
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load data first!")
+            return
+
+        subset = self._ask_columns("Remove Duplicates", "Key columns (comma separated, empty = whole row):")
+        if subset is not None:
+            self._add_step("dedupe", subset=subset or None)
+
+    def cast_column(self):
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load data first!")
+            return
+
+        column_name = self._selected_column()
+        if not column_name:
+            messagebox.showwarning("Warning", "Please select a column to cast!")
+            return
+
+        dtype = ctk.CTkInputDialog(
+            title="Cast Column",
+            text=f"New type for '{column_name}' (int, float, str, datetime, category, bool):"
+        ).get_input()
+        if dtype:
+            self._add_step("cast", column=column_name, dtype=dtype.strip())
+
+    def derive_column(self):
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load data first!")
+            return
+
+        name = ctk.CTkInputDialog(title="Derived Column", text="New column name:").get_input()
+        if not name:
+            return
+        expression = ctk.CTkInputDialog(
+            title="Derived Column",
+            text="Expression (e.g. selling_price / km_driven):"
+        ).get_input()
+        if expression:
+            self._add_step("derive", name=name, expression=expression)
+
+    def undo_step(self):
+        step = self.pipeline.undo()
+        if step is None:
+            return
+        self.refresh_preview()
+        self._update_logs(f"Step removed: {step.describe()}")
+
+    def save_pipeline(self):
+        if not len(self.pipeline):
+            messagebox.showwarning("Warning", "The pipeline has no steps!")
+            return
+
+        file_path = filedialog.asksaveasfilename(
+            title="Save Pipeline",
+            defaultextension=".json",
+            filetypes=[("Pipeline files", "*.json")]
+        )
+        if not file_path:
+            return
+        try:
+            self.pipeline.save(file_path)
+            self._update_logs(f"Pipeline saved to {file_path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error saving pipeline: {str(e)}")
+
+    def load_pipeline(self):
+        file_path = filedialog.askopenfilename(
+            title="Load Pipeline",
+            filetypes=[("Pipeline files", "*.json")]
+        )
+        if not file_path:
+            return
+
+        previous = self.pipeline
+        try:
+            self.pipeline = pipeline.Pipeline.load(file_path)
+            self.refresh_preview()
+            self._update_logs(f"Pipeline loaded from {file_path} ({len(self.pipeline)} steps)")
+        except Exception as e:
+            self.pipeline = previous
+            self.refresh_preview()
+            messagebox.showerror("Error", f"Error loading pipeline: {str(e)}")
 
     def create_data_preview(self, parent):
         # Data preview header
@@ -917,29 +1580,65 @@ class EnhancedETLApp:
         )
         mongo_button.pack(side="left", padx=5)
 
-        # Create a frame to hold the treeview
-        tree_frame = ctk.CTkFrame(parent)
-        tree_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        # File export (CSV, Parquet or Feather)
+        file_button = ctk.CTkButton(
+            buttons_frame,
+            text="Export to File",
+            command=self.export_to_file,
+            font=ModernTheme.BUTTON_FONT,
+            fg_color=ModernTheme.SECONDARY
+        )
+        file_button.pack(side="left", padx=5)
+
+        # Replace exports commit batch by batch and resume after a failure
+        self.export_resumable = ctk.CTkCheckBox(
+            buttons_frame,
+            text="Resumable",
+            font=ModernTheme.TEXT_FONT
+        )
+        self.export_resumable.pack(side="left", padx=5)
 
-        # Create scrollbars
-        y_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical")
-        y_scrollbar.pack(side="right", fill="y")
+        # Virtual-scrolling preview: only the visible rows exist as Treeview items
+        self.data_preview = VirtualDataPreview(parent)
+        self.data_preview.pack(fill="both", expand=True, padx=10, pady=5)
 
-        x_scrollbar = ttk.Scrollbar(tree_frame, orient="horizontal")
-        x_scrollbar.pack(side="bottom", fill="x")
+    def export_to_file(self):
+        if self.df is None:
+            messagebox.showwarning("Warning", "Please load data first!")
+            return
 
-        # Create Treeview
-        self.data_preview = ttk.Treeview(
-            tree_frame,
-            show="headings",
-            yscrollcommand=y_scrollbar.set,
-            xscrollcommand=x_scrollbar.set
+        file_path = filedialog.asksaveasfilename(
+            title="Export Data",
+            initialdir="exports",
+            defaultextension=".parquet",
+            filetypes=SUPPORTED_FILE_TYPES
         )
-        self.data_preview.pack(fill="both", expand=True)
+        if not file_path:
+            return
 
-        # Configure scrollbars
-        y_scrollbar.config(command=self.data_preview.yview)
-        x_scrollbar.config(command=self.data_preview.xview)
+        snapshot = self._export_snapshot()
+        spinner = self._show_loading(f"Exporting to {os.path.basename(file_path)}...")
+
+        def on_success(result):
+            self._hide_loading(spinner)
+            rows, size_mb = result
+            message = f"Exported {rows} rows to {file_path} ({size_mb:.1f} MB)"
+            self._update_logs(message)
+            messagebox.showinfo("Success", message)
+
+        def on_error(e):
+            self._hide_loading(spinner)
+            if isinstance(e, JobCancelled):
+                self._update_logs("File export cancelled")
+                return
+            messagebox.showerror("Error", f"Error exporting data: {str(e)}")
+
+        self.executor.submit(
+            f"Export to {os.path.basename(file_path)}",
+            lambda: columnar.write_chunks(snapshot.iter_chunks(), file_path),
+            on_success=on_success,
+            on_error=on_error
+        )
 
     def export_to_database(self, db_type: str):
         if self.df is None:
@@ -956,114 +1655,245 @@ class EnhancedETLApp:
         if not table_name:
             return
 
+        # Optional merge keys: empty replaces the table, otherwise rows are upserted
+        dialog = ctk.CTkInputDialog(
+            title=f"Export to {db_type.title()}",
+            text="Key columns to merge on (comma separated).\nLeave empty to replace the table:"
+        )
+        keys = dialog.get_input()
+        if keys is None:
+            return
+        key_columns = [name.strip() for name in keys.split(",") if name.strip()]
+        resumable = bool(self.export_resumable.get())
+        file_path = self.file_entry.get()
+
         try:
             # Validate table name
             if not table_name.isalnum():
                 raise ValueError("Table name must contain only letters and numbers")
 
-            if db_type == "postgres":
-                # Get PostgreSQL connection config
-                config = self.pg_connection.get_config()
-                conn_string = f'postgresql://{config.username}:{config.password}@{config.host}:{config.port}/{config.database}'
-                engine = create_engine(conn_string)
+            if resumable and key_columns:
+                raise ValueError("Resumable exports replace the table; leave the key columns empty")
+            if resumable and not os.path.isfile(file_path):
+                raise ValueError("Resumable exports need data loaded from a file")
 
-                # Export to PostgreSQL
-                self.df.to_sql(table_name.lower(), engine, if_exists='replace', index=False)
-                messagebox.showinfo("Success", f"Data exported to PostgreSQL table '{table_name}'")
+            missing = [name for name in key_columns if name not in self.df.columns]
+            if missing:
+                raise ValueError(f"Unknown key columns: {', '.join(missing)}")
 
+            if db_type == "postgres":
+                config = self.pg_connection.get_config()
             elif db_type == "sqlserver":
-                # Get SQL Server connection config
                 config = self.sql_connection.get_config()
-                conn_string = f'mssql+pyodbc://{config.username}:{config.password}@{config.host}:{config.port}/{config.database}?driver=ODBC+Driver+17+for+SQL+Server'
-                engine = create_engine(conn_string)
-
-                # Export to SQL Server
-                self.df.to_sql(table_name.lower(), engine, if_exists='replace', index=False)
-                messagebox.showinfo("Success", f"Data exported to SQL Server table '{table_name}'")
-
-            elif db_type == "mongodb":
-                # Get MongoDB connection config
+            else:
                 config = self.mongo_connection.get_config()
-                client = pymongo.MongoClient(
-                    host=config.host,
-                    port=int(config.port),
-                    username=config.username,
-                    password=config.password
-                )
-                db = client[config.database]
+        except Exception as e:
+            messagebox.showerror("Error", f"Error exporting to {db_type}: {str(e)}")
+            return
 
-                # Convert DataFrame to MongoDB format and export
-                records = self.df.to_dict('records')
-                if table_name in db.list_collection_names():
-                    db[table_name].drop()
-                db[table_name].insert_many(records)
-                client.close()
+        snapshot = self._export_snapshot()
+        spinner = self._show_loading(f"Exporting to {db_type}...")
 
-                messagebox.showinfo("Success", f"Data exported to MongoDB collection '{table_name}'")
+        def on_success(message):
+            self._hide_loading(spinner)
+            self._update_logs(message)
+            messagebox.showinfo("Success", message)
 
-        except Exception as e:
+        def on_error(e):
+            self._hide_loading(spinner)
+            if isinstance(e, JobCancelled):
+                self._update_logs(f"Export to {db_type} cancelled")
+                return
             messagebox.showerror("Error", f"Error exporting to {db_type}: {str(e)}")
 
+        self.executor.submit(
+            f"Export to {db_type} ({table_name})",
+            self._export_data,
+            snapshot, db_type, config, table_name, key_columns, file_path if resumable else None,
+            on_success=on_success,
+            on_error=on_error
+        )
+
+    def _export_snapshot(self) -> ExportSnapshot:
+        return ExportSnapshot(self.pipeline, self.raw_df, self.data_source, self.schema, list(self.df.columns))
+
+    def _export_data(self, snapshot: ExportSnapshot, db_type: str, config: DatabaseConfig, table_name: str,
+                     key_columns: Optional[List[str]] = None, resume_from: Optional[str] = None) -> str:
+        """Write the loaded data to the target database (runs on a worker thread)
+
+        With resume_from (the source file), the export is checkpointed batch by batch.
+        """
+        if key_columns:
+            return self._merge_data(snapshot, db_type, config, table_name, key_columns)
+        if resume_from:
+            return self._export_resumable(snapshot, db_type, config, table_name, resume_from)
+
+        if db_type == "postgres":
+            engine = databse.DatabaseManager.create_postgres_engine(config)
+
+            # Export to PostgreSQL (bulk COPY FROM STDIN)
+            rows, elapsed = bulk_loader.copy_to_postgres(snapshot.iter_chunks(), engine, table_name.lower(),
+                                                         column_types=snapshot.column_types("postgresql"))
+            self.logger.info(f"Exported {rows} rows to PostgreSQL in {elapsed:.2f}s")
+            return f"Data exported to PostgreSQL table '{table_name}' ({rows} rows in {elapsed:.2f}s)"
+
+        if db_type == "sqlserver":
+            engine = databse.DatabaseManager.create_sqlserver_engine(config)
+
+            # Export to SQL Server (BCP with the pymssql driver, fast_executemany batches with pyodbc)
+            rows, elapsed = bulk_loader.write_to_sqlserver(snapshot.iter_chunks(), engine, table_name.lower(),
+                                                           column_types=snapshot.column_types("mssql"))
+            rate = rows / elapsed if elapsed > 0 else 0
+            self.logger.info(f"Exported {rows} rows to SQL Server in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+            return f"Data exported to SQL Server table '{table_name}' ({rows} rows, {rate:,.0f} rows/s)"
+
+        client = databse.DatabaseManager.create_mongo_client(config)
+        db = client[config.database]
+
+        # Export in unordered batches, several in flight at once
+        if table_name in db.list_collection_names():
+            db[table_name].drop()
+        rows, elapsed = bulk_loader.write_to_mongo(snapshot.iter_chunks(), db[table_name])
+
+        self.logger.info(f"Exported {rows} documents to MongoDB in {elapsed:.2f}s")
+        return f"Data exported to MongoDB collection '{table_name}' ({rows} documents)"
+
+    def _export_resumable(self, snapshot: ExportSnapshot, db_type: str, config: DatabaseConfig, table_name: str,
+                          file_path: str) -> str:
+        """Replace the target committing each batch, skipping the rows a failed run already loaded"""
+        if db_type == "mongodb":
+            target = databse.DatabaseManager.create_mongo_client(config)[config.database]
+            column_types = None
+        else:
+            target = (databse.DatabaseManager.create_postgres_engine(config) if db_type == "postgres"
+                      else databse.DatabaseManager.create_sqlserver_engine(config))
+            table_name = table_name.lower()
+            column_types = snapshot.column_types("postgresql" if db_type == "postgres" else "mssql")
+
+        # A different file or pipeline invalidates the checkpoint
+        fingerprint = f"{checkpoint.file_fingerprint(file_path)}:{snapshot.pipeline.fingerprint()}"
+        key = checkpoint.checkpoint_key(file_path, config, table_name, fingerprint)
+        start = time.perf_counter()
+        rows, skipped = checkpoint.load_resumable(
+            snapshot.iter_chunks(), checkpoint.batch_writer(target, table_name, column_types),
+            target, table_name, checkpoint.CheckpointStore(), key
+        )
+        elapsed = time.perf_counter() - start
+
+        resumed = f", resumed after {skipped} rows" if skipped else ""
+        self.logger.info(f"Exported {rows} rows to {db_type} ({table_name}) in {elapsed:.2f}s{resumed}")
+        return f"Data exported to {db_type} '{table_name}' ({rows} rows in {elapsed:.2f}s{resumed})"
+
+    def _merge_data(self, snapshot: ExportSnapshot, db_type: str, config: DatabaseConfig, table_name: str,
+                    key_columns: List[str]) -> str:
+        """Upsert the loaded data on key_columns instead of replacing the target"""
+        if db_type == "mongodb":
+            collection = databse.DatabaseManager.create_mongo_client(config)[config.database][table_name]
+            rows, elapsed = bulk_loader.upsert_to_mongo(snapshot.iter_chunks(), collection, key_columns)
+            target = f"MongoDB collection '{table_name}'"
+        else:
+            engine = (databse.DatabaseManager.create_postgres_engine(config) if db_type == "postgres"
+                      else databse.DatabaseManager.create_sqlserver_engine(config))
+            rows, elapsed = bulk_loader.merge_to_database(snapshot.iter_chunks(), engine, table_name.lower(),
+                                                          key_columns)
+            target = f"{'PostgreSQL' if db_type == 'postgres' else 'SQL Server'} table '{table_name}'"
+
+        self.logger.info(f"Merged {rows} rows into {target} in {elapsed:.2f}s")
+        return f"Data merged into {target} on {', '.join(key_columns)} ({rows} rows in {elapsed:.2f}s)"
+
+    @staticmethod
+    def _read_data(file_path: str) -> Tuple[pd.DataFrame, Optional[data_loader.ChunkedSource],
+                                            Optional[schema_inference.InferredSchema]]:
+        """Read a data file, or just its first chunk for large files (runs on a worker thread)
+
+        For CSV, compact dtypes are inferred from a sample and applied while reading;
+        Parquet and Feather files already carry their types.
+        """
+        logger = logging.getLogger(__name__)
+        if columnar.is_columnar(file_path):
+            if data_loader.should_stream(file_path):
+                data_source = columnar.ColumnarSource(file_path)
+                logger.info(f"Streaming load enabled for {file_path} (chunksize={data_source.chunksize})")
+                return data_source.first_chunk(), data_source, None
+            df = columnar.read_columnar(file_path)
+            logger.info(f"Loaded {file_path}: {len(df)} rows, {schema_inference.memory_usage_mb(df):.1f} MB in memory")
+            return df, None, None
+
+        schema = schema_inference.infer_csv_schema(file_path)
+        if data_loader.should_stream(file_path):
+            # Large file: keep only the first chunk in memory for the preview
+            data_source = data_loader.ChunkedCSVSource(file_path, schema=schema)
+            logger.info(f"Streaming load enabled for {file_path} (chunksize={data_source.chunksize})")
+            return data_source.first_chunk(), data_source, schema
+
+        df = schema.downcast(pd.read_csv(file_path, **schema.read_kwargs()))
+        logger.info(f"Loaded {file_path}: {len(df)} rows, {schema_inference.memory_usage_mb(df):.1f} MB in memory")
+        return df, None, schema
+
     def load_data(self):
         file_path = filedialog.askopenfilename(
-            title="Select CSV File",
-            filetypes=[("CSV files", "*.csv")]
+            title="Select Data File",
+            filetypes=SUPPORTED_FILE_TYPES
         )
 
         if not file_path:
             return
 
-        try:
-            self.df = pd.read_csv(file_path)
+        spinner = self._show_loading("Loading data...")
+
+        def on_success(result):
+            self._hide_loading(spinner)
+            self.raw_df, self.data_source, self.schema = result
             self.file_entry.configure(state="normal")
             self.file_entry.delete(0, "end")
             self.file_entry.insert(0, file_path)
             self.file_entry.configure(state="readonly")
 
-            self.show_data_preview()
-        except Exception as e:
-            messagebox.showerror("Error", f"Error loading data: {str(e)}")
+            # The recorded steps are replayed on the new file
+            try:
+                self.refresh_preview()
+            except Exception as e:
+                self.pipeline = pipeline.Pipeline()
+                self.refresh_preview()
+                messagebox.showwarning("Warning", f"Pipeline does not apply to this file and was cleared: {str(e)}")
+
+        def on_error(e):
+            self._hide_loading(spinner)
+            if not isinstance(e, JobCancelled):
+                messagebox.showerror("Error", f"Error loading data: {str(e)}")
+
+        self.executor.submit(
+            f"Load {os.path.basename(file_path)}",
+            self._read_data,
+            file_path,
+            on_success=on_success,
+            on_error=on_error
+        )
 
     def show_data_preview(self):
-        if self.df is None:
-            return
-
-        # Clear existing items
-        for item in self.data_preview.get_children():
-            self.data_preview.delete(item)
-
-        # Configure columns
-        self.data_preview['columns'] = list(self.df.columns)
-
-        # Configure column headings
-        for col in self.df.columns:
-            self.data_preview.heading(col, text=col)
-            # Set a reasonable minimum column width
-            self.data_preview.column(col, minwidth=100, width=100)
-
-        # Insert data (first 100 rows for performance)
-        for i, row in self.df.head(100).iterrows():
-            values = [str(value) for value in row]  # Convert all values to strings
-            self.data_preview.insert("", "end", values=values)
+        self.data_preview.set_data(self.df)
 
     def transform_data(self):
         if self.df is None:
             messagebox.showwarning("Warning", "Please load data first!")
             return
 
-        try:
-            # Drop rows with missing values
-            self.df = self.df.dropna()
-            self.show_data_preview()
-            messagebox.showinfo("Success", "Data transformed successfully")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error transforming data: {str(e)}")
+        # Drop rows with missing values
+        self._add_step("dropna")
+
     def reset_data(self):
-        self.df = None
+        self.raw_df = None
+        self.data_source = None
+        self.schema = None
+        self.pipeline = pipeline.Pipeline()
         self.file_entry.configure(state="normal")
         self.file_entry.delete(0, "end")
         self.file_entry.configure(state="readonly")
-        self.show_data_preview()
+        self.refresh_preview()
+
+    def create_jobs_tab(self):
+        self.jobs_frame = JobQueueFrame(self.tab_jobs, self.executor)
+        self.jobs_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
     def create_analytics_tab(self):
         self.analytics_frame = DataAnalyticsFrame(self.tab_analytics, self)
@@ -1171,58 +2001,231 @@ class EnhancedETLApp:
                 fg_color=ModernTheme.SECONDARY
             ).pack(pady=5)
 
-    def create_backup(self, db_type: str):
+        self.create_migration_controls()
+
+    def create_migration_controls(self):
+        """Controls for database-to-database migrations"""
+        frame = ctk.CTkFrame(self.tab_migrations, fg_color=ModernTheme.CARD_BG)
+        frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(
+            frame,
+            text="Database Migration",
+            font=ModernTheme.HEADER_FONT
+        ).pack(pady=5)
+
+        options = ctk.CTkFrame(frame, fg_color="transparent")
+        options.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(options, text="Direction:", font=ModernTheme.TEXT_FONT).pack(side="left", padx=5)
+        self.migration_direction = ctk.CTkComboBox(
+            options,
+            values=["PostgreSQL → SQL Server", "SQL Server → PostgreSQL", "PostgreSQL → MongoDB",
+                    "MongoDB → PostgreSQL", "MongoDB → SQL Server"],
+            state="readonly",
+            width=220
+        )
+        self.migration_direction.set("PostgreSQL → SQL Server")
+        self.migration_direction.pack(side="left", padx=5)
+
+        ctk.CTkLabel(options, text="Workers:", font=ModernTheme.TEXT_FONT).pack(side="left", padx=5)
+        self.migration_workers = ctk.CTkEntry(options, width=60)
+        self.migration_workers.insert(0, str(MIGRATION_WORKERS))
+        self.migration_workers.pack(side="left", padx=5)
+
+        ctk.CTkLabel(options, text="Partitions per table:", font=ModernTheme.TEXT_FONT).pack(side="left", padx=5)
+        self.migration_partitions = ctk.CTkEntry(options, width=60)
+        self.migration_partitions.insert(0, "1")
+        self.migration_partitions.pack(side="left", padx=5)
+
+        self.migration_tables = ctk.CTkEntry(
+            frame,
+            placeholder_text="Tables (comma separated, empty = whole schema)"
+        )
+        self.migration_tables.pack(fill="x", padx=10, pady=5)
+
+        incremental = ctk.CTkFrame(frame, fg_color="transparent")
+        incremental.pack(fill="x", padx=10, pady=5)
+
+        self.migration_incremental = ctk.CTkCheckBox(incremental, text="Incremental (upsert changes only)")
+        self.migration_incremental.pack(side="left", padx=5)
+        self.migration_watermark = ctk.CTkEntry(incremental, placeholder_text="Watermark column (e.g. updated_at)")
+        self.migration_watermark.pack(side="left", fill="x", expand=True, padx=5)
+        self.migration_keys = ctk.CTkEntry(incremental, placeholder_text="Key columns (comma separated)")
+        self.migration_keys.pack(side="left", fill="x", expand=True, padx=5)
+        self.migration_resumable = ctk.CTkCheckBox(incremental, text="Resumable (checkpoint each batch)")
+        self.migration_resumable.pack(side="left", padx=5)
+
+        ctk.CTkButton(
+            frame,
+            text="Start Migration",
+            command=self.start_migration,
+            font=ModernTheme.BUTTON_FONT,
+            fg_color=ModernTheme.PRIMARY
+        ).pack(pady=5)
+
+    def start_migration(self):
+        tables = [name.strip() for name in self.migration_tables.get().split(",") if name.strip()]
         try:
-            self._show_loading(f"Creating {db_type} backup...")
+            workers = max(1, int(self.migration_workers.get()))
+            partitions = max(1, int(self.migration_partitions.get()))
+        except ValueError:
+            messagebox.showerror("Error", "Workers and partitions must be numbers")
+            return
 
-            if db_type == "PostgreSQL":
-                config = self.pg_connection.get_config()
-                success, message = self.backup_manager.create_postgres_backup(config)
-            elif db_type == "SQL Server":
-                config = self.sql_connection.get_config()
-                success, message = self.backup_manager.create_sqlserver_backup(config)
-            else:  # MongoDB
-                config = self.mongo_connection.get_config()
-                success, message = self.backup_manager.create_mongodb_backup(config)
+        watermark_column, key_columns = None, None
+        resumable = bool(self.migration_resumable.get())
+        if resumable and self.migration_incremental.get():
+            messagebox.showerror("Error", "Choose either an incremental or a resumable migration")
+            return
+        if resumable:
+            key_columns = [name.strip() for name in self.migration_keys.get().split(",") if name.strip()] or None
+            if key_columns and len(key_columns) > 1:
+                messagebox.showerror("Error", "Resumable migrations are ordered by a single key column")
+                return
+        if self.migration_incremental.get():
+            watermark_column = self.migration_watermark.get().strip()
+            key_columns = [name.strip() for name in self.migration_keys.get().split(",") if name.strip()]
+            if not watermark_column or not key_columns:
+                messagebox.showerror("Error", "Incremental migrations need a watermark column and key columns")
+                return
 
+        direction = self.migration_direction.get()
+        if direction != "PostgreSQL → SQL Server" and (watermark_column or partitions > 1):
+            messagebox.showerror("Error", "Incremental and partitioned migrations are only available "
+                                          "from PostgreSQL to SQL Server")
+            return
+        if resumable and direction not in ("PostgreSQL → SQL Server", "SQL Server → PostgreSQL"):
+            messagebox.showerror("Error", "Resumable migrations are only available between PostgreSQL "
+                                          "and SQL Server")
+            return
+        if direction == "SQL Server → PostgreSQL":
+            source = self.sql_connection.get_config()
+            target = self.pg_connection.get_config()
+        elif direction == "PostgreSQL → MongoDB":
+            source = self.pg_connection.get_config()
+            target = self.mongo_connection.get_config()
+        elif direction == "MongoDB → PostgreSQL":
+            source = self.mongo_connection.get_config()
+            target = self.pg_connection.get_config()
+        elif direction == "MongoDB → SQL Server":
+            source = self.mongo_connection.get_config()
+            target = self.sql_connection.get_config()
+        else:
+            source = self.pg_connection.get_config()
+            target = self.sql_connection.get_config()
+        spinner = self._show_loading(f"Migrating {direction}...")
+
+        def on_progress(progress, message, data):
             self._update_logs(message)
 
-            if success:
-                messagebox.showinfo("Success", message)
-
+        def on_success(results):
+            self._hide_loading(spinner)
+            failed = [result for result in results if not result.success]
+            total_rows = sum(result.rows for result in results)
+            message = f"Migrated {len(results) - len(failed)}/{len(results)} tables ({total_rows} rows)"
+            self._update_logs(message)
+            if failed:
+                messagebox.showerror("Error", message + "\n\n" + "\n".join(r.summary() for r in failed))
             else:
-                messagebox.showerror("Error", message)
+                messagebox.showinfo("Success", message)
 
-        except Exception as e:
-            self.logger.error(f"Error creating {db_type} backup: {e}")
+        def on_error(e):
+            self._hide_loading(spinner)
+            if isinstance(e, JobCancelled):
+                self._update_logs("Migration cancelled")
+                return
+            self.logger.error(f"Error migrating data: {e}")
             self._update_logs(f"Error: {str(e)}")
-            messagebox.showerror("Error", f"Error creating {db_type} backup: {str(e)}")
+            messagebox.showerror("Error", f"Error migrating data: {str(e)}")
+
+        self.executor.submit(
+            f"Migration {direction}",
+            self._run_migration,
+            direction, source, target, tables, workers, partitions, watermark_column, key_columns, resumable,
+            on_success=on_success,
+            on_error=on_error,
+            on_progress=on_progress
+        )
 
-        finally:
-            self._hide_loading()
+    @staticmethod
+    def _run_migration(direction, source, target, tables, workers, partitions, watermark_column, key_columns,
+                       resumable):
+        """Runs on a worker thread; reports each finished table and stops between batches when cancelled"""
+        job = current_job()
+        check_cancelled = job.check_cancelled if job is not None else None
+
+        def on_table_done(result):
+            if job is not None:
+                job.report_progress(None, result.summary())
+
+        if direction == "SQL Server → PostgreSQL":
+            return migrations.migrate_sqlserver_to_postgres(source, target, tables or None, workers=workers,
+                                                            on_table_done=on_table_done, resumable=resumable,
+                                                            key_column=key_columns[0] if key_columns else None,
+                                                            check_cancelled=check_cancelled)
+        if direction == "PostgreSQL → MongoDB":
+            return migrations.migrate_postgres_to_mongo(source, target, tables or None, workers=workers,
+                                                        on_table_done=on_table_done, check_cancelled=check_cancelled)
+        if direction.startswith("MongoDB"):
+            target_type = "postgres" if direction.endswith("PostgreSQL") else "sqlserver"
+            return migrations.migrate_mongo_to_relational(source, target, target_type, tables or None,
+                                                          workers=workers, on_table_done=on_table_done,
+                                                          check_cancelled=check_cancelled)
+        return migrations.migrate_postgres_to_sqlserver(source, target, tables or None, workers=workers,
+                                                        partitions=partitions, watermark_column=watermark_column,
+                                                        key_columns=key_columns, on_table_done=on_table_done,
+                                                        resumable=resumable, check_cancelled=check_cancelled)
+
+    def create_backup(self, db_type: str):
+        if db_type == "PostgreSQL":
+            config = self.pg_connection.get_config()
+            backup = self.backup_manager.create_postgres_backup
+        elif db_type == "SQL Server":
+            config = self.sql_connection.get_config()
+            backup = self.backup_manager.create_sqlserver_backup
+        else:  # MongoDB
+            config = self.mongo_connection.get_config()
+            backup = self.backup_manager.create_mongodb_backup
+
+        self._run_backup_job(f"Creating {db_type} backup", backup, config)
 
     def restore_backup(self, db_type: str):
-        try:
+        if db_type == "PostgreSQL":
+            # pg_dump directory-format backups are folders
+            backup_file = filedialog.askdirectory(title="Select PostgreSQL Backup Folder", initialdir="backups")
+        else:
             backup_file = filedialog.askopenfilename(
                 title=f"Select {db_type} Backup File",
                 filetypes=[("Backup files", "*.bak")]
             )
 
-            if not backup_file:
-                return
-
-            self._show_loading(f"Restoring {db_type} backup...")
-
-            if db_type == "PostgreSQL":
-                config = self.pg_connection.get_config()
-                success, message = self.backup_manager.restore_postgres_backup(config, backup_file)
-            elif db_type == "SQL Server":
-                config = self.sql_connection.get_config()
-                success, message = self.backup_manager.restore_sqlserver_backup(config, backup_file)
-            else:  # MongoDB
-                config = self.mongo_connection.get_config()
-                success, message = self.backup_manager.restore_mongodb_backup(config, backup_file)
+        if not backup_file:
+            return
 
+        if db_type == "PostgreSQL":
+            config = self.pg_connection.get_config()
+            restore = self.backup_manager.restore_postgres_backup
+        elif db_type == "SQL Server":
+            config = self.sql_connection.get_config()
+            restore = self.backup_manager.restore_sqlserver_backup
+        else:  # MongoDB
+            config = self.mongo_connection.get_config()
+            restore = self.backup_manager.restore_mongodb_backup
+
+        self._run_backup_job(f"Restoring {db_type} backup", restore, config, backup_file)
+
+    def _run_backup_job(self, action: str, operation, *args):
+        """Run a backup/restore operation on the job executor"""
+        spinner = self._show_loading(f"{action}...")
+
+        def on_progress(progress, message, data):
+            # Size and throughput go to the spinner, not the log, as they change every second
+            spinner.text_label.configure(text=message)
+
+        def on_success(result):
+            self._hide_loading(spinner)
+            success, message = result
             self._update_logs(message)
 
             if success:
@@ -1231,24 +2234,30 @@ class EnhancedETLApp:
             else:
                 messagebox.showerror("Error", message)
 
-        except Exception as e:
-            self.logger.error(f"Error restoring {db_type} backup: {e}")
+        def on_error(e):
+            self._hide_loading(spinner)
+            if isinstance(e, JobCancelled):
+                self._update_logs(f"{action} cancelled")
+                return
+            self.logger.error(f"Error {action.lower()}: {e}")
             self._update_logs(f"Error: {str(e)}")
-            messagebox.showerror("Error", f"Error restoring {db_type} backup: {str(e)}")
+            messagebox.showerror("Error", f"Error {action.lower()}: {str(e)}")
 
-        finally:
-            self._hide_loading()
+        self.executor.submit(action, operation, *args, on_success=on_success, on_error=on_error,
+                             on_progress=on_progress)
 
     def _show_loading(self, text=""):
             self.loading_spinner = LoadingSpinner(self.app, text)  # Use self.app instead of self
             self.loading_spinner.pack(pady=10)
             self.loading_spinner.start()
+            return self.loading_spinner
 
 
-    def _hide_loading(self):
-        if hasattr(self, 'loading_spinner'):
-            self.loading_spinner.stop()
-            self.loading_spinner.destroy()
+    def _hide_loading(self, spinner=None):
+        spinner = spinner or getattr(self, 'loading_spinner', None)
+        if spinner is not None:
+            spinner.stop()
+            spinner.destroy()
 
     def _update_logs(self, message: str):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
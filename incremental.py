@@ -0,0 +1,232 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, Optional, Sequence, Tuple
+
+import pandas as pd
+from bson import ObjectId
+from sqlalchemy import column, inspect, select, table
+
+from bulk_loader import CancelCheck, checked, merge_to_database, upsert_to_mongo
+from config import ANALYTICS_CHUNK_SIZE, BULK_BATCH_SIZE, STATE_DB_PATH, DatabaseConfig
+
+logger = logging.getLogger(__name__)
+
+OBJECT_ID_FIELD = "_id"
+
+
+def encode_value(value: Any) -> str:
+    """Serializar un watermark o un checkpoint conservando su tipo"""
+    if isinstance(value, ObjectId):
+        return json.dumps({"type": "objectid", "value": str(value)})
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return json.dumps({"type": "datetime", "value": pd.Timestamp(value).isoformat()})
+    if isinstance(value, date):
+        return json.dumps({"type": "date", "value": value.isoformat()})
+    if isinstance(value, Decimal):
+        return json.dumps({"type": "decimal", "value": str(value)})
+    if hasattr(value, "item"):  # escalares de numpy
+        value = value.item()
+    return json.dumps({"type": "json", "value": value})
+
+
+def decode_value(raw: str) -> Any:
+    data = json.loads(raw)
+    kind, value = data["type"], data["value"]
+    if kind == "objectid":
+        return ObjectId(value)
+    if kind == "datetime":
+        return pd.Timestamp(value).to_pydatetime()
+    if kind == "date":
+        return date.fromisoformat(value)
+    if kind == "decimal":
+        return Decimal(value)
+    return value
+
+
+def watermark_key(source: DatabaseConfig, target: DatabaseConfig, table_name: str) -> str:
+    """Identificador de una sincronización: origen, destino y tabla (sin credenciales)"""
+    return (f"{source.host}:{source.port}/{source.database} -> "
+            f"{target.host}:{target.port}/{target.database}:{table_name}")
+
+
+class WatermarkStore:
+    """Marcas de agua por tabla guardadas en una base SQLite local"""
+
+    def __init__(self, path: str = STATE_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                " sync_key TEXT PRIMARY KEY,"
+                " watermark_column TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str, watermark_column: str) -> Optional[Any]:
+        """Último valor registrado; None si no hay o si cambió la columna"""
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT watermark_column, value FROM watermarks WHERE sync_key = ?", (key,)
+            ).fetchone()
+        if row is None or row[0] != watermark_column:
+            return None
+        return decode_value(row[1])
+
+    def set(self, key: str, watermark_column: str, value: Any):
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO watermarks (sync_key, watermark_column, value, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, watermark_column, encode_value(value), time.time())
+            )
+
+    def reset(self, key: str):
+        """Olvidar la marca para forzar una carga completa en la próxima ejecución"""
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM watermarks WHERE sync_key = ?", (key,))
+
+
+def iter_sql_changes(
+    engine,
+    table_name: str,
+    watermark_column: str,
+    since: Any = None,
+    chunksize: int = ANALYTICS_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Leer las filas con watermark >= `since` (todas si es None) con un cursor de servidor.
+
+    Se usa >= en lugar de > para no perder filas con el mismo valor que
+    llegaron después de la última ejecución; como el destino recibe
+    upserts, releer esas filas es inocuo.
+    """
+    columns = inspect(engine).get_columns(table_name)
+    source = table(table_name, *[column(col["name"]) for col in columns])
+    query = select(source)
+    if since is not None:
+        query = query.where(source.c[watermark_column] >= since)
+    with engine.connect().execution_options(stream_results=True) as connection:
+        yield from pd.read_sql(query, connection, chunksize=chunksize)
+
+
+def iter_mongo_changes(
+    collection,
+    watermark_field: str = OBJECT_ID_FIELD,
+    since: Any = None,
+    chunksize: int = ANALYTICS_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Leer los documentos con watermark >= `since`.
+
+    Con el campo `_id` el watermark es la fecha de creación del ObjectId,
+    así que la consulta usa el ObjectId mínimo de ese instante.
+    """
+    query = {}
+    if since is not None:
+        if watermark_field == OBJECT_ID_FIELD and isinstance(since, datetime):
+            since = ObjectId.from_datetime(since)
+        query = {watermark_field: {"$gte": since}}
+
+    batch = []
+    for document in collection.find(query, batch_size=chunksize):
+        batch.append(document)
+        if len(batch) >= chunksize:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch)
+
+
+class _WatermarkTracker:
+    """Recorre los bloques y recuerda el mayor valor de la columna watermark"""
+
+    def __init__(self, chunks: Iterable[pd.DataFrame], watermark_column: str):
+        self.chunks = chunks
+        self.watermark_column = watermark_column
+        self.value: Any = None
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        for chunk in self.chunks:
+            values = chunk[self.watermark_column].dropna() if self.watermark_column in chunk else []
+            if len(values):
+                chunk_max = max(values)
+                if self.value is None or chunk_max > self.value:
+                    self.value = chunk_max
+            yield chunk
+
+    @property
+    def watermark(self) -> Any:
+        if isinstance(self.value, ObjectId) and self.watermark_column == OBJECT_ID_FIELD:
+            return self.value.generation_time.replace(tzinfo=None)
+        return self.value
+
+
+def _stringify_object_ids(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Las tablas SQL no admiten ObjectId: se guardan como texto"""
+    for chunk in chunks:
+        for col in chunk.columns:
+            if chunk[col].dtype == object and chunk[col].map(lambda v: isinstance(v, ObjectId)).any():
+                chunk[col] = chunk[col].map(lambda v: str(v) if isinstance(v, ObjectId) else v)
+        yield chunk
+
+
+def apply_changes(
+    chunks: Iterable[pd.DataFrame],
+    target,
+    table_name: str,
+    key_columns: Sequence[str],
+    batch_size: int = BULK_BATCH_SIZE
+) -> int:
+    """Aplicar los cambios como upsert en un engine SQLAlchemy o una base de MongoDB"""
+    if hasattr(target, "dialect"):
+        rows, _ = merge_to_database(_stringify_object_ids(chunks), target, table_name, key_columns, batch_size)
+    else:
+        rows, _ = upsert_to_mongo(chunks, target[table_name], key_columns)
+    return rows
+
+
+def sync_table(
+    source,
+    target,
+    table_name: str,
+    watermark_column: str,
+    key_columns: Sequence[str],
+    store: WatermarkStore,
+    sync_key: str,
+    target_table: Optional[str] = None,
+    batch_size: int = BULK_BATCH_SIZE,
+    check_cancelled: CancelCheck = None
+) -> Tuple[int, Any]:
+    """Copiar solo lo que cambió desde la última ejecución y aplicarlo como upsert.
+
+    `source` y `target` son engines SQLAlchemy o bases de datos de pymongo.
+    El watermark se guarda únicamente cuando el destino confirmó todos los
+    lotes, de modo que un fallo (o una cancelación desde `check_cancelled`,
+    que se llama antes de cada bloque) no salta cambios. Retorna las filas
+    aplicadas y el nuevo watermark.
+    """
+    since = store.get(sync_key, watermark_column)
+    if hasattr(source, "dialect"):
+        changes = iter_sql_changes(source, table_name, watermark_column, since, chunksize=batch_size)
+    else:
+        changes = iter_mongo_changes(source[table_name], watermark_column, since, chunksize=batch_size)
+
+    logger.info(f"Sincronizando {table_name} desde {watermark_column} >= {since!r}")
+    tracker = _WatermarkTracker(checked(changes, check_cancelled), watermark_column)
+    rows = apply_changes(tracker, target, target_table or table_name, key_columns, batch_size)
+
+    watermark = tracker.watermark if tracker.value is not None else since
+    if watermark is not None:
+        store.set(sync_key, watermark_column, watermark)
+    logger.info(f"Sincronización de {table_name}: {rows} filas, nuevo watermark {watermark!r}")
+    return rows, watermark
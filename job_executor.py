@@ -0,0 +1,213 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from config import JOB_CPU_WORKERS, JOB_IO_WORKERS, JOB_POLL_INTERVAL_MS
+
+_local = threading.local()
+
+
+class JobCancelled(Exception):
+    """La tarea fue cancelada por el usuario"""
+
+
+class Job:
+    """Tarea en segundo plano con estado, progreso y cancelación cooperativa"""
+
+    def __init__(self, job_id: int, name: str, kind: str):
+        self.id = job_id
+        self.name = name
+        self.kind = kind
+        self.status = "pending"
+        self.progress: Optional[float] = None
+        self.message = ""
+        self.error: Optional[BaseException] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+        self._cancel_event = threading.Event()
+        self._executor: Optional["JobExecutor"] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Solicitar la cancelación; las tareas en curso deben consultar check_cancelled()"""
+        self._cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self.status = "cancelled"
+            if self._executor is not None:
+                self._executor._notify_changed()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled(f"Tarea cancelada: {self.name}")
+
+    def report_progress(self, progress: Optional[float] = None, message: str = "", data: Any = None):
+        """Publicar progreso (0-1) desde el hilo de trabajo; se entrega en el hilo de la UI.
+
+        `data` permite enviar resultados parciales (p. ej. estadísticas acumuladas).
+        """
+        self.progress = progress
+        self.message = message
+        if self._executor is not None:
+            self._executor._events.put(("progress", self, (progress, message, data)))
+
+
+def current_job() -> Optional[Job]:
+    """Tarea que se está ejecutando en el hilo actual (None fuera de un worker)"""
+    return getattr(_local, "job", None)
+
+
+class JobExecutor:
+    """Ejecuta tareas en pools de hilos (E/S) o procesos (CPU) sin bloquear Tk.
+
+    Los resultados, errores y progreso se encolan y se entregan en el hilo
+    de la interfaz mediante `after()` sobre el widget `scheduler`.
+    """
+
+    def __init__(self, scheduler, io_workers: int = JOB_IO_WORKERS,
+                 cpu_workers: Optional[int] = JOB_CPU_WORKERS,
+                 poll_interval_ms: int = JOB_POLL_INTERVAL_MS):
+        self.scheduler = scheduler
+        self.poll_interval_ms = poll_interval_ms
+        self.logger = logging.getLogger(__name__)
+        self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="etl-io")
+        self._cpu_workers = cpu_workers
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self._events: "queue.Queue" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._callbacks: Dict[int, Dict[str, Optional[Callable]]] = {}
+        self._listeners: List[Callable[[], None]] = []
+        self.jobs: List[Job] = []
+        self._closed = False
+        self.scheduler.after(self.poll_interval_ms, self._poll)
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        *args,
+        cpu: bool = False,
+        on_success: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        on_progress: Optional[Callable[[Optional[float], str, Any], None]] = None,
+        **kwargs
+    ) -> Job:
+        """Encolar una tarea; los callbacks se ejecutan en el hilo de la UI"""
+        job = Job(next(self._ids), name, "cpu" if cpu else "io")
+        job._executor = self
+        self._callbacks[job.id] = {"success": on_success, "error": on_error, "progress": on_progress}
+
+        if cpu:
+            # Las tareas de CPU se ejecutan en otro proceso: sin progreso ni cancelación en curso
+            if self._cpu_pool is None:
+                self._cpu_pool = ProcessPoolExecutor(max_workers=self._cpu_workers)
+            job.status = "running"
+            job.future = self._cpu_pool.submit(fn, *args, **kwargs)
+        else:
+            job.future = self._io_pool.submit(self._run_in_thread, job, fn, args, kwargs)
+        job.future.add_done_callback(lambda future: self._events.put(("done", job, future)))
+
+        self.jobs.append(job)
+        self.logger.info(f"Tarea #{job.id} encolada: {name}")
+        self._notify_changed()
+        return job
+
+    @staticmethod
+    def _run_in_thread(job: Job, fn: Callable, args, kwargs):
+        job.check_cancelled()
+        job.status = "running"
+        job._executor._events.put(("changed", job, None))
+        _local.job = job
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.job = None
+
+    def post(self, fn: Callable[..., None], *args):
+        """Ejecutar `fn(*args)` en el hilo de la UI; se puede llamar desde cualquier hilo"""
+        self._events.put(("call", None, (fn, args)))
+
+    def add_listener(self, listener: Callable[[], None]):
+        """Registrar un observador que se llama (en la UI) cuando cambia la lista de tareas"""
+        self._listeners.append(listener)
+
+    def _notify_changed(self):
+        for listener in self._listeners:
+            try:
+                listener()
+            except Exception as e:
+                self.logger.error(f"Error notificando cambios de tareas: {e}")
+
+    def _invoke(self, callback: Optional[Callable], *args, description: str):
+        """Ejecutar un callback de la UI sin que su error detenga la entrega de eventos"""
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            self.logger.error(f"Error en {description}: {e}")
+
+    def _poll(self):
+        """Entregar en el hilo de la UI los eventos producidos por los workers"""
+        changed = False
+        try:
+            while True:
+                try:
+                    event, job, payload = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                if event == "call":
+                    fn, args = payload
+                    self._invoke(fn, *args, description="una llamada diferida a la UI")
+                    continue
+                changed = True
+                callbacks = self._callbacks.get(job.id, {})
+                if event == "progress":
+                    self._invoke(callbacks.get("progress"), *payload,
+                                 description=f"el progreso de la tarea #{job.id}")
+                elif event == "done":
+                    self._finish(job, payload, callbacks)
+
+            if changed:
+                self._notify_changed()
+        finally:
+            # Reprogramar siempre: si el sondeo se detuviera, ninguna tarea llegaría a la UI
+            if not self._closed:
+                self.scheduler.after(self.poll_interval_ms, self._poll)
+
+    def _finish(self, job: Job, future: Future, callbacks: Dict[str, Optional[Callable]]):
+        job.finished_at = time.time()
+        self._callbacks.pop(job.id, None)
+        error = JobCancelled(f"Tarea cancelada: {job.name}") if future.cancelled() else future.exception()
+        if isinstance(error, JobCancelled):
+            # on_error recibe JobCancelled para que la UI pueda limpiar su estado
+            job.status = "cancelled"
+            self.logger.info(f"Tarea #{job.id} cancelada: {job.name}")
+            self._invoke(callbacks.get("error"), error, description=f"on_error de la tarea #{job.id}")
+        elif error is not None:
+            job.status = "failed"
+            job.error = error
+            self.logger.error(f"Tarea #{job.id} falló: {job.name}: {error}")
+            self._invoke(callbacks.get("error"), error, description=f"on_error de la tarea #{job.id}")
+        else:
+            job.status = "done"
+            job.progress = 1.0
+            self._invoke(callbacks.get("success"), future.result(),
+                         description=f"on_success de la tarea #{job.id}")
+
+    def shutdown(self):
+        """Cancelar lo pendiente y detener los pools"""
+        self._closed = True
+        for job in self.jobs:
+            if job.status in ("pending", "running"):
+                job.cancel()
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,59 @@
+import importlib
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule:
+    """Módulo que se importa en el primer acceso a uno de sus atributos.
+
+    Permite declarar las dependencias pesadas (pandas, SQLAlchemy, pymongo,
+    pyarrow...) al principio del archivo sin pagar su importación al
+    arrancar. importlib.import_module usa el bloqueo de importación, así
+    que el primer acceso puede ocurrir en cualquier hilo.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            start = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            logger.debug(f"Importado {self._name} en {time.perf_counter() - start:.3f}s")
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "cargado" if self.loaded else "pendiente"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def preload(modules: Iterable[LazyModule]) -> threading.Thread:
+    """Importar los módulos en un hilo de fondo (p. ej. tras mostrar la ventana)"""
+    def load_all():
+        for module in modules:
+            try:
+                module._load()
+            except Exception as e:
+                # El error volverá a aparecer, con su contexto, en el primer uso real
+                logger.warning(f"No se pudo precargar {module._name}: {e}")
+
+    thread = threading.Thread(target=load_all, name="preload", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,935 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import pandas as pd
+from bson import Binary, Decimal128
+from sqlalchemy import MetaData, Table, inspect, select, text
+from sqlalchemy import types as sqltypes
+from sqlalchemy.dialects import mssql
+
+from analytics import iter_sql_chunks
+from bulk_loader import CancelCheck, copy_to_postgres, run_batches, write_to_sqlserver
+from checkpoint import CheckpointStore, batch_writer, copy_table_resumable
+from config import (BULK_BATCH_SIZE, DatabaseConfig, MIGRATION_FETCH_SIZE, MIGRATION_QUEUE_SIZE,
+                    MIGRATION_WORKERS, MONGO_BATCH_SIZE, MONGO_SCHEMA_SAMPLE, MONGO_WRITE_WORKERS, PARTITION_WORKERS)
+from databse import DatabaseManager
+from incremental import WatermarkStore, sync_table, watermark_key
+from job_executor import JobCancelled
+from mongo_schema import PARENT_ID_COLUMN, discover_schema
+from partitioning import PartitionedReader
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TableMigrationResult:
+    """Resultado de migrar una tabla"""
+    table: str
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        if not self.success:
+            return f"{self.table}: ERROR {self.error}"
+        return f"{self.table}: {self.rows} filas en {self.seconds:.2f}s ({self.rows_per_second:,.0f} filas/s)"
+
+
+def postgres_to_sqlserver_type(sql_type) -> str:
+    """Mapear un tipo de columna de PostgreSQL (SQLAlchemy) a DDL de SQL Server"""
+    if isinstance(sql_type, sqltypes.Boolean):
+        return "BIT"
+    if isinstance(sql_type, sqltypes.BigInteger):
+        return "BIGINT"
+    if isinstance(sql_type, sqltypes.SmallInteger):
+        return "SMALLINT"
+    if isinstance(sql_type, sqltypes.Integer):
+        return "INT"
+    if isinstance(sql_type, sqltypes.Float):
+        return "FLOAT"
+    if isinstance(sql_type, sqltypes.Numeric):
+        if sql_type.precision:
+            return f"DECIMAL({min(sql_type.precision, 38)}, {sql_type.scale or 0})"
+        return "DECIMAL(38, 10)"
+    if isinstance(sql_type, sqltypes.DateTime):
+        return "DATETIMEOFFSET" if getattr(sql_type, "timezone", False) else "DATETIME2"
+    if isinstance(sql_type, sqltypes.Date):
+        return "DATE"
+    if isinstance(sql_type, sqltypes.Time):
+        return "TIME"
+    if isinstance(sql_type, sqltypes.Uuid):
+        return "UNIQUEIDENTIFIER"
+    if isinstance(sql_type, sqltypes.LargeBinary):
+        return "VARBINARY(MAX)"
+    if isinstance(sql_type, sqltypes.String) and not isinstance(sql_type, sqltypes.Text):
+        if sql_type.length and sql_type.length <= 4000:
+            return f"NVARCHAR({sql_type.length})"
+        return "NVARCHAR(MAX)"
+    if not isinstance(sql_type, (sqltypes.Text, sqltypes.JSON)):
+        logger.warning(f"Tipo de datos no mapeado: {sql_type}. Usando NVARCHAR(MAX) como predeterminado.")
+    return "NVARCHAR(MAX)"
+
+
+def create_sqlserver_table(source_engine, target_engine, table: str, schema: Optional[str] = None):
+    """(Re)crear en SQL Server la tabla de PostgreSQL con tipos equivalentes"""
+    columns = inspect(source_engine).get_columns(table, schema=schema)
+    if not columns:
+        raise ValueError(f"No se pudo obtener la estructura de la tabla {table} en PostgreSQL")
+
+    quote = target_engine.dialect.identifier_preparer.quote
+    definitions = ", ".join(
+        f"{quote(col['name'])} {postgres_to_sqlserver_type(col['type'])} NULL"
+        for col in columns
+    )
+    with target_engine.begin() as connection:
+        connection.execute(text(
+            f"IF OBJECT_ID(N'dbo.{table.replace(chr(39), chr(39) * 2)}', N'U') IS NOT NULL "
+            f"DROP TABLE {quote(table)}"
+        ))
+        connection.execute(text(f"CREATE TABLE {quote(table)} ({definitions})"))
+
+
+def _table_workers(workers: int) -> int:
+    """Tablas migradas a la vez, limitadas a las conexiones del pool compartido.
+
+    Cada tabla mantiene al menos una conexión prestada con el origen y otra
+    con el destino mientras se copia; con más tablas que conexiones, las
+    sobrantes esperarían hasta agotar el timeout del pool.
+    """
+    capacity = DatabaseManager.pool_capacity()
+    if workers > capacity:
+        logger.warning(f"{workers} workers superan las {capacity} conexiones del pool; se usarán {capacity}")
+    return min(max(1, workers), capacity)
+
+
+def _partition_workers(workers: int, partition_workers: int = PARTITION_WORKERS) -> int:
+    """Lectores por tabla que caben en el pool de origen con `workers` tablas migrándose a la vez.
+
+    Cada partición mantiene una conexión prestada mientras se lee, así que
+    tablas x particiones no puede superar la capacidad del pool o la
+    última conexión esperaría hasta agotar el timeout del pool.
+    """
+    capacity = DatabaseManager.pool_capacity()
+    available = max(1, capacity // max(1, workers))
+    if partition_workers > available:
+        logger.warning(f"{workers} tablas x {partition_workers} particiones superan las {capacity} conexiones "
+                       f"del pool; se leerán {available} particiones a la vez por tabla")
+    return min(partition_workers, available)
+
+
+def _copy_postgres_to_sqlserver(source_engine, target_engine, table: str, batch_size: int, partitions: int,
+                                partition_workers: int = PARTITION_WORKERS,
+                                check_cancelled: CancelCheck = None) -> int:
+    create_sqlserver_table(source_engine, target_engine, table)
+
+    def write(chunks) -> int:
+        rows, _ = write_to_sqlserver(chunks, target_engine, table, if_exists="append", batch_size=batch_size,
+                                     check_cancelled=check_cancelled)
+        return rows
+
+    reader = None
+    if partitions > 1:
+        try:
+            reader = PartitionedReader(source_engine, table, partitions=partitions, workers=partition_workers,
+                                       chunksize=batch_size)
+        except ValueError as e:
+            logger.warning(f"{e}; se migrará con un único cursor")
+
+    if reader is not None:
+        return sum(reader.map_partitions(lambda key_range, chunks: write(chunks), check_cancelled))
+    return write(iter_sql_chunks(source_engine, table, chunksize=batch_size))
+
+
+def migrate_table_postgres_to_sqlserver(
+    source: DatabaseConfig,
+    target: DatabaseConfig,
+    table: str,
+    batch_size: int = BULK_BATCH_SIZE,
+    partitions: int = 1,
+    checkpoints: Optional[CheckpointStore] = None,
+    key_column: Optional[str] = None,
+    check_cancelled: CancelCheck = None,
+    partition_workers: int = PARTITION_WORKERS
+) -> TableMigrationResult:
+    """Migrar una tabla leyendo con un cursor de servidor y escribiendo por lotes, sin archivos temporales.
+
+    Con `partitions` > 1 la tabla se divide en rangos de su clave y cada
+    rango se copia por su propia conexión, con hasta `partition_workers`
+    rangos a la vez. Con `checkpoints` cada lote se
+    confirma por separado y una ejecución fallida se retoma donde quedó
+    (lectura ordenada por `key_column`, por defecto la clave primaria).
+    `check_cancelled` se llama antes de cada lote; una cancelación se
+    propaga en lugar de registrarse como error de la tabla.
+    """
+    start = time.perf_counter()
+    result = TableMigrationResult(table)
+    try:
+        source_engine = DatabaseManager.create_postgres_engine(source)
+        target_engine = DatabaseManager.create_sqlserver_engine(target)
+        if checkpoints is not None:
+            if partitions > 1:
+                logger.warning(f"{table}: la migración reanudable usa un único cursor ordenado por la clave")
+            result.rows, _ = copy_table_resumable(
+                source_engine, target_engine, table, batch_writer(target_engine, table),
+                lambda: create_sqlserver_table(source_engine, target_engine, table),
+                checkpoints, watermark_key(source, target, table), key_column, batch_size,
+                check_cancelled=check_cancelled)
+        else:
+            result.rows = _copy_postgres_to_sqlserver(source_engine, target_engine, table, batch_size, partitions,
+                                                      partition_workers, check_cancelled)
+    except JobCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Error migrando la tabla {table}: {e}")
+        result.error = str(e)
+    result.seconds = time.perf_counter() - start
+    logger.info(f"Migración PostgreSQL -> SQL Server {result.summary()}")
+    return result
+
+
+def sync_table_postgres_to_sqlserver(
+    source: DatabaseConfig,
+    target: DatabaseConfig,
+    table: str,
+    watermark_column: str,
+    key_columns: Sequence[str],
+    store: Optional[WatermarkStore] = None,
+    batch_size: int = BULK_BATCH_SIZE,
+    check_cancelled: CancelCheck = None
+) -> TableMigrationResult:
+    """Migración incremental: solo las filas nuevas o modificadas, aplicadas con MERGE"""
+    start = time.perf_counter()
+    result = TableMigrationResult(table)
+    try:
+        source_engine = DatabaseManager.create_postgres_engine(source)
+        target_engine = DatabaseManager.create_sqlserver_engine(target)
+        if not inspect(target_engine).has_table(table):
+            create_sqlserver_table(source_engine, target_engine, table)
+        result.rows, _ = sync_table(
+            source_engine, target_engine, table, watermark_column, key_columns,
+            store or WatermarkStore(), watermark_key(source, target, table),
+            batch_size=batch_size, check_cancelled=check_cancelled
+        )
+    except JobCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Error sincronizando la tabla {table}: {e}")
+        result.error = str(e)
+    result.seconds = time.perf_counter() - start
+    logger.info(f"Sincronización PostgreSQL -> SQL Server {result.summary()}")
+    return result
+
+
+def migrate_postgres_to_sqlserver(
+    source: DatabaseConfig,
+    target: DatabaseConfig,
+    tables: Optional[List[str]] = None,
+    workers: int = MIGRATION_WORKERS,
+    batch_size: int = BULK_BATCH_SIZE,
+    partitions: int = 1,
+    watermark_column: Optional[str] = None,
+    key_columns: Optional[Sequence[str]] = None,
+    on_table_done: Optional[Callable[[TableMigrationResult], None]] = None,
+    resumable: bool = False,
+    check_cancelled: CancelCheck = None
+) -> List[TableMigrationResult]:
+    """Migrar varias tablas (o el esquema completo si `tables` es None) en paralelo.
+
+    Con `watermark_column` y `key_columns` la migración es incremental:
+    cada tabla solo copia lo que cambió desde la ejecución anterior. Con
+    `resumable` cada tabla guarda un checkpoint por lote y, si una
+    ejecución falla, la siguiente continúa desde él. `check_cancelled`
+    (p. ej. `Job.check_cancelled`) detiene la migración entre lotes.
+    """
+    if not tables:
+        tables = inspect(DatabaseManager.create_postgres_engine(source)).get_table_names()
+    workers = _table_workers(workers)
+    logger.info(f"Migrando {len(tables)} tablas de PostgreSQL a SQL Server con {workers} workers")
+
+    if watermark_column:
+        if not key_columns:
+            raise ValueError("La migración incremental requiere columnas clave")
+        store = WatermarkStore()
+        migrate = lambda table: sync_table_postgres_to_sqlserver(
+            source, target, table, watermark_column, key_columns, store, batch_size, check_cancelled)
+    elif resumable:
+        checkpoints = CheckpointStore()
+        key_column = _resume_key(key_columns)
+        migrate = lambda table: migrate_table_postgres_to_sqlserver(
+            source, target, table, batch_size, partitions, checkpoints, key_column, check_cancelled)
+    else:
+        partition_workers = _partition_workers(workers) if partitions > 1 else PARTITION_WORKERS
+        migrate = lambda table: migrate_table_postgres_to_sqlserver(
+            source, target, table, batch_size, partitions, check_cancelled=check_cancelled,
+            partition_workers=partition_workers)
+
+    return _migrate_tables(tables, migrate, workers, on_table_done, check_cancelled)
+
+
+def _resume_key(key_columns: Optional[Sequence[str]]) -> Optional[str]:
+    """Columna que ordena la lectura reanudable (None = clave primaria de cada tabla)"""
+    if key_columns and len(key_columns) > 1:
+        raise ValueError("La migración reanudable necesita una sola columna clave")
+    return key_columns[0] if key_columns else None
+
+
+def _migrate_tables(
+    tables: Sequence[str],
+    migrate: Callable[[str], TableMigrationResult],
+    workers: int,
+    on_table_done: Optional[Callable[[TableMigrationResult], None]] = None,
+    check_cancelled: CancelCheck = None
+) -> List[TableMigrationResult]:
+    """Ejecutar `migrate` para cada tabla en un pool de hilos, avisando al terminar cada una.
+
+    Si `check_cancelled` lanza una excepción, las tablas que aún no
+    empezaron se descartan y la excepción se propaga.
+    """
+    def run(table: str) -> TableMigrationResult:
+        if check_cancelled is not None:
+            check_cancelled()
+        return migrate(table)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="migration") as executor:
+        futures = [executor.submit(run, table) for table in tables]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if on_table_done is not None:
+                    on_table_done(result)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return results
+
+
+# SQL Server -> PostgreSQL
+
+def sqlserver_to_postgres_type(sql_type) -> str:
+    """Mapear un tipo de columna de SQL Server (SQLAlchemy) a DDL de PostgreSQL"""
+    if isinstance(sql_type, sqltypes.Boolean):
+        return "BOOLEAN"
+    if isinstance(sql_type, sqltypes.BigInteger):
+        return "BIGINT"
+    if isinstance(sql_type, (sqltypes.SmallInteger, mssql.TINYINT)):
+        return "SMALLINT"
+    if isinstance(sql_type, sqltypes.Integer):
+        return "INTEGER"
+    if isinstance(sql_type, mssql.MONEY):
+        return "NUMERIC(19, 4)"
+    if isinstance(sql_type, mssql.SMALLMONEY):
+        return "NUMERIC(10, 4)"
+    if isinstance(sql_type, sqltypes.REAL):
+        return "REAL"
+    if isinstance(sql_type, sqltypes.Float):
+        return "DOUBLE PRECISION"
+    if isinstance(sql_type, sqltypes.Numeric):
+        if sql_type.precision:
+            return f"NUMERIC({sql_type.precision}, {sql_type.scale or 0})"
+        return "NUMERIC"
+    if isinstance(sql_type, mssql.DATETIMEOFFSET):
+        return "TIMESTAMPTZ"
+    if isinstance(sql_type, sqltypes.DateTime):
+        return "TIMESTAMP"
+    if isinstance(sql_type, sqltypes.Date):
+        return "DATE"
+    if isinstance(sql_type, sqltypes.Time):
+        return "TIME"
+    if isinstance(sql_type, sqltypes.Uuid):
+        return "UUID"
+    if isinstance(sql_type, mssql.XML):
+        return "XML"
+    if isinstance(sql_type, sqltypes._Binary):
+        # VARBINARY, IMAGE y ROWVERSION
+        return "BYTEA"
+    if isinstance(sql_type, sqltypes.String) and not isinstance(sql_type, sqltypes.Text):
+        if not sql_type.length or sql_type.length < 0:
+            return "TEXT"  # VARCHAR(MAX) / NVARCHAR(MAX)
+        if isinstance(sql_type, (sqltypes.CHAR, sqltypes.NCHAR)):
+            return f"CHAR({sql_type.length})"
+        return f"VARCHAR({sql_type.length})"
+    if not isinstance(sql_type, sqltypes.Text):
+        logger.warning(f"Tipo de datos no mapeado: {sql_type}. Usando TEXT como predeterminado.")
+    return "TEXT"
+
+
+def create_postgres_table(source_engine, target_engine, table: str, schema: Optional[str] = None) -> List[str]:
+    """(Re)crear en PostgreSQL la tabla de SQL Server con tipos equivalentes; retorna sus columnas"""
+    columns = inspect(source_engine).get_columns(table, schema=schema)
+    if not columns:
+        raise ValueError(f"No se pudo obtener la estructura de la tabla {table} en SQL Server")
+
+    quote = target_engine.dialect.identifier_preparer.quote
+    definitions = ", ".join(
+        f"{quote(col['name'])} {sqlserver_to_postgres_type(col['type'])} NULL"
+        for col in columns
+    )
+    with target_engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {quote(table)}"))
+        connection.execute(text(f"CREATE TABLE {quote(table)} ({definitions})"))
+    return [col["name"] for col in columns]
+
+
+def _copy_field(value: Any) -> str:
+    """Valor en formato CSV de COPY: vacío sin comillas es NULL, los textos van siempre entre comillas"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    value = str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _copy_rows(rows: Sequence[Sequence[Any]]) -> str:
+    return "".join(",".join(map(_copy_field, row)) + "\n" for row in rows)
+
+
+class _CopyStream:
+    """Archivo de solo lectura que COPY FROM STDIN consume mientras el productor sigue leyendo.
+
+    Cada elemento de la cola es un lote ya convertido a CSV; `read` entrega
+    trozos del lote actual y solo se bloquea cuando no queda ninguno.
+    """
+
+    def __init__(self, batches: "queue.Queue", finished: object):
+        self._batches = batches
+        self._finished = finished
+        self._data = ""
+        self._position = 0
+        self._done = False
+
+    def read(self, size: int = -1) -> str:
+        while self._position >= len(self._data):
+            if self._done:
+                return ""
+            item = self._batches.get()
+            if item is self._finished:
+                self._done = True
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                self._data, self._position = item, 0
+        end = len(self._data) if size is None or size < 0 else self._position + size
+        chunk = self._data[self._position:end]
+        self._position += len(chunk)
+        return chunk
+
+
+def stream_sqlserver_to_postgres(
+    source_engine,
+    target_engine,
+    table: str,
+    columns: Sequence[str],
+    fetch_size: int = MIGRATION_FETCH_SIZE,
+    queue_size: int = MIGRATION_QUEUE_SIZE,
+    check_cancelled: CancelCheck = None
+) -> int:
+    """Copiar una tabla con un único COPY FROM STDIN alimentado mientras se lee SQL Server.
+
+    Un hilo productor lee con fetchmany y convierte cada lote a CSV; el
+    COPY consume la cola en este hilo. La cola está acotada, así que la
+    lectura se frena si PostgreSQL es más lento y la memoria queda limitada
+    a unos pocos lotes. El tiempo total tiende a max(lectura, escritura).
+    El productor llama a `check_cancelled` antes de cada lote; su excepción
+    llega al COPY por la cola y lo aborta.
+    """
+    source_quote = source_engine.dialect.identifier_preparer.quote
+    target_quote = target_engine.dialect.identifier_preparer.quote
+    select_sql = (f"SELECT {', '.join(source_quote(col) for col in columns)} "
+                  f"FROM {source_quote(table)}")
+    copy_sql = (f"COPY {target_quote(table)} ({', '.join(target_quote(col) for col in columns)}) "
+                f"FROM STDIN WITH (FORMAT csv)")
+
+    batches: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    finished = object()
+    stop = threading.Event()
+    stats = {"rows": 0, "read_seconds": 0.0}
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        connection = source_engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.arraysize = fetch_size
+            cursor.execute(select_sql)
+            while not stop.is_set():
+                if check_cancelled is not None:
+                    check_cancelled()
+                start = time.perf_counter()
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                data = _copy_rows(rows)
+                stats["read_seconds"] += time.perf_counter() - start
+                stats["rows"] += len(rows)
+                if not put(data):
+                    return
+            put(finished)
+        except Exception as e:
+            put(e)
+        finally:
+            connection.close()
+
+    producer = threading.Thread(target=produce, name=f"mssql-read-{table}", daemon=True)
+    connection = target_engine.raw_connection()
+    start = time.perf_counter()
+    try:
+        producer.start()
+        with connection.cursor() as cursor:
+            cursor.copy_expert(copy_sql, _CopyStream(batches, finished))
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        stop.set()
+        producer.join()
+        connection.close()
+
+    total = time.perf_counter() - start
+    logger.info(f"{table}: lectura {stats['read_seconds']:.2f}s, total {total:.2f}s "
+                f"({stats['rows']} filas, lotes de {fetch_size})")
+    return stats["rows"]
+
+
+def migrate_table_sqlserver_to_postgres(
+    source: DatabaseConfig,
+    target: DatabaseConfig,
+    table: str,
+    fetch_size: int = MIGRATION_FETCH_SIZE,
+    checkpoints: Optional[CheckpointStore] = None,
+    key_column: Optional[str] = None,
+    check_cancelled: CancelCheck = None
+) -> TableMigrationResult:
+    """Migrar una tabla de SQL Server a PostgreSQL creando el destino con tipos mapeados.
+
+    Con `checkpoints` se renuncia al COPY único: cada lote se confirma por
+    separado y una ejecución fallida se retoma donde quedó.
+    """
+    start = time.perf_counter()
+    result = TableMigrationResult(table)
+    try:
+        source_engine = DatabaseManager.create_sqlserver_engine(source)
+        target_engine = DatabaseManager.create_postgres_engine(target)
+        if checkpoints is not None:
+            result.rows, _ = copy_table_resumable(
+                source_engine, target_engine, table, batch_writer(target_engine, table),
+                lambda: create_postgres_table(source_engine, target_engine, table),
+                checkpoints, watermark_key(source, target, table), key_column, fetch_size,
+                check_cancelled=check_cancelled)
+        elif target_engine.dialect.driver == "psycopg2":
+            columns = create_postgres_table(source_engine, target_engine, table)
+            result.rows = stream_sqlserver_to_postgres(source_engine, target_engine, table, columns, fetch_size,
+                                                       check_cancelled=check_cancelled)
+        else:
+            logger.warning(f"COPY no disponible para el driver {target_engine.dialect.driver}; usando lotes")
+            create_postgres_table(source_engine, target_engine, table)
+            result.rows, _ = copy_to_postgres(iter_sql_chunks(source_engine, table, chunksize=fetch_size),
+                                              target_engine, table, if_exists="append", batch_size=fetch_size,
+                                              check_cancelled=check_cancelled)
+    except JobCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Error migrando la tabla {table}: {e}")
+        result.error = str(e)
+    result.seconds = time.perf_counter() - start
+    logger.info(f"Migración SQL Server -> PostgreSQL {result.summary()}")
+    return result
+
+
+def migrate_sqlserver_to_postgres(
+    source: DatabaseConfig,
+    target: DatabaseConfig,
+    tables: Optional[List[str]] = None,
+    workers: int = MIGRATION_WORKERS,
+    fetch_size: int = MIGRATION_FETCH_SIZE,
+    on_table_done: Optional[Callable[[TableMigrationResult], None]] = None,
+    resumable: bool = False,
+    key_column: Optional[str] = None,
+    check_cancelled: CancelCheck = None
+) -> List[TableMigrationResult]:
+    """Migrar varias tablas (o el esquema completo si `tables` es None) de SQL Server a PostgreSQL"""
+    if not tables:
+        tables = inspect(DatabaseManager.create_sqlserver_engine(source)).get_table_names()
+    workers = _table_workers(workers)
+    logger.info(f"Migrando {len(tables)} tablas de SQL Server a PostgreSQL con {workers} workers")
+    checkpoints = CheckpointStore() if resumable else None
+    return _migrate_tables(
+        tables,
+        lambda table: migrate_table_sqlserver_to_postgres(source, target, table, fetch_size, checkpoints, key_column,
+                                                          check_cancelled),
+        workers,
+        on_table_done,
+        check_cancelled
+    )
+
+
+# PostgreSQL -> MongoDB
+
+@dataclass
+class Embedding:
+    """Tabla relacionada que se anida en cada documento.
+
+    Las filas de `table` cuyo `remote_column` coincide con `local_column`
+    del documento se guardan en `field`: una lista con `many` (1-N) o un
+    único subdocumento (N-1, p. ej. una tabla de catálogo).
+    """
+    field: str
+    table: str
+    local_column: str
+    remote_column: str
+    many: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Embedding":
+        return cls(**{key: data[key] for key in ("field", "table", "local_column", "remote_column")},
+                   many=bool(data.get("many", True)))
+
+
+def _to_decimal128(value: Decimal):
+    try:
+        return Decimal128(value)
+    except (ArithmeticError, ValueError):
+        # Más de 34 dígitos significativos: no cabe en Decimal128 sin perder precisión
+        return str(value)
+
+
+def _to_bson(value: Any) -> Any:
+    """Conversión genérica, para arrays, JSON y tipos no reconocidos"""
+    if isinstance(value, (list, tuple)):
+        return [_to_bson(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _to_bson(item) for key, item in value.items()}
+    converter = _VALUE_CONVERTERS.get(type(value))
+    return converter(value) if converter else value
+
+
+_VALUE_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    Decimal: _to_decimal128,
+    date: lambda value: datetime.combine(value, dt_time.min),
+    dt_time: lambda value: value.isoformat(),
+    timedelta: lambda value: value.total_seconds(),
+    uuid.UUID: Binary.from_uuid,
+    memoryview: bytes,
+    bytearray: bytes,
+}
+
+
+def bson_converter(sql_type) -> Optional[Callable[[Any], Any]]:
+    """Función que convierte los valores de una columna a tipos BSON (None si ya lo son)"""
+    if isinstance(sql_type, (sqltypes.Boolean, sqltypes.Integer, sqltypes.Float, sqltypes.DateTime)):
+        return None
+    if isinstance(sql_type, sqltypes.Numeric):
+        return _to_decimal128 if sql_type.asdecimal else None
+    if isinstance(sql_type, sqltypes.Date):
+        return _VALUE_CONVERTERS[date]
+    if isinstance(sql_type, sqltypes.Time):
+        return _VALUE_CONVERTERS[dt_time]
+    if isinstance(sql_type, sqltypes.Interval):
+        return _VALUE_CONVERTERS[timedelta]
+    if isinstance(sql_type, sqltypes.Uuid):
+        return Binary.from_uuid if sql_type.as_uuid else None
+    if isinstance(sql_type, sqltypes.LargeBinary):
+        return bytes
+    if isinstance(sql_type, sqltypes.String) and not isinstance(sql_type, sqltypes.JSON):
+        return None
+    return _to_bson
+
+
+class DocumentBuilder:
+    """Convierte lotes de filas de una tabla en documentos, columna a columna.
+
+    El conversor de cada columna se elige una vez a partir de su tipo, así
+    que los valores que ya son BSON (enteros, textos, fechas...) no se tocan.
+    """
+
+    def __init__(self, engine, table: Table, embed: Sequence[Embedding] = (), id_column: Optional[str] = None):
+        self.engine = engine
+        self.table = table
+        self.embed = list(embed)
+        self.names = ["_id" if col.name == id_column else col.name for col in table.columns]
+        self.converters = [bson_converter(col.type) for col in table.columns]
+        self._related = {}
+        for spec in self.embed:
+            related = Table(spec.table, MetaData(), autoload_with=engine)
+            self._related[spec.table] = (related, [bson_converter(col.type) for col in related.columns])
+
+    @staticmethod
+    def convert(rows: Sequence[Sequence[Any]], names: Sequence[str], converters) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        columns = []
+        for values, converter in zip(zip(*rows), converters):
+            if converter is not None:
+                values = [None if value is None else converter(value) for value in values]
+            columns.append(values)
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def build(self, rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+        documents = self.convert(rows, self.names, self.converters)
+        positions = {col.name: i for i, col in enumerate(self.table.columns)}
+        for spec in self.embed:
+            local = [row[positions[spec.local_column]] for row in rows]
+            related = self._fetch_related(spec, {value for value in local if value is not None})
+            for document, key in zip(documents, local):
+                children = related.get(key, [])
+                document[spec.field] = children if spec.many else (children[0] if children else None)
+        return documents
+
+    def _fetch_related(self, spec: Embedding, keys) -> Dict[Any, List[Dict[str, Any]]]:
+        """Filas relacionadas con las claves de un lote, con una sola consulta"""
+        related: Dict[Any, List[Dict[str, Any]]] = {}
+        if not keys:
+            return related
+        table, converters = self._related[spec.table]
+        with self.engine.connect() as connection:
+            rows = connection.execute(select(table).where(table.c[spec.remote_column].in_(list(keys)))).all()
+        position = list(table.c.keys()).index(spec.remote_column)
+        for row, document in zip(rows, self.convert(rows, list(table.c.keys()), converters)):
+            if spec.many:
+                document.pop(spec.remote_column, None)  # ya está en el documento padre
+            related.setdefault(row[position], []).append(document)
+        return related
+
+
+def iter_table_rows(engine, table: Table, batch_size: int) -> Iterator[Sequence[Sequence[Any]]]:
+    """Leer una tabla por lotes de filas con un cursor del lado del servidor"""
+    with engine.connect().execution_options(stream_results=True, yield_per=batch_size) as connection:
+        result = connection.execute(select(table))
+        for partition in result.partitions(batch_size):
+            yield partition
+
+
+def migrate_table_postgres_to_mongo(
+    source: DatabaseConfig,
+    target: DatabaseConfig,
+    table: str,
+    collection: Optional[str] = None,
+    embed: Sequence[Embedding] = (),
+    id_column: Optional[str] = None,
+    batch_size: int = MONGO_BATCH_SIZE,
+    workers: int = MONGO_WRITE_WORKERS,
+    check_cancelled: CancelCheck = None
+) -> TableMigrationResult:
+    """Migrar una tabla a una colección (que se reemplaza) conservando los tipos.
+
+    Las filas se leen con un cursor de servidor y cada lote se convierte e
+    inserta con insert_many(ordered=False) en uno de los `workers` hilos;
+    las tablas de `embed` se consultan por lote y se anidan en el documento.
+    """
+    start = time.perf_counter()
+    result = TableMigrationResult(table)
+    try:
+        source_engine = DatabaseManager.create_postgres_engine(source)
+        client = DatabaseManager.create_mongo_client(target)
+        target_collection = client[target.database][collection or table]
+        builder = DocumentBuilder(source_engine, Table(table, MetaData(), autoload_with=source_engine),
+                                  embed, id_column)
+        target_collection.drop()
+
+        def insert(rows) -> int:
+            documents = builder.build(rows)
+            if not documents:
+                return 0
+            return len(target_collection.insert_many(documents, ordered=False).inserted_ids)
+
+        result.rows = run_batches(iter_table_rows(source_engine, builder.table, batch_size), insert, workers,
+                                  check_cancelled)
+    except JobCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Error migrando la tabla {table}: {e}")
+        result.error = str(e)
+    result.seconds = time.perf_counter() - start
+    logger.info(f"Migración PostgreSQL -> MongoDB {result.summary()}")
+    return result
+
+
+def migrate_postgres_to_mongo(
+    source: DatabaseConfig,
+    target: DatabaseConfig,
+    tables: Optional[List[str]] = None,
+    workers: int = MIGRATION_WORKERS,
+    batch_size: int = MONGO_BATCH_SIZE,
+    collections: Optional[Dict[str, str]] = None,
+    embed: Optional[Dict[str, Sequence[Embedding]]] = None,
+    id_columns: Optional[Dict[str, str]] = None,
+    on_table_done: Optional[Callable[[TableMigrationResult], None]] = None,
+    check_cancelled: CancelCheck = None
+) -> List[TableMigrationResult]:
+    """Migrar varias tablas (o el esquema completo si `tables` es None) a colecciones de MongoDB.
+
+    `collections`, `embed` e `id_columns` se indican por tabla: nombre de la
+    colección, tablas anidadas y columna que pasa a ser `_id`.
+    """
+    if not tables:
+        tables = inspect(DatabaseManager.create_postgres_engine(source)).get_table_names()
+    collections, embed, id_columns = collections or {}, embed or {}, id_columns or {}
+    workers = _table_workers(workers)
+    logger.info(f"Migrando {len(tables)} tablas de PostgreSQL a MongoDB con {workers} workers")
+    return _migrate_tables(
+        tables,
+        lambda table: migrate_table_postgres_to_mongo(
+            source, target, table, collections.get(table), embed.get(table, ()), id_columns.get(table),
+            batch_size, check_cancelled=check_cancelled),
+        workers,
+        on_table_done,
+        check_cancelled
+    )
+
+
+# MongoDB -> PostgreSQL / SQL Server
+
+RELATIONAL_TARGETS = ("postgres", "sqlserver")
+
+
+def _relational_engine(config: DatabaseConfig, target_type: str):
+    if target_type == "postgres":
+        return DatabaseManager.create_postgres_engine(config)
+    if target_type == "sqlserver":
+        return DatabaseManager.create_sqlserver_engine(config)
+    raise ValueError(f"Destino relacional no soportado: {target_type}")
+
+
+def _load_columns(engine, table: Table, columns: Dict[str, List[Any]]) -> int:
+    """Cargar las columnas de un lote aplanado con COPY (PostgreSQL) o carga masiva (SQL Server)"""
+    # dtype=object: un entero con nulos no debe convertirse en float
+    frame = pd.DataFrame({name: pd.Series(values, dtype=object) for name, values in columns.items()})
+    if engine.dialect.name == "postgresql":
+        for col in table.columns:
+            if isinstance(col.type, sqltypes.LargeBinary):
+                frame[col.name] = frame[col.name].map(lambda value: None if value is None else "\\x" + value.hex())
+        rows, _ = copy_to_postgres(frame, engine, table.name, if_exists="append", batch_size=len(frame))
+    else:
+        rows, _ = write_to_sqlserver(frame, engine, table.name, if_exists="append", batch_size=len(frame))
+    return rows
+
+
+def iter_document_batches(collection, projection: Optional[Dict[str, int]], batch_size: int):
+    """Leer una colección en lotes de documentos con un cursor por lotes"""
+    batch = []
+    for document in collection.find({}, projection, batch_size=batch_size):
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def migrate_collection_to_relational(
+    source: DatabaseConfig,
+    target: DatabaseConfig,
+    collection: str,
+    target_type: str = "postgres",
+    batch_size: int = MONGO_BATCH_SIZE,
+    workers: int = MONGO_WRITE_WORKERS,
+    sample_size: int = MONGO_SCHEMA_SAMPLE,
+    check_cancelled: CancelCheck = None
+) -> TableMigrationResult:
+    """Migrar una colección a tablas relacionales (que se reemplazan).
+
+    El esquema se descubre con $sample; después la colección se lee por
+    lotes proyectando solo los campos descubiertos, cada lote se aplana en
+    la tabla principal y las tablas hijas de sus arrays, y se carga con
+    `workers` lotes en vuelo.
+    """
+    start = time.perf_counter()
+    result = TableMigrationResult(collection)
+    try:
+        source_collection = DatabaseManager.create_mongo_client(source)[source.database][collection]
+        engine = _relational_engine(target, target_type)
+        schema = discover_schema(source_collection, sample_size)
+        metadata = schema.metadata()
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+
+        loaded: Dict[str, int] = {}
+        lock = threading.Lock()
+
+        def load(flat: Dict[str, Dict[str, List[Any]]]) -> int:
+            for name, columns in flat.items():
+                if not columns["_id" if name == schema.root.name else PARENT_ID_COLUMN]:
+                    continue
+                rows = _load_columns(engine, metadata.tables[name], columns)
+                with lock:
+                    loaded[name] = loaded.get(name, 0) + rows
+            return len(flat[schema.root.name]["_id"])
+
+        batches = (schema.flatten(documents)
+                   for documents in iter_document_batches(source_collection, schema.projection(), batch_size))
+        result.rows = run_batches(batches, load, workers, check_cancelled)
+        schema.report_mismatches()
+        for name, rows in loaded.items():
+            if name != schema.root.name:
+                logger.info(f"{collection}: {rows} filas en la tabla hija {name}")
+    except JobCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Error migrando la colección {collection}: {e}")
+        result.error = str(e)
+    result.seconds = time.perf_counter() - start
+    logger.info(f"Migración MongoDB -> {target_type} {result.summary()}")
+    return result
+
+
+def migrate_mongo_to_relational(
+    source: DatabaseConfig,
+    target: DatabaseConfig,
+    target_type: str = "postgres",
+    collections: Optional[List[str]] = None,
+    workers: int = MIGRATION_WORKERS,
+    batch_size: int = MONGO_BATCH_SIZE,
+    sample_size: int = MONGO_SCHEMA_SAMPLE,
+    on_table_done: Optional[Callable[[TableMigrationResult], None]] = None,
+    check_cancelled: CancelCheck = None
+) -> List[TableMigrationResult]:
+    """Migrar varias colecciones (o toda la base de datos si `collections` es None)"""
+    if target_type not in RELATIONAL_TARGETS:
+        raise ValueError(f"Destino relacional no soportado: {target_type}")
+    if not collections:
+        collections = DatabaseManager.create_mongo_client(source)[source.database].list_collection_names()
+    workers = _table_workers(workers)
+    logger.info(f"Migrando {len(collections)} colecciones de MongoDB a {target_type} con {workers} workers")
+    return _migrate_tables(
+        collections,
+        lambda collection: migrate_collection_to_relational(
+            source, target, collection, target_type, batch_size, sample_size=sample_size,
+            check_cancelled=check_cancelled),
+        workers,
+        on_table_done,
+        check_cancelled
+    )
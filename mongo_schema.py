@@ -0,0 +1,253 @@
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from bson import Binary, Decimal128, ObjectId
+from sqlalchemy import Column, MetaData, Table
+from sqlalchemy import types as sqltypes
+
+from config import MONGO_FLATTEN_SEPARATOR, MONGO_SCHEMA_SAMPLE
+
+logger = logging.getLogger(__name__)
+
+PARENT_ID_COLUMN = "_parent_id"
+INDEX_COLUMN = "_index"
+VALUE_COLUMN = "value"
+
+
+def _to_text(value: Any) -> Any:
+    """Valor de una columna de tipos mezclados: documentos y arrays como JSON"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str, ensure_ascii=False)
+    return str(value)
+
+
+def _scalar(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return value.to_decimal()
+    if isinstance(value, Binary) and value.subtype in (3, 4):
+        return str(value.as_uuid(value.subtype))
+    return value
+
+
+def _kind(value: Any) -> str:
+    """Clase de un valor a efectos de elegir el tipo SQL"""
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, Decimal128):
+        return "decimal"
+    if isinstance(value, datetime):
+        return "datetime"
+    if isinstance(value, ObjectId):
+        return "objectid"
+    if isinstance(value, Binary) and value.subtype in (3, 4):
+        return "uuid"
+    if isinstance(value, bytes):
+        return "binary"
+    if isinstance(value, str):
+        return "str"
+    return "other"
+
+
+def _sql_type(kinds: Set[str]) -> Tuple[sqltypes.TypeEngine, Optional[Set[str]], Callable[[Any], Any]]:
+    """Tipo SQL, clases de valor admitidas (None = todas) y conversión para las clases observadas"""
+    if kinds == {"bool"}:
+        return sqltypes.Boolean(), kinds, _scalar
+    if kinds == {"int"}:
+        return sqltypes.BigInteger(), kinds, _scalar
+    if kinds and kinds <= {"int", "float"}:
+        return sqltypes.Float(), {"int", "float"}, _scalar
+    if kinds and kinds <= {"int", "decimal"}:
+        return sqltypes.Numeric(38, 10), {"int", "decimal"}, _scalar
+    if kinds == {"datetime"}:
+        return sqltypes.DateTime(), kinds, _scalar
+    if kinds == {"objectid"}:
+        return sqltypes.String(24), kinds, _scalar
+    if kinds == {"uuid"}:
+        return sqltypes.String(36), kinds, _scalar
+    if kinds == {"binary"}:
+        return sqltypes.LargeBinary(), kinds, bytes
+    # Textos y mezclas: todo se guarda como texto
+    return sqltypes.UnicodeText(), None, lambda value: _to_text(_scalar(value))
+
+
+@dataclass
+class FlatTable:
+    """Tabla relacional que resulta de aplanar la colección o uno de sus arrays.
+
+    `path` es la ruta del array en el documento (None en la tabla principal);
+    `fields` asigna a cada columna la ruta con puntos relativa a la fila.
+    """
+    name: str
+    path: Optional[str] = None
+    fields: Dict[str, str] = field(default_factory=dict)
+    kinds: Dict[str, Set[str]] = field(default_factory=dict)
+    types: Dict[str, Tuple] = field(default_factory=dict, repr=False)
+    mismatches: Dict[str, int] = field(default_factory=dict)
+
+    def observe(self, path: str, value: Any, separator: str):
+        column = path.replace(".", separator)
+        self.fields.setdefault(column, path)
+        kinds = self.kinds.setdefault(column, set())
+        if value is not None:
+            kinds.add(_kind(value))
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.fields)
+
+    def resolve(self):
+        self.types = {column: _sql_type(self.kinds[column]) for column in self.fields}
+
+    def sql_table(self, metadata: MetaData) -> Table:
+        return Table(self.name, metadata, *[
+            Column(column, sql_type, nullable=True) for column, (sql_type, _, _) in self.types.items()
+        ])
+
+    def convert(self, column: str, value: Any) -> Any:
+        """Valor listo para la columna; los de una clase no vista en la muestra quedan en NULL"""
+        if value is None:
+            return None
+        _, allowed, converter = self.types[column]
+        if allowed is not None and _kind(value) not in allowed:
+            self.mismatches[column] = self.mismatches.get(column, 0) + 1
+            return None
+        return converter(value)
+
+
+class FlatSchema:
+    """Esquema relacional de una colección: tabla principal y una tabla hija por array.
+
+    Los documentos anidados se aplanan en columnas con la ruta unida por
+    `separator` (`address.city` -> `address_city`). Cada array de la tabla
+    principal se convierte en una tabla `<colección>_<ruta>` con el `_id`
+    del documento (`_parent_id`), la posición (`_index`) y los campos del
+    elemento (o `value` si son escalares). Los arrays dentro de elementos de
+    otro array se guardan como JSON.
+    """
+
+    def __init__(self, collection: str, separator: str = MONGO_FLATTEN_SEPARATOR):
+        self.collection = collection
+        self.separator = separator
+        self.root = FlatTable(collection)
+        self.children: Dict[str, FlatTable] = {}
+        self.sampled = 0
+
+    @property
+    def tables(self) -> List[FlatTable]:
+        return [self.root] + list(self.children.values())
+
+    def projection(self) -> Dict[str, int]:
+        """Campos de primer nivel descubiertos; los demás no se leen"""
+        paths = list(self.root.fields.values()) + list(self.children)
+        return {path.split(".")[0]: 1 for path in paths}
+
+    # Descubrimiento
+
+    def observe(self, document: Dict[str, Any]):
+        self.sampled += 1
+        self._walk(self.root, document, "", nested=False)
+
+    def _walk(self, table: FlatTable, document: Dict[str, Any], prefix: str, nested: bool):
+        for key, value in document.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, dict) and value:
+                self._walk(table, value, f"{path}.", nested)
+            elif isinstance(value, list) and not nested:
+                child = self._child(path)
+                for item in value:
+                    if isinstance(item, dict):
+                        self._walk(child, item, "", nested=True)
+                    else:
+                        child.observe(VALUE_COLUMN, item, self.separator)
+            else:
+                table.observe(path, value, self.separator)
+
+    def _child(self, path: str) -> FlatTable:
+        if path not in self.children:
+            name = self.separator.join([self.collection] + path.split("."))
+            child = FlatTable(name, path)
+            child.observe(PARENT_ID_COLUMN, None, self.separator)
+            child.observe(INDEX_COLUMN, 0, self.separator)
+            self.children[path] = child
+        return self.children[path]
+
+    def resolve(self):
+        """Elegir el tipo de cada columna a partir de las clases de valor observadas"""
+        for child in self.children.values():
+            child.kinds[PARENT_ID_COLUMN] = set(self.root.kinds.get("_id", set()))
+        for table in self.tables:
+            table.resolve()
+
+    def metadata(self) -> MetaData:
+        """Tablas de SQLAlchemy con los tipos resueltos"""
+        metadata = MetaData()
+        for table in self.tables:
+            table.sql_table(metadata)
+        return metadata
+
+    def report_mismatches(self):
+        for table in self.tables:
+            for column, count in table.mismatches.items():
+                logger.warning(f"{table.name}.{column}: {count} valores de un tipo no visto en la muestra "
+                               f"se guardaron como NULL")
+
+    # Aplanado
+
+    def flatten(self, documents: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, List[Any]]]:
+        """Aplanar un lote de documentos en columnas por tabla ({tabla: {columna: valores}})"""
+        output = {table.name: {column: [] for column in table.columns} for table in self.tables}
+        for document in documents:
+            self._append(self.root, output[self.root.name], self._values(document, self.root))
+            parent_id = document.get("_id")
+            for path, child in self.children.items():
+                items = _get(document, path)
+                if not isinstance(items, list):
+                    continue
+                columns = output[child.name]
+                for index, item in enumerate(items):
+                    values = self._values(item, child) if isinstance(item, dict) else {VALUE_COLUMN: item}
+                    values[PARENT_ID_COLUMN], values[INDEX_COLUMN] = parent_id, index
+                    self._append(child, columns, values)
+        return output
+
+    def _values(self, document: Dict[str, Any], table: FlatTable) -> Dict[str, Any]:
+        return {column: _get(document, path) for column, path in table.fields.items()}
+
+    @staticmethod
+    def _append(table: FlatTable, columns: Dict[str, List[Any]], values: Dict[str, Any]):
+        for column, target in columns.items():
+            target.append(table.convert(column, values.get(column)))
+
+
+def _get(document: Dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def discover_schema(collection, sample_size: int = MONGO_SCHEMA_SAMPLE,
+                    separator: str = MONGO_FLATTEN_SEPARATOR) -> FlatSchema:
+    """Descubrir el esquema aplanado con una muestra aleatoria ($sample).
+
+    $sample no recorre la colección completa, así que el coste no depende de
+    su tamaño. Los campos que no aparecen en la muestra no se migran.
+    """
+    schema = FlatSchema(collection.name, separator)
+    for document in collection.aggregate([{"$sample": {"size": sample_size}}], allowDiskUse=True):
+        schema.observe(document)
+    schema.resolve()
+    logger.info(f"Esquema de {collection.name}: {len(schema.root.fields)} columnas y "
+                f"{len(schema.children)} tablas hijas a partir de {schema.sampled} documentos")
+    return schema
@@ -0,0 +1,258 @@
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import column, func, inspect, select, table, text
+from sqlalchemy import types as sqltypes
+
+from columnar import write_chunks
+from config import ANALYTICS_CHUNK_SIZE, PARTITION_COUNT, PARTITION_SAMPLE_PERCENT, PARTITION_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class KeyRange:
+    """Rango [lower, upper) de la columna de partición; el último incluye upper.
+
+    Un rango con lower y upper en None representa las filas con clave NULL.
+    """
+    lower: Any = None
+    upper: Any = None
+    include_upper: bool = False
+
+    @property
+    def is_null(self) -> bool:
+        return self.lower is None and self.upper is None
+
+    def condition(self, key):
+        if self.is_null:
+            return key.is_(None)
+        upper = key <= self.upper if self.include_upper else key < self.upper
+        return (key >= self.lower) & upper
+
+
+def _is_partitionable(sql_type) -> bool:
+    return (isinstance(sql_type, (sqltypes.Integer, sqltypes.Numeric, sqltypes.Date, sqltypes.DateTime))
+            and not isinstance(sql_type, sqltypes.Boolean))
+
+
+def choose_partition_column(engine, table_name: str) -> str:
+    """Elegir la clave primaria o la primera columna indexada numérica/fecha"""
+    inspector = inspect(engine)
+    types = {col["name"]: col["type"] for col in inspector.get_columns(table_name)}
+
+    primary_key = inspector.get_pk_constraint(table_name).get("constrained_columns") or []
+    candidates = primary_key[:1]
+    candidates += [index["column_names"][0] for index in inspector.get_indexes(table_name)
+                   if index.get("column_names") and index["column_names"][0]]
+    for name in candidates:
+        if _is_partitionable(types.get(name)):
+            return name
+    raise ValueError(f"La tabla {table_name} no tiene una clave o índice numérico/fecha para particionar")
+
+
+def _split_evenly(lower, upper, partitions: int) -> List[Any]:
+    """Dividir [lower, upper] en `partitions` tramos del mismo ancho"""
+    if isinstance(lower, (int, np.integer)) and isinstance(upper, (int, np.integer)):
+        return sorted({int(b) for b in np.linspace(int(lower), int(upper), partitions + 1).round()})
+    if isinstance(lower, (float, np.floating)) or hasattr(lower, "as_tuple"):  # float o Decimal
+        return list(np.unique(np.linspace(float(lower), float(upper), partitions + 1)))
+    start, end = pd.Timestamp(lower), pd.Timestamp(upper)
+    bounds = [start + (end - start) * (i / partitions) for i in range(partitions + 1)]
+    return sorted({b.to_pydatetime() for b in bounds})
+
+
+class PartitionedReader:
+    """Lectura paralela de una tabla dividida en rangos de una columna clave.
+
+    Los límites salen de MIN/MAX (`method="minmax"`) o de cuantiles sobre
+    una muestra TABLESAMPLE (`method="quantile"`), que reparte mejor las
+    filas cuando la clave está sesgada. Cada rango se lee con su propia
+    conexión y cursor del lado del servidor.
+    """
+
+    def __init__(
+        self,
+        engine,
+        table_name: str,
+        partition_column: Optional[str] = None,
+        partitions: int = PARTITION_COUNT,
+        workers: int = PARTITION_WORKERS,
+        method: str = "minmax",
+        chunksize: int = ANALYTICS_CHUNK_SIZE
+    ):
+        self.engine = engine
+        self.table_name = table_name
+        self.partition_column = partition_column or choose_partition_column(engine, table_name)
+        self.partitions = max(1, partitions)
+        self.workers = max(1, workers)
+        self.method = method
+        self.chunksize = chunksize
+
+        columns = inspect(engine).get_columns(table_name)
+        self._nullable = any(col["name"] == self.partition_column and col.get("nullable", True)
+                             for col in columns)
+        self._source = table(table_name, *[column(col["name"]) for col in columns])
+        self._ranges: Optional[List[KeyRange]] = None
+
+    @property
+    def key(self):
+        return self._source.c[self.partition_column]
+
+    def _sample_bounds(self) -> Optional[List[Any]]:
+        preparer = self.engine.dialect.identifier_preparer
+        name, key = preparer.quote(self.table_name), preparer.quote(self.partition_column)
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            query = f"SELECT {key} FROM {name} TABLESAMPLE SYSTEM ({PARTITION_SAMPLE_PERCENT}) WHERE {key} IS NOT NULL"
+        elif dialect == "mssql":
+            query = f"SELECT {key} FROM {name} TABLESAMPLE ({PARTITION_SAMPLE_PERCENT} PERCENT) WHERE {key} IS NOT NULL"
+        else:
+            logger.warning(f"TABLESAMPLE no soportado en {dialect}; usando MIN/MAX")
+            return None
+
+        with self.engine.connect() as connection:
+            sample = pd.Series([row[0] for row in connection.execute(text(query))])
+        if len(sample) < self.partitions:
+            return None
+        quantiles = sample.quantile(np.linspace(0, 1, self.partitions + 1), interpolation="nearest")
+        return sorted(set(quantiles.tolist()))
+
+    def ranges(self) -> List[KeyRange]:
+        """Calcular (una vez) los rangos de la partición"""
+        if self._ranges is not None:
+            return self._ranges
+
+        with self.engine.connect() as connection:
+            lower, upper = connection.execute(
+                select(func.min(self.key), func.max(self.key)).select_from(self._source)
+            ).one()
+
+        ranges: List[KeyRange] = []
+        if lower is not None:
+            bounds = self._sample_bounds() if self.method == "quantile" else None
+            if bounds:
+                # La muestra no contiene necesariamente los extremos reales
+                bounds[0], bounds[-1] = lower, upper
+            else:
+                bounds = _split_evenly(lower, upper, self.partitions)
+            if len(bounds) == 1:
+                bounds = bounds * 2
+            ranges = [KeyRange(bounds[i], bounds[i + 1], include_upper=i == len(bounds) - 2)
+                      for i in range(len(bounds) - 1)]
+        if self._nullable:
+            ranges.append(KeyRange())
+
+        self._ranges = ranges
+        logger.info(f"{self.table_name}: {len(ranges)} particiones por {self.partition_column}")
+        return ranges
+
+    def read_partition(self, key_range: KeyRange) -> Iterator[pd.DataFrame]:
+        """Leer un rango por bloques con una conexión propia"""
+        query = select(self._source).where(key_range.condition(self.key))
+        with self.engine.connect().execution_options(stream_results=True) as connection:
+            yield from pd.read_sql(query, connection, chunksize=self.chunksize)
+
+    def map_partitions(
+        self,
+        fn: Callable[[KeyRange, Iterator[pd.DataFrame]], Any],
+        check_cancelled: Optional[Callable[[], None]] = None
+    ) -> List[Any]:
+        """Aplicar `fn(rango, bloques)` a cada partición en paralelo (p. ej. escribir un fragmento).
+
+        `check_cancelled` se llama antes de cada bloque leído; si lanza una
+        excepción, las particiones que aún no empezaron se descartan.
+        """
+        def chunks(key_range: KeyRange) -> Iterator[pd.DataFrame]:
+            for chunk in self.read_partition(key_range):
+                if check_cancelled is not None:
+                    check_cancelled()
+                yield chunk
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="partition") as executor:
+            futures = [executor.submit(lambda r: fn(r, chunks(r)), key_range) for key_range in self.ranges()]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """Reensamblar las particiones en un único flujo de bloques (sin orden garantizado).
+
+        La cola está acotada, así que los lectores se frenan si el consumidor
+        es más lento y la memoria queda limitada a unos pocos bloques.
+        """
+        chunks: "queue.Queue" = queue.Queue(maxsize=self.workers * 2)
+        finished = object()
+        stop = threading.Event()
+
+        def produce(key_range: KeyRange):
+            try:
+                for chunk in self.read_partition(key_range):
+                    if stop.is_set():
+                        return
+                    chunks.put(chunk)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                chunks.put(finished)
+
+        ranges = self.ranges()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="partition")
+        futures = [executor.submit(produce, key_range) for key_range in ranges]
+        try:
+            remaining = len(futures)
+            while remaining:
+                item = chunks.get()
+                if item is finished:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+            # Vaciar la cola para que ningún lector quede bloqueado en put()
+            while not all(future.done() for future in futures):
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            executor.shutdown(wait=True)
+
+
+def export_table_shards(
+    engine,
+    table_name: str,
+    directory: str,
+    partitions: int = PARTITION_COUNT,
+    workers: int = PARTITION_WORKERS,
+    method: str = "minmax",
+    extension: str = "csv"
+) -> List[str]:
+    """Exportar una tabla como fragmentos independientes, uno por partición.
+
+    `extension` elige el formato: "csv", "parquet" o "feather".
+    """
+    os.makedirs(directory, exist_ok=True)
+    reader = PartitionedReader(engine, table_name, partitions=partitions, workers=workers, method=method)
+    positions = {id(key_range): i for i, key_range in enumerate(reader.ranges())}
+
+    def write_shard(key_range: KeyRange, chunks: Iterator[pd.DataFrame]) -> str:
+        index = positions[id(key_range)]
+        path = os.path.join(directory, f"{table_name}.part{index:03d}.{extension}")
+        write_chunks(chunks, path)
+        return path
+
+    paths = reader.map_partitions(write_shard)
+    logger.info(f"Exportación de {table_name}: {len(paths)} fragmentos en {directory}")
+    return paths
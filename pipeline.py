@@ -0,0 +1,259 @@
+import ast
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import PIPELINE_PREVIEW_ROWS
+from read_plan import ReadPlan, parse_filter
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_VERSION = 1
+
+
+@dataclass
+class Step:
+    """Paso de transformación serializable: operación y parámetros"""
+    op: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        args = ", ".join(f"{key}={value!r}" for key, value in self.params.items() if value is not None)
+        return f"{self.op}({args})"
+
+
+def _rename(df: pd.DataFrame, params: Dict[str, Any], state: Dict) -> pd.DataFrame:
+    return df.rename(columns=params["columns"])
+
+
+def _drop(df: pd.DataFrame, params: Dict[str, Any], state: Dict) -> pd.DataFrame:
+    # errors="ignore": la columna puede no haberse leído gracias a la proyección
+    return df.drop(columns=params["columns"], errors="ignore")
+
+
+def _filter(df: pd.DataFrame, params: Dict[str, Any], state: Dict) -> pd.DataFrame:
+    return df[ReadPlan(filters=parse_filter(params["expression"])).mask(df)]
+
+
+def _dropna(df: pd.DataFrame, params: Dict[str, Any], state: Dict) -> pd.DataFrame:
+    return df.dropna(subset=params.get("subset"))
+
+
+def _fillna(df: pd.DataFrame, params: Dict[str, Any], state: Dict) -> pd.DataFrame:
+    columns = params.get("columns") or list(df.columns)
+    df = df.copy()
+    for col in columns:
+        if col not in df:
+            continue
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype) and params["value"] not in series.cat.categories:
+            series = series.cat.add_categories([params["value"]])
+        df[col] = series.fillna(params["value"])
+    return df
+
+
+def _dedupe(df: pd.DataFrame, params: Dict[str, Any], state: Dict) -> pd.DataFrame:
+    """Quitar duplicados también entre bloques: se recuerdan los hashes ya vistos.
+
+    El conjunto de hashes persiste entre bloques y solo se consultan y
+    añaden los del bloque actual, así que el coste es lineal en las filas.
+    La memoria no está acotada: unos 70 bytes por fila distinta (unos
+    700 MB con 10 millones). Un `subset` con la clave no reduce las
+    entradas, pero sí el trabajo de hashing por bloque.
+    """
+    subset = params.get("subset") or list(df.columns)
+    seen = state.setdefault("seen", set())
+    hashes = pd.util.hash_pandas_object(df[subset], index=False)
+    unseen = np.fromiter((value not in seen for value in hashes.tolist()), dtype=bool, count=len(hashes))
+    keep = ~hashes.duplicated().to_numpy() & unseen
+    seen.update(hashes[keep].tolist())
+    return df[keep]
+
+
+def _cast(df: pd.DataFrame, params: Dict[str, Any], state: Dict) -> pd.DataFrame:
+    column, dtype = params["column"], params["dtype"]
+    df = df.copy()
+    if dtype == "datetime":
+        df[column] = pd.to_datetime(df[column], errors="coerce")
+    elif dtype in ("int", "integer"):
+        df[column] = pd.to_numeric(df[column], errors="coerce").round().astype("Int64")
+    elif dtype in ("float", "number"):
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    elif dtype in ("str", "string", "text"):
+        df[column] = df[column].astype("string")
+    else:
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def _derive(df: pd.DataFrame, params: Dict[str, Any], state: Dict) -> pd.DataFrame:
+    df = df.copy()
+    df[params["name"]] = df.eval(params["expression"])
+    return df
+
+
+OPERATIONS: Dict[str, Callable[[pd.DataFrame, Dict[str, Any], Dict], pd.DataFrame]] = {
+    "rename": _rename,
+    "drop": _drop,
+    "filter": _filter,
+    "dropna": _dropna,
+    "fillna": _fillna,
+    "dedupe": _dedupe,
+    "cast": _cast,
+    "derive": _derive,
+}
+
+
+def _expression_columns(expression: str) -> List[str]:
+    return [node.id for node in ast.walk(ast.parse(expression, mode="eval")) if isinstance(node, ast.Name)]
+
+
+class Pipeline:
+    """Transformaciones registradas como pasos y evaluadas de forma perezosa.
+
+    Los pasos no tocan los datos al añadirse: se aplican sobre una muestra
+    para la vista previa y, al exportar, en una sola pasada por bloque
+    sobre los datos completos. Las columnas y filtros iniciales se empujan
+    a la lectura de la fuente (ver `read_plan`).
+    """
+
+    def __init__(self, steps: Optional[Sequence[Step]] = None):
+        self.steps: List[Step] = list(steps or [])
+
+    def add(self, op: str, **params) -> "Pipeline":
+        if op not in OPERATIONS:
+            raise ValueError(f"Operación desconocida: {op}")
+        if op == "filter":
+            parse_filter(params["expression"])  # validar antes de registrar
+        elif op == "derive":
+            _expression_columns(params["expression"])
+        self.steps.append(Step(op, {key: value for key, value in params.items() if value is not None}))
+        return self
+
+    def rename(self, columns: Dict[str, str]) -> "Pipeline":
+        return self.add("rename", columns=dict(columns))
+
+    def drop(self, columns: Sequence[str]) -> "Pipeline":
+        return self.add("drop", columns=list(columns))
+
+    def filter(self, expression: str) -> "Pipeline":
+        return self.add("filter", expression=expression)
+
+    def dropna(self, subset: Optional[Sequence[str]] = None) -> "Pipeline":
+        return self.add("dropna", subset=list(subset) if subset else None)
+
+    def fillna(self, value: Any, columns: Optional[Sequence[str]] = None) -> "Pipeline":
+        return self.add("fillna", value=value, columns=list(columns) if columns else None)
+
+    def dedupe(self, subset: Optional[Sequence[str]] = None) -> "Pipeline":
+        return self.add("dedupe", subset=list(subset) if subset else None)
+
+    def cast(self, column: str, dtype: str) -> "Pipeline":
+        return self.add("cast", column=column, dtype=dtype)
+
+    def derive(self, name: str, expression: str) -> "Pipeline":
+        return self.add("derive", name=name, expression=expression)
+
+    def undo(self) -> Optional[Step]:
+        return self.steps.pop() if self.steps else None
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    # Ejecución
+
+    def apply(self, df: pd.DataFrame, state: Optional[Dict[int, Dict]] = None) -> pd.DataFrame:
+        """Aplicar todos los pasos a un bloque"""
+        state = {} if state is None else state
+        for i, step in enumerate(self.steps):
+            df = OPERATIONS[step.op](df, step.params, state.setdefault(i, {}))
+        return df
+
+    def preview(self, df: pd.DataFrame, rows: int = PIPELINE_PREVIEW_ROWS) -> pd.DataFrame:
+        """Resultado sobre una muestra, para dar respuesta inmediata en la interfaz.
+
+        Sin pasos no hay nada que recalcular: se retorna el DataFrame
+        completo (sin copiarlo) para que la vista previa pueda recorrerlo.
+        """
+        if not self.steps:
+            return df
+        return self.apply(df.head(rows))
+
+    def run(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Aplicar los pasos bloque a bloque; el estado (p. ej. duplicados vistos) se comparte"""
+        state: Dict[int, Dict] = {}
+        for chunk in chunks:
+            yield self.apply(chunk, state)
+
+    # Empuje a la lectura
+
+    def read_plan(self, source_columns: Sequence[str]) -> ReadPlan:
+        """Columnas de la fuente que hacen falta y filtros iniciales que se pueden empujar.
+
+        Se sigue el nombre de cada columna a través de los renombrados; los
+        pasos que dependen de todas las columnas (dropna/dedupe sin subset)
+        las conservan todas.
+        """
+        current: Dict[str, Optional[str]] = {col: col for col in source_columns}
+        required = set()
+        pushed: List = []
+        leading = True
+
+        def need(names: Iterable[str]):
+            for name in names:
+                if current.get(name):
+                    required.add(current[name])
+
+        for step in self.steps:
+            params = step.params
+            if step.op == "rename":
+                current = {params["columns"].get(name, name): source for name, source in current.items()}
+            elif step.op == "drop":
+                for name in params["columns"]:
+                    current.pop(name, None)
+            elif step.op == "filter":
+                filters = parse_filter(params["expression"])
+                need(col for col, _, _ in filters)
+                if leading and all(current.get(col) for col, _, _ in filters):
+                    pushed += [(current[col], op, value) for col, op, value in filters]
+            elif step.op in ("dropna", "dedupe"):
+                need(params.get("subset") or list(current))
+            elif step.op == "derive":
+                need(_expression_columns(params["expression"]))
+                current[params["name"]] = None
+            if step.op not in ("rename", "drop", "filter"):
+                leading = False
+        need(current)
+        return ReadPlan(columns=[col for col in source_columns if col in required], filters=pushed)
+
+    # Persistencia
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": PIPELINE_VERSION, "steps": [asdict(step) for step in self.steps]}
+
+    def fingerprint(self) -> str:
+        """Huella corta de los pasos: cambia si cambia cualquier paso o parámetro"""
+        data = json.dumps(self.to_dict(), sort_keys=True, default=str)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()[:12]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Pipeline":
+        pipeline = cls()
+        for step in data.get("steps", []):
+            pipeline.add(step["op"], **step.get("params", {}))
+        return pipeline
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        logger.info(f"Pipeline guardado en {path} ({len(self.steps)} pasos)")
+
+    @classmethod
+    def load(cls, path: str) -> "Pipeline":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
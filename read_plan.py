@@ -0,0 +1,180 @@
+import ast
+import operator
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import and_, select
+
+# (columna, operador, valor); los filtros de un plan se combinan con AND
+Filter = Tuple[str, str, Any]
+
+_COMPARISONS = {
+    "==": operator.eq, "!=": operator.ne, "<": operator.lt,
+    "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+_MONGO_OPERATORS = {
+    "==": "$eq", "!=": "$ne", "<": "$lt", "<=": "$lte", ">": "$gt", ">=": "$gte",
+    "in": "$in", "not in": "$nin",
+}
+_AST_OPERATORS = {
+    ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=",
+    ast.In: "in", ast.NotIn: "not in",
+}
+_FLIPPED = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "==": "==", "!=": "!="}
+
+
+def _literal(node: ast.AST) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise ValueError(f"Se esperaba un valor literal: {ast.unparse(node)}")
+
+
+def parse_filter(expression: str) -> List[Filter]:
+    """Convertir una expresión como `year >= 2015 and fuel in ['Diesel', 'CNG']` en filtros.
+
+    Solo se aceptan comparaciones columna-literal unidas con `and`, para que
+    el filtro pueda traducirse a WHERE, a un documento de MongoDB o a un
+    filtro de Parquet. `col == None` y `col != None` comprueban nulos.
+    """
+    tree = ast.parse(expression.strip(), mode="eval").body
+    terms = tree.values if isinstance(tree, ast.BoolOp) and isinstance(tree.op, ast.And) else [tree]
+
+    filters: List[Filter] = []
+    for term in terms:
+        if not isinstance(term, ast.Compare) or len(term.ops) != 1:
+            raise ValueError(f"Condición no soportada: {ast.unparse(term)}")
+        op = _AST_OPERATORS.get(type(term.ops[0]))
+        if op is None:
+            raise ValueError(f"Operador no soportado: {ast.unparse(term)}")
+        left, right = term.left, term.comparators[0]
+        if not isinstance(left, ast.Name):
+            if not isinstance(right, ast.Name) or op in ("in", "not in"):
+                raise ValueError(f"Cada condición debe comparar una columna con un valor: {ast.unparse(term)}")
+            left, right, op = right, left, _FLIPPED[op]
+
+        value = _literal(right)
+        if value is None and op in ("==", "!="):
+            op = "is null" if op == "==" else "not null"
+        elif op in ("in", "not in"):
+            value = list(value)
+        filters.append((left.id, op, value))
+    return filters
+
+
+@dataclass
+class ReadPlan:
+    """Proyección y filtro que se empujan a la lectura de la fuente.
+
+    `columns` limita las columnas (None = todas) y `excluded` quita
+    columnas concretas; los filtros se aplican en la fuente siempre que
+    el formato lo permite y, si no, bloque a bloque tras leer.
+    """
+    columns: Optional[List[str]] = None
+    excluded: List[str] = field(default_factory=list)
+    filters: List[Filter] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.columns is None and not self.excluded and not self.filters
+
+    def select(self, columns: Optional[Sequence[str]]) -> "ReadPlan":
+        self.columns = list(columns) if columns else None
+        return self
+
+    def exclude(self, column: str) -> "ReadPlan":
+        if column not in self.excluded:
+            self.excluded.append(column)
+        return self
+
+    def add_filter(self, expression: str) -> "ReadPlan":
+        self.filters.extend(parse_filter(expression))
+        return self
+
+    def output_columns(self, available: Sequence[str]) -> List[str]:
+        """Columnas que debe contener el resultado, en el orden de la fuente"""
+        wanted = set(self.columns) if self.columns is not None else set(available)
+        return [col for col in available if col in wanted and col not in self.excluded]
+
+    def read_columns(self, available: Sequence[str]) -> List[str]:
+        """Columnas a leer: las de salida más las que solo usa el filtro"""
+        output = set(self.output_columns(available))
+        filtered = {col for col, _, _ in self.filters}
+        return [col for col in available if col in output or col in filtered]
+
+    # pandas
+
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        mask = pd.Series(True, index=df.index)
+        for col, op, value in self.filters:
+            series = df[col]
+            if op == "is null":
+                mask &= series.isna()
+            elif op == "not null":
+                mask &= series.notna()
+            elif op == "in":
+                mask &= series.isin(value)
+            elif op == "not in":
+                mask &= ~series.isin(value)
+            else:
+                mask &= _COMPARISONS[op](series, value).fillna(False).astype(bool)
+        return mask
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Aplicar el plan a un bloque ya leído (fuentes sin filtro nativo)"""
+        if self.filters:
+            df = df[self.mask(df)]
+        return df[self.output_columns(list(df.columns))]
+
+    # SQL
+
+    def sql_query(self, source):
+        """SELECT columnas FROM tabla WHERE filtros sobre una tabla de SQLAlchemy"""
+        columns = self.output_columns([col.name for col in source.c])
+        query = select(*[source.c[col] for col in columns])
+        conditions = []
+        for col, op, value in self.filters:
+            column = source.c[col]
+            if op == "is null":
+                conditions.append(column.is_(None))
+            elif op == "not null":
+                conditions.append(column.is_not(None))
+            elif op == "in":
+                conditions.append(column.in_(value))
+            elif op == "not in":
+                conditions.append(column.not_in(value))
+            else:
+                conditions.append(_COMPARISONS[op](column, value))
+        return query.where(and_(*conditions)) if conditions else query
+
+    # MongoDB
+
+    def mongo_filter(self) -> Dict[str, Any]:
+        query: Dict[str, Dict[str, Any]] = {}
+        for col, op, value in self.filters:
+            if op == "is null":
+                query.setdefault(col, {})["$eq"] = None
+            elif op == "not null":
+                query.setdefault(col, {})["$ne"] = None
+            else:
+                query.setdefault(col, {})[_MONGO_OPERATORS[op]] = value
+        return query
+
+    def mongo_projection(self) -> Optional[Dict[str, int]]:
+        if self.columns is not None:
+            return {col: 1 for col in self.columns if col not in self.excluded}
+        if self.excluded:
+            return {col: 0 for col in self.excluded}
+        return None
+
+    # Parquet / Arrow
+
+    def arrow_filters(self) -> Optional[List[Tuple[str, str, Any]]]:
+        """Filtros en el formato de pyarrow.parquet (los nulos se resuelven tras leer)"""
+        filters = [f for f in self.filters if f[1] not in ("is null", "not null")]
+        return filters or None
+
+    @property
+    def has_null_filters(self) -> bool:
+        return any(op in ("is null", "not null") for _, op, _ in self.filters)
@@ -0,0 +1,217 @@
+import logging
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import types as sqltypes
+
+from config import CATEGORY_MAX_RATIO, SCHEMA_SAMPLE_ROWS
+
+logger = logging.getLogger(__name__)
+
+# Enteros con nulos: se usan los tipos nullable de pandas para que un NA en
+# un bloque posterior no invalide el dtype elegido con la muestra
+_INT_TYPES = [("Int8", np.int8), ("Int16", np.int16), ("Int32", np.int32), ("Int64", np.int64)]
+
+# Tipos con los que se lee cuando la muestra no cubre el archivo: admiten
+# cualquier entero, NA en booleanos y la precisión completa de los reales
+_WIDE_TYPES = {"Int8": "Int64", "Int16": "Int64", "Int32": "Int64", "float32": "float64", "bool": "boolean"}
+
+_POSTGRES_TYPES = {
+    "Int8": "SMALLINT", "Int16": "SMALLINT", "Int32": "INTEGER", "Int64": "BIGINT",
+    "float32": "REAL", "float64": "DOUBLE PRECISION", "bool": "BOOLEAN", "boolean": "BOOLEAN",
+    "datetime64[ns]": "TIMESTAMP",
+}
+_SQLSERVER_TYPES = {
+    # TINYINT de SQL Server no admite negativos, por eso Int8 -> SMALLINT
+    "Int8": "SMALLINT", "Int16": "SMALLINT", "Int32": "INT", "Int64": "BIGINT",
+    "float32": "REAL", "float64": "FLOAT", "bool": "BIT", "boolean": "BIT",
+    "datetime64[ns]": "DATETIME2",
+}
+_SQLALCHEMY_TYPES = {
+    "Int8": sqltypes.SmallInteger, "Int16": sqltypes.SmallInteger, "Int32": sqltypes.Integer,
+    "Int64": sqltypes.BigInteger, "float32": sqltypes.REAL, "float64": sqltypes.Float,
+    "bool": sqltypes.Boolean, "boolean": sqltypes.Boolean, "datetime64[ns]": sqltypes.DateTime,
+}
+
+
+@dataclass
+class InferredSchema:
+    """Tipos compactos deducidos de una muestra del archivo.
+
+    Si la muestra es todo el archivo (`exhaustive`), los tipos estrechos se
+    aplican al leer. Si no, se lee con los tipos anchos equivalentes y cada
+    bloque se estrecha con `downcast` solo cuando sus valores caben: un
+    valor mayor, un NA o un real más largo que los de la muestra nunca se
+    trunca ni interrumpe la lectura.
+    """
+    dtypes: Dict[str, str] = field(default_factory=dict)
+    parse_dates: List[str] = field(default_factory=list)
+    max_lengths: Dict[str, int] = field(default_factory=dict)
+    exhaustive: bool = True
+
+    def read_kwargs(self) -> Dict[str, Any]:
+        """Argumentos para pd.read_csv que aplican los tipos al leer"""
+        kwargs: Dict[str, Any] = {"dtype": {name: self.storage_type(name) for name in self.dtypes}}
+        if self.parse_dates:
+            kwargs["parse_dates"] = list(self.parse_dates)
+        return kwargs
+
+    def column_type(self, name: str) -> str:
+        """Tipo más estrecho observado en la muestra"""
+        return "datetime64[ns]" if name in self.parse_dates else self.dtypes.get(name, "object")
+
+    def storage_type(self, name: str) -> str:
+        """Tipo que admite todo el archivo: el estrecho solo si la muestra fue exhaustiva"""
+        kind = self.column_type(name)
+        return kind if self.exhaustive else _WIDE_TYPES.get(kind, kind)
+
+    def downcast(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Estrechar las columnas del bloque cuyos valores caben en el tipo de la muestra"""
+        if self.exhaustive:
+            return chunk
+        for name, kind in self.dtypes.items():
+            if kind in _WIDE_TYPES and name in chunk.columns and _fits(chunk[name], kind):
+                chunk[name] = chunk[name].astype(kind)
+        return chunk
+
+    def _string_length(self, name: str) -> int:
+        # Margen sobre la muestra, redondeado a potencia de dos
+        length = max(1, self.max_lengths.get(name, 255) * 2)
+        return int(2 ** np.ceil(np.log2(length)))
+
+    def _ddl_type(self, name: str, dialect: str) -> str:
+        kind = self.storage_type(name)
+        if dialect == "postgresql":
+            return _POSTGRES_TYPES.get(kind, "TEXT")
+        if kind in _SQLSERVER_TYPES:
+            return _SQLSERVER_TYPES[kind]
+        length = self._string_length(name)
+        return f"NVARCHAR({length})" if length <= 4000 else "NVARCHAR(MAX)"
+
+    def create_table_sql(self, table_name: str, dialect: str = "postgresql") -> str:
+        """DDL de la tabla destino (`dialect` es "postgresql" o "mssql")"""
+        def quote(name: str) -> str:
+            if dialect == "mssql":
+                return "[" + name.replace("]", "]]") + "]"
+            return '"' + name.replace('"', '""') + '"'
+
+        columns = list(self.dtypes) + [name for name in self.parse_dates if name not in self.dtypes]
+        definitions = ",\n    ".join(f"{quote(name)} {self._ddl_type(name, dialect)}" for name in columns)
+        return f"CREATE TABLE {quote(table_name)} (\n    {definitions}\n)"
+
+    def sql_types(self, dialect: str = "postgresql") -> Dict[str, Any]:
+        """Tipos SQLAlchemy por columna para el argumento `dtype` de to_sql"""
+        types = {}
+        for name in list(self.dtypes) + self.parse_dates:
+            kind = self.storage_type(name)
+            if kind in _SQLALCHEMY_TYPES:
+                types[name] = _SQLALCHEMY_TYPES[kind]()
+            elif dialect == "mssql":
+                length = self._string_length(name)
+                types[name] = sqltypes.NVARCHAR(length if length <= 4000 else None)
+            else:
+                types[name] = sqltypes.Text()
+        return types
+
+
+def _narrowest_int(values: pd.Series) -> str:
+    low, high = values.min(), values.max()
+    for name, numpy_type in _INT_TYPES:
+        info = np.iinfo(numpy_type)
+        if info.min <= low and high <= info.max:
+            return name
+    return "Int64"
+
+
+def _fits_float32(values: pd.Series) -> bool:
+    """float32 solo si cada valor se reproduce exactamente con su representación corta"""
+    values = values.to_numpy(dtype=np.float64)
+    if not np.all(np.isfinite(values)) or np.abs(values).max(initial=0) > np.finfo(np.float32).max:
+        return False
+    as_float32 = values.astype(np.float32)
+    return bool(np.array_equal(as_float32.astype(str).astype(np.float64), values))
+
+
+def _fits(series: pd.Series, kind: str) -> bool:
+    """Si los valores de un bloque leído con el tipo ancho caben en el tipo estrecho `kind`"""
+    if kind == "bool":
+        return not series.isna().any()
+    values = series.dropna()
+    if values.empty:
+        return True
+    if kind == "float32":
+        return _fits_float32(values)
+    info = np.iinfo(dict(_INT_TYPES)[kind])
+    return bool(info.min <= values.min() and values.max() <= info.max)
+
+
+def _looks_like_dates(values: pd.Series) -> bool:
+    if values.empty or values.str.fullmatch(r"[+-]?\d+(\.\d+)?").any():
+        return False
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.to_datetime(values, errors="coerce", format="mixed")
+    return bool(parsed.notna().all())
+
+
+def infer_schema(
+    sample: pd.DataFrame,
+    exhaustive: bool = False,
+    category_ratio: float = CATEGORY_MAX_RATIO
+) -> InferredSchema:
+    """Elegir el tipo más estrecho de cada columna de la muestra.
+
+    Si la muestra no cubre el archivo completo (`exhaustive=False`) esos
+    tipos no se imponen al leer (ver `InferredSchema`), y una columna sin
+    valores en la muestra se lee como texto.
+    """
+    schema = InferredSchema(exhaustive=exhaustive)
+    for name in sample.columns:
+        series = sample[name]
+        values = series.dropna()
+
+        if pd.api.types.is_bool_dtype(series):
+            schema.dtypes[name] = "bool"
+        elif pd.api.types.is_numeric_dtype(series):
+            if values.empty:
+                schema.dtypes[name] = "float32" if exhaustive else "object"
+            elif pd.api.types.is_integer_dtype(series) or (values == values.round()).all():
+                schema.dtypes[name] = _narrowest_int(values)
+            else:
+                schema.dtypes[name] = "float32" if _fits_float32(values) else "float64"
+        else:
+            values = values.astype(str)
+            schema.max_lengths[name] = int(values.str.len().max()) if not values.empty else 0
+            if _looks_like_dates(values):
+                schema.parse_dates.append(name)
+            elif not values.empty and values.nunique() <= category_ratio * len(values):
+                schema.dtypes[name] = "category"
+            else:
+                schema.dtypes[name] = "object"
+    return schema
+
+
+def infer_csv_schema(file_path: str, sample_rows: int = SCHEMA_SAMPLE_ROWS, **read_kwargs) -> InferredSchema:
+    """Inferir el esquema a partir de las primeras `sample_rows` filas del CSV"""
+    sample = pd.read_csv(file_path, nrows=sample_rows, **read_kwargs)
+    schema = infer_schema(sample, exhaustive=len(sample) < sample_rows)
+    logger.info(f"Esquema inferido para {file_path}: {schema.read_kwargs()}")
+    return schema
+
+
+def memory_usage_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Imprimir el CREATE TABLE inferido para un CSV")
+    parser.add_argument("file", help="Archivo CSV")
+    parser.add_argument("--table", required=True, help="Nombre de la tabla destino")
+    parser.add_argument("--dialect", choices=["postgresql", "mssql"], default="postgresql")
+    args = parser.parse_args()
+    print(infer_csv_schema(args.file).create_table_sql(args.table, args.dialect))